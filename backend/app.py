@@ -159,6 +159,19 @@ def create_app(config_path: str = None):
     except Exception as e:
         app.logger.warning(f"Failed to start thumbnail worker: {e}")
     
+    # Thumbnails cached under the old flat layout are never looked up again
+    from backend.media.preview_generator import remove_legacy_cache_dirs
+    if remove_legacy_cache_dirs(config.thumbnail_cache_root):
+        app.logger.info("Removing thumbnail cache directories left from the old layout")
+    
+    # Persistent folder index for next/previous navigation
+    from backend.media.index import get_media_index
+    try:
+        get_media_index(config.thumbnail_cache_root)
+        app.logger.info("Media index opened")
+    except Exception as e:
+        app.logger.warning(f"Failed to open media index, navigation will scan folders: {e}")
+    
     # JWT manager
     jwt_manager = JWTManager(config.jwt_secret)
     app.config['JWT_MANAGER'] = jwt_manager
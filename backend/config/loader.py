@@ -4,6 +4,9 @@ import os
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+# libyaml's C loader when PyYAML was built with it (the PyPI wheels are); same safe subset
+_SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 class Config:
     """Application configuration."""
@@ -14,13 +17,17 @@ class Config:
             config_path = os.getenv("PHOTOMEDIT_CONFIG", "config.yaml")
         
         with open(config_path, 'r') as f:
-            raw_config = yaml.safe_load(f)
+            raw_config = yaml.load(f, Loader=_SafeLoader)
         
         # Server settings
         server = raw_config.get('server', {})
         self.port = server.get('port', 4750)
         self.host = server.get('host', '0.0.0.0')
         self.jwt_secret = server.get('jwtSecret', 'change-me-in-production')
+        # Behind nginx: internal location that maps to the filesystem root, e.g.
+        # "location /internal-files/ { internal; alias /; }"; files are then sent
+        # by nginx via X-Accel-Redirect instead of through the Python worker
+        self.accel_redirect_prefix = server.get('accelRedirectPrefix')
         
         # Auth settings
         auth = raw_config.get('auth', {})
@@ -84,13 +91,19 @@ class Config:
         for lib in self.libraries:
             if not lib.get('id') or not lib.get('rootPath'):
                 raise ValueError("Each library must have 'id' and 'rootPath'")
+        
+        self._index_libraries()
+    
+    def _index_libraries(self):
+        """Build the id -> library lookup (call again if self.libraries changes)."""
+        self._libraries_by_id = {}
+        for lib in self.libraries:
+            # First entry wins on duplicate ids, as the previous linear scan did
+            self._libraries_by_id.setdefault(lib.get('id'), lib)
     
     def get_library(self, library_id: str) -> Optional[Dict[str, Any]]:
         """Get library configuration by ID."""
-        for lib in self.libraries:
-            if lib.get('id') == library_id:
-                return lib
-        return None
+        return self._libraries_by_id.get(library_id)
     
     def _resolve_library_paths(self):
         """
@@ -176,6 +189,8 @@ class Config:
                 'level': self.log_level
             }
         }
+        if self.accel_redirect_prefix:
+            config_dict['server']['accelRedirectPrefix'] = self.accel_redirect_prefix
         
         with open(config_path, 'w') as f:
             yaml.dump(config_dict, f, default_flow_style=False, sort_keys=False)
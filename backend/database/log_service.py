@@ -1,5 +1,6 @@
 """Logging service for database operations."""
 from backend.database.models import LogEntry, get_session_local
+from backend.utils.pools import lazy_pool
 from datetime import datetime
 from typing import Optional, Dict, Any
 import json
@@ -12,6 +13,11 @@ def get_db():
 logger = logging.getLogger(__name__)
 
 
+# The single thread that writes background log entries; one worker keeps
+# entries in the order they were logged
+get_log_pool = lazy_pool('db-log', 1)
+
+
 class LogService:
     """Service for application logging to database."""
     
@@ -38,6 +44,13 @@ class LogService:
         finally:
             db.close()
     
+    @staticmethod
+    def log_async(level: str, message: str, logger_name: str = None, user: str = None,
+                  ip_address: str = None, details: Dict[str, Any] = None):
+        """Create a log entry in the background; the caller doesn't wait on the database."""
+        # Arguments must be plain values: the worker runs outside the request context
+        get_log_pool().submit(LogService.log, level, message, logger_name, user, ip_address, details)
+    
     @staticmethod
     def get_logs(limit: int = 100, level: str = None, user: str = None):
         """Get recent log entries."""
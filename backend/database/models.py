@@ -91,6 +91,15 @@ def get_session_local():
     return _SessionLocal
 
 
+def set_engine(engine):
+    """Use the given engine (e.g. a test database), or None to go back to the configured one."""
+    global _engine, _SessionLocal
+    if _SessionLocal is not None:
+        _SessionLocal.remove()
+    _engine = engine
+    _SessionLocal = None
+
+
 # For backward compatibility
 def SessionLocal():
     return get_session_local()
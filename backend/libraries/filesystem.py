@@ -7,6 +7,10 @@ from backend.security.sanitizer import PathSanitizer
 
 logger = logging.getLogger(__name__)
 
+# Extensions scanned as media; anything scanned that isn't an image is a video
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng', '.tif', '.tiff'})
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.mov', '.m4v', '.avi', '.mkv'})
+
 
 def scan_folder(root_path: str, relative_path: str = "") -> List[Dict[str, Any]]:
     """
@@ -136,10 +140,6 @@ def scan_media_files(root_path: str, relative_path: str = "") -> List[Dict[str,
         
         logger.debug(f"Scanning media files in: {resolved_path} (root: {root_path}, relative: {relative_path})")
         
-        # Supported extensions
-        image_extensions = {'.jpg', '.jpeg', '.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng', '.tif', '.tiff'}
-        video_extensions = {'.mp4', '.mov', '.m4v', '.avi', '.mkv'}
-        
         # Hidden/system files to exclude
         hidden_files = {
             '.DS_Store',  # macOS metadata
@@ -147,23 +147,44 @@ def scan_media_files(root_path: str, relative_path: str = "") -> List[Dict[str,
             'desktop.ini',  # Windows folder settings
         }
         
-        for item in folder_path.iterdir():
-            try:
-                if (item.is_file() and 
-                    not item.name.startswith('.') and 
-                    item.name not in hidden_files):
-                    ext = item.suffix.lower()
-                    if ext in image_extensions or ext in video_extensions:
-                        item_relative = os.path.relpath(item, root_path)
-                        media_files.append({
-                            'path': str(item),
-                            'relativePath': item_relative.replace(os.sep, '/'),
-                            'filename': item.name,
-                            'extension': ext
-                        })
-            except (PermissionError, OSError) as e:
-                logger.warning(f"Cannot access file {item} in {resolved_path}: {e}")
-                continue
+        # Relative prefix computed once instead of a relpath() per file
+        folder_relative = os.path.relpath(folder_path, root_path).replace(os.sep, '/')
+        prefix = '' if folder_relative == '.' else folder_relative + '/'
+        
+        # scandir exposes d_type, so is_file() needs no extra syscall; the one stat()
+        # per media file is kept on the item so callers don't stat it again.
+        # Sidecars (name.xmp, see get_sidecar_path) show up in the same listing
+        sidecar_stems = set()
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith('.') or name in hidden_files:
+                    continue
+                stem, ext = os.path.splitext(name)
+                if ext == '.xmp':
+                    sidecar_stems.add(stem)
+                    continue
+                ext = ext.lower()
+                if ext not in IMAGE_EXTENSIONS and ext not in VIDEO_EXTENSIONS:
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except (PermissionError, OSError) as e:
+                    logger.warning(f"Cannot access file {entry.path} in {resolved_path}: {e}")
+                    continue
+                media_files.append({
+                    'path': entry.path,
+                    'relativePath': prefix + name,
+                    'filename': name,
+                    'extension': ext,
+                    'mtime': st.st_mtime,
+                    'size': st.st_size
+                })
+        
+        for mf in media_files:
+            mf['hasSidecar'] = os.path.splitext(mf['filename'])[0] in sidecar_stems
         
         # Sort by filename
         media_files.sort(key=lambda x: x['filename'].lower())
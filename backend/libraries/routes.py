@@ -1,12 +1,13 @@
 """Library and folder routes."""
 from flask import Blueprint, request, jsonify, current_app
 from backend.config.loader import Config
-from backend.libraries.filesystem import scan_folder, scan_media_files
+from backend.libraries.filesystem import scan_folder, scan_media_files, IMAGE_EXTENSIONS
 from backend.media.metadata_reader import MetadataReader
 from backend.media.preview_generator import PreviewGenerator
 from backend.security.sanitizer import PathSanitizer
 import os
 import logging
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
@@ -104,6 +105,17 @@ def list_media(library_id: str, folder_id: str):
     if review_status not in ['unreviewed', 'reviewed', 'all']:
         review_status = 'unreviewed'
     
+    # Resolve the review status filter to a predicate once, outside the per-file loop
+    if review_status == 'reviewed':
+        # Show only reviewed images
+        keep_status = lambda status: status == 'reviewed'
+    elif review_status == 'unreviewed':
+        # Show all images that are NOT reviewed (including those without status)
+        keep_status = lambda status: status != 'reviewed'
+    else:
+        # 'all' shows everything, so no filtering needed
+        keep_status = lambda status: True
+    
     # Scan media files
     media_files = scan_media_files(library['rootPath'], relative_path)
     
@@ -112,49 +124,25 @@ def list_media(library_id: str, folder_id: str):
     
     # Build response
     media_list = []
+    missing_thumbs = []
     for mf in media_files:
         # Read metadata
         metadata = MetadataReader.read_logical_metadata(mf['path'])
         
         # Apply review status filter
         file_review_status = metadata.get('reviewStatus', 'unreviewed')
-        if review_status == 'reviewed':
-            # Show only reviewed images
-            if file_review_status != 'reviewed':
-                continue
-        elif review_status == 'unreviewed':
-            # Show all images that are NOT reviewed (including those without status)
-            if file_review_status == 'reviewed':
-                continue
-        # 'all' shows everything, so no filtering needed
+        if not keep_status(file_review_status):
+            continue
         
         # Determine media type
         ext = mf['extension'].lower()
-        image_exts = {'.jpg', '.jpeg', '.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng', '.tif', '.tiff'}
-        is_image = ext in image_exts
+        is_image = ext in IMAGE_EXTENSIONS
         
-        # Check if thumbnail exists (don't generate synchronously during listing)
-        # Queue for background generation if it doesn't exist
+        # Check if thumbnail exists (don't generate synchronously during listing);
+        # missing ones are queued for background generation after the loop
         media_id = f"{library_id}|{mf['relativePath']}"
-        has_thumb = False
-        if is_image:
-            has_thumb = preview_gen.has_thumbnail(mf['path'])
-            if not has_thumb:
-                # Queue for background generation
-                try:
-                    from backend.media.thumbnail_worker import queue_thumbnail_generation
-                    queue_thumbnail_generation(mf['path'], is_image=True, thumbnail_cache_root=config.thumbnail_cache_root)
-                except Exception as e:
-                    logger.debug(f"Failed to queue thumbnail for {mf['path']}: {e}")
-        else:
-            has_thumb = preview_gen.has_thumbnail(mf['path'])
-            if not has_thumb:
-                # Queue for background generation
-                try:
-                    from backend.media.thumbnail_worker import queue_thumbnail_generation
-                    queue_thumbnail_generation(mf['path'], is_image=False, thumbnail_cache_root=config.thumbnail_cache_root)
-                except Exception as e:
-                    logger.debug(f"Failed to queue thumbnail for {mf['path']}: {e}")
+        if not preview_gen.has_thumbnail(mf['path'], mf['mtime']):
+            missing_thumbs.append((mf['path'], is_image))
         
         # Always provide thumbnail URL (will be generated on-demand if not cached)
         thumbnail_url = f"/api/media/{media_id}/thumbnail"
@@ -175,19 +163,31 @@ def list_media(library_id: str, folder_id: str):
             'reviewStatus': file_review_status
         })
     
+    # Queue the whole listing at once so decodes run while the response is sent
+    if missing_thumbs:
+        try:
+            from backend.media.thumbnail_worker import get_thumbnail_worker
+            get_thumbnail_worker(config.thumbnail_cache_root).queue_batch(missing_thumbs)
+        except Exception as e:
+            logger.debug(f"Failed to queue {len(missing_thumbs)} thumbnail(s): {e}")
+    
     # Sort media list: by eventDate if available, otherwise by filename
+    # list.sort() computes each key once; memoize parses so shared dates (bursts) parse once
+    parsed_dates = {}
+    
     def sort_key(item):
         # Primary sort: eventDate (newest first)
         event_date = item.get('eventDate')
         if event_date:
-            try:
-                from datetime import datetime
-                # Parse ISO format date
-                dt = datetime.fromisoformat(event_date.replace('Z', '+00:00'))
-                # Return negative timestamp for descending order (newest first)
-                return (-dt.timestamp(), item['filename'].lower())
-            except Exception:
-                pass
+            if event_date not in parsed_dates:
+                try:
+                    # Parse ISO format date; negative timestamp for descending order (newest first)
+                    parsed_dates[event_date] = -datetime.fromisoformat(event_date.replace('Z', '+00:00')).timestamp()
+                except Exception:
+                    parsed_dates[event_date] = None
+            timestamp = parsed_dates[event_date]
+            if timestamp is not None:
+                return (timestamp, item['filename'].lower())
         # Fallback: sort by filename (case-insensitive)
         return (float('inf'), item['filename'].lower())
     
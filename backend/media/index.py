@@ -0,0 +1,163 @@
+"""Persistent SQLite index of folder listings for navigation."""
+import os
+import sqlite3
+import logging
+import threading
+from typing import Optional, List, Dict, Any, Callable
+from backend.libraries.filesystem import scan_media_files
+from backend.security.sanitizer import PathSanitizer
+
+logger = logging.getLogger(__name__)
+
+# review_status_filter -> SQL condition on review_status
+_FILTER_SQL = {
+    'all': '1',
+    'reviewed': "review_status = 'reviewed'",
+    'unreviewed': "review_status != 'reviewed'",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    root_path TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (root_path, folder)
+);
+CREATE TABLE IF NOT EXISTS media (
+    root_path TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    relative_path TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    review_status TEXT NOT NULL,
+    PRIMARY KEY (root_path, folder, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_media_relative_path ON media(root_path, relative_path);
+CREATE INDEX IF NOT EXISTS idx_media_review_status ON media(root_path, folder, review_status);
+"""
+
+
+class MediaIndex:
+    """
+    Folder listings (filename order + review status) kept in SQLite.
+    
+    A folder is re-scanned when its directory mtime changes or it is
+    invalidated after a metadata write; next/previous lookups are then
+    indexed queries instead of a scan of the whole folder.
+    """
+    
+    def __init__(self, db_path: str, read_review_statuses: Callable[[List[str]], List[str]]):
+        # read_review_statuses maps a list of media paths to their review statuses
+        self._read_review_statuses = read_review_statuses
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+    
+    def _ensure_fresh(self, root_path: str, folder: str) -> bool:
+        """Re-scan the folder if it changed since it was indexed; False if it can't be listed."""
+        is_valid, resolved_path, error = PathSanitizer.sanitize_path(root_path, folder)
+        if not is_valid:
+            return False
+        try:
+            mtime_ns = os.stat(resolved_path).st_mtime_ns
+        except OSError:
+            return False
+        
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT mtime_ns FROM folders WHERE root_path = ? AND folder = ?',
+                (root_path, folder)
+            ).fetchone()
+        if row is not None and row[0] == mtime_ns:
+            return True
+        
+        media_files = scan_media_files(root_path, folder)
+        statuses = self._read_review_statuses([mf['path'] for mf in media_files])
+        rows = [
+            (root_path, folder, seq, mf['relativePath'], mf['filename'], mf['path'], status)
+            for seq, (mf, status) in enumerate(zip(media_files, statuses))
+        ]
+        
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute('DELETE FROM media WHERE root_path = ? AND folder = ?', (root_path, folder))
+                self._conn.executemany('INSERT INTO media VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO folders VALUES (?, ?, ?)',
+                    (root_path, folder, mtime_ns)
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        logger.debug(f"Indexed {len(rows)} media files in {resolved_path}")
+        return True
+    
+    def list_folder(self, root_path: str, folder: str, review_status_filter: str = 'unreviewed') -> List[Dict[str, Any]]:
+        """Media in one folder matching the filter, in filename order."""
+        condition = _FILTER_SQL.get(review_status_filter)
+        if condition is None or not self._ensure_fresh(root_path, folder):
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT path, relative_path, filename, review_status FROM media '
+                f'WHERE root_path = ? AND folder = ? AND {condition} ORDER BY seq',
+                (root_path, folder)
+            ).fetchall()
+        return [
+            {'path': path, 'relativePath': relative_path, 'filename': filename, 'reviewStatus': review_status}
+            for path, relative_path, filename, review_status in rows
+        ]
+    
+    def neighbor(
+        self,
+        root_path: str,
+        folder: str,
+        current_relative_path: str,
+        direction: str,
+        review_status_filter: str = 'unreviewed'
+    ) -> Optional[str]:
+        """Relative path of the next/previous matching item in the folder, or None."""
+        condition = _FILTER_SQL.get(review_status_filter)
+        if condition is None or not self._ensure_fresh(root_path, folder):
+            return None
+        comparison, order = ('>', 'ASC') if direction == 'next' else ('<', 'DESC')
+        with self._lock:
+            # The current item must itself match the filter, as with a list lookup
+            current = self._conn.execute(
+                f'SELECT seq FROM media WHERE root_path = ? AND relative_path = ? AND folder = ? AND {condition}',
+                (root_path, current_relative_path, folder)
+            ).fetchone()
+            if current is None:
+                return None
+            row = self._conn.execute(
+                'SELECT relative_path FROM media '
+                f'WHERE root_path = ? AND folder = ? AND seq {comparison} ? AND {condition} '
+                f'ORDER BY seq {order} LIMIT 1',
+                (root_path, folder, current[0])
+            ).fetchone()
+        return row[0] if row else None
+    
+    def invalidate(self, root_path: str, folder: str):
+        """Force a re-scan of the folder on next use (e.g. after a metadata write)."""
+        with self._lock:
+            self._conn.execute('DELETE FROM folders WHERE root_path = ? AND folder = ?', (root_path, folder))
+
+
+_global_index: Optional[MediaIndex] = None
+
+
+def get_media_index(thumbnail_cache_root: str = None) -> Optional[MediaIndex]:
+    """Get the global media index, creating it on the first call that passes a cache root."""
+    global _global_index
+    if _global_index is None and thumbnail_cache_root is not None:
+        from backend.media.navigation import read_review_statuses
+        _global_index = MediaIndex(
+            os.path.join(thumbnail_cache_root, 'media-index.sqlite3'),
+            read_review_statuses
+        )
+    return _global_index
@@ -1,10 +1,11 @@
 """Metadata reader using exiftool."""
 import subprocess
-import json
 import os
+import orjson
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
-from backend.utils.sidecar import read_sidecar, get_sidecar_path
+from typing import Dict, Any, List, Optional
+from backend.utils.sidecar import get_sidecar_path
 
 
 class MetadataReader:
@@ -13,28 +14,35 @@ class MetadataReader:
     @staticmethod
     def _run_exiftool(file_path: str, args: list = None) -> Optional[Dict[str, Any]]:
         """Run exiftool and return JSON output."""
+        results = MetadataReader._run_exiftool_multi([file_path], args)
+        return results[0] if results else None
+    
+    @staticmethod
+    def _run_exiftool_multi(file_paths: List[str], args: list = None) -> List[Dict[str, Any]]:
+        """Run exiftool once over several files and return one JSON object per file."""
         if args is None:
             args = []
         
         try:
-            # Use -ext xmp to also read from sidecar files automatically
-            # Exiftool will read from both the main file and associated .xmp sidecar
-            cmd = ['exiftool', '-j', '-struct', '-G'] + args + [file_path]
+            cmd = ['exiftool', '-j', '-struct', '-G'] + args + list(file_paths)
+            # Keep stdout as bytes; orjson parses UTF-8 directly without a decode pass
             result = subprocess.run(
                 cmd,
+                stdin=subprocess.DEVNULL,
                 capture_output=True,
-                text=True,
                 timeout=30
             )
             
-            if result.returncode == 0 and result.stdout:
-                data = json.loads(result.stdout)
-                if data and len(data) > 0:
-                    return data[0]
+            # exiftool exits non-zero if any one file fails, but still prints the others;
+            # drop the entries of files it could not read
+            if result.stdout:
+                data = orjson.loads(result.stdout)
+                if data:
+                    return [d for d in data if 'ExifTool:Error' not in d]
         except Exception:
             pass
         
-        return None
+        return []
     
     @staticmethod
     def read_technical_metadata(file_path: str) -> Dict[str, Any]:
@@ -75,30 +83,52 @@ class MetadataReader:
     @staticmethod
     def read_logical_metadata(file_path: str) -> Dict[str, Any]:
         """Read logical metadata (editable fields)."""
+        try:
+            stamp = _file_stamp(file_path)
+        except OSError:
+            return MetadataReader._read_logical_metadata_uncached(file_path)
+        try:
+            # Callers add fields to the result, so hand out a copy of the cached dict
+            return dict(_read_logical_cached(file_path, stamp))
+        except _ReadFailed:
+            return {}
+    
+    @staticmethod
+    def read_review_status(file_path: str) -> str:
+        """Read just the review status, for listings that need nothing else."""
+        try:
+            return _review_status_cached(file_path, _file_stamp(file_path))
+        except OSError:
+            return MetadataReader._read_logical_metadata_uncached(file_path).get('reviewStatus', 'unreviewed')
+        except _ReadFailed:
+            return 'unreviewed'
+    
+    @staticmethod
+    def _read_logical_metadata_uncached(file_path: str) -> Dict[str, Any]:
+        """Read logical metadata from the file (and sidecar) via exiftool."""
         metadata = {}
         
-        # Check sidecar first
-        sidecar_content = read_sidecar(file_path)
-        if sidecar_content:
-            # Parse XMP from sidecar (simplified - in production use proper XMP parser)
-            # For now, we'll read from exiftool which handles XMP
-            pass
-        
-        # Read metadata - exiftool automatically reads from sidecar .xmp files if they exist
-        # Use -ext xmp to ensure sidecar files are also considered
-        exif_data = MetadataReader._run_exiftool(file_path, ['-XMP:All', '-IPTC:All', '-EXIF:DateTimeOriginal', '-EXIF:ImageDescription'])
+        # Read the media file and its sidecar (if any) in a single exiftool run
+        from backend.utils.sidecar import sidecar_exists
+        sidecar_path = get_sidecar_path(file_path) if sidecar_exists(file_path) else None
+        file_paths = [file_path, sidecar_path] if sidecar_path else [file_path]
+        results = MetadataReader._run_exiftool_multi(file_paths, ['-XMP:All', '-IPTC:All', '-EXIF:DateTimeOriginal', '-EXIF:ImageDescription'])
+        
+        exif_data = None
+        sidecar_data = None
+        for data in results:
+            if sidecar_path and data.get('SourceFile') == sidecar_path:
+                sidecar_data = data
+            elif data.get('SourceFile') == file_path:
+                exif_data = data
         if not exif_data:
             return metadata
         
-        # Also try reading directly from sidecar if it exists (for XMP tags)
-        from backend.utils.sidecar import sidecar_exists
-        if sidecar_exists(file_path):
-            sidecar_data = MetadataReader._run_exiftool(get_sidecar_path(file_path), ['-XMP:All'])
-            if sidecar_data:
-                # Merge sidecar data, with sidecar taking precedence for XMP tags
-                for key, value in sidecar_data.items():
-                    if key.startswith('XMP:') and value:
-                        exif_data[key] = value
+        if sidecar_data:
+            # Merge sidecar data, with sidecar taking precedence for XMP tags
+            for key, value in sidecar_data.items():
+                if key.startswith('XMP:') and value:
+                    exif_data[key] = value
         
         # Event date
         event_date = (
@@ -171,3 +201,35 @@ class MetadataReader:
         
         return metadata
 
+
+def _file_stamp(file_path: str) -> tuple:
+    """Change stamp for a media file and its sidecar, used as the cache key."""
+    # exiftool -P preserves mtime on writes, so ctime is included to catch our own edits
+    st = os.stat(file_path)
+    try:
+        sidecar_st = os.stat(get_sidecar_path(file_path))
+        sidecar_stamp = (sidecar_st.st_mtime_ns, sidecar_st.st_ctime_ns)
+    except OSError:
+        sidecar_stamp = None
+    return (st.st_mtime_ns, st.st_ctime_ns, sidecar_stamp)
+
+
+class _ReadFailed(Exception):
+    """Raised inside the cache so failed reads (e.g. exiftool timeouts) are not cached."""
+
+
+# Sized above the largest folders a listing walks: a sequential scan longer than an
+# LRU cache evicts every entry before it is reused
+@lru_cache(maxsize=8192)
+def _read_logical_cached(file_path: str, stamp: tuple) -> Dict[str, Any]:
+    """Per-process cache of logical metadata; a changed stamp is simply a new key."""
+    metadata = MetadataReader._read_logical_metadata_uncached(file_path)
+    if not metadata:
+        raise _ReadFailed(file_path)
+    return metadata
+
+
+@lru_cache(maxsize=200_000)
+def _review_status_cached(file_path: str, stamp: tuple) -> str:
+    """Review status per (file, stamp); small enough to keep a whole library's worth."""
+    return _read_logical_cached(file_path, stamp).get('reviewStatus', 'unreviewed')
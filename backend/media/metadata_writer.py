@@ -1,67 +1,326 @@
 """Metadata writer using exiftool."""
 import subprocess
 import os
+import atexit
+import hashlib
 import logging
+import select
+import selectors
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
-from backend.utils.timestamp import format_event_date_for_exif
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+from backend.utils.timestamp import format_event_date_for_exif, parse_event_date
+from backend.utils.file_io import ensure_dir, forget_dir
+from backend.utils.sidecar import get_sidecar_path
 
 logger = logging.getLogger(__name__)
 
+# Tags each logical field is written to; videos only get XMP (in the sidecar)
+_DATE_TAGS_IMAGE = ('XMP-exif:DateTimeOriginal', 'EXIF:DateTimeOriginal', 'EXIF:CreateDate', 'EXIF:ModifyDate')
+_DATE_TAGS_VIDEO = ('XMP-exif:DateTimeOriginal',)
+_TITLE_TAGS_IMAGE = ('XMP-dc:title', 'IPTC:ObjectName')
+_TITLE_TAGS_VIDEO = ('XMP-dc:title',)
+_NOTES_TAGS_IMAGE = ('XMP-dc:description', 'IPTC:Caption-Abstract')
+_NOTES_TAGS_VIDEO = ('XMP-dc:description',)
+_PEOPLE_TAGS_IMAGE = ('IPTC:Keywords', 'XMP-dc:subject')
+_PEOPLE_TAGS_VIDEO = ('XMP-dc:subject',)
+_CITY_TAGS_IMAGE = ('XMP-photoshop:City', 'IPTC:City')
+_CITY_TAGS_VIDEO = ('XMP-photoshop:City',)
+_COUNTRY_TAGS_IMAGE = ('XMP-photoshop:Country', 'IPTC:Country-PrimaryLocationName')
+_COUNTRY_TAGS_VIDEO = ('XMP-photoshop:Country',)
+_IMAGE_TAG_SETS = (_DATE_TAGS_IMAGE, _TITLE_TAGS_IMAGE, _NOTES_TAGS_IMAGE,
+                   _PEOPLE_TAGS_IMAGE, _CITY_TAGS_IMAGE, _COUNTRY_TAGS_IMAGE)
+_VIDEO_TAG_SETS = (_DATE_TAGS_VIDEO, _TITLE_TAGS_VIDEO, _NOTES_TAGS_VIDEO,
+                   _PEOPLE_TAGS_VIDEO, _CITY_TAGS_VIDEO, _COUNTRY_TAGS_VIDEO)
+
+# Review status lives in XMP:UserComment unless that field already holds the Notes text;
+# exiftool evaluates this against the file being written, so no separate read is needed
+_REVIEW_TAG = 'XMP:UserComment'
+_REVIEW_CONDITION = (
+    'not $XMP:UserComment or $XMP:UserComment =~ /^PhotoMedit:/ '
+    'or not ($XMP:Description or $IPTC:Caption-Abstract) '
+    'or ($XMP:UserComment =~ /^\\s*(.*?)\\s*$/s)[0] ne '
+    '(($XMP:Description || $IPTC:Caption-Abstract) =~ /^\\s*(.*?)\\s*$/s)[0]'
+)
+
+
+# Escapes applied to tag values, as one translate() pass
+_VALUE_ESCAPES = str.maketrans({'\\': '\\\\', '$': '\\$'})
+
+
+class _ExiftoolDaemon:
+    """
+    A long-lived `exiftool -stay_open True -@ -` process.
+    
+    Arguments are written to its stdin one per line and each command is
+    terminated with -execute<N>; exiftool then prints {ready<N>} on stdout,
+    and -echo4 puts the same marker on stderr once the command is done.
+    One process handles one command batch at a time, hence the lock.
+    """
+    
+    def __init__(self):
+        self._process = None
+        self._lock = threading.Lock()
+        self._sequence = 0
+    
+    def _reset_after_fork(self):
+        # A forked child must not share the parent's exiftool pipes (or a held lock)
+        self._process = None
+        self._lock = threading.Lock()
+    
+    def _start(self):
+        self._process = subprocess.Popen(
+            ['exiftool', '-stay_open', 'True', '-@', '-'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0
+        )
+    
+    def _kill(self):
+        if self._process is not None:
+            try:
+                self._process.kill()
+                self._process.wait(timeout=5)
+            except Exception:
+                pass
+            self._process = None
+    
+    @staticmethod
+    def _encode_arg(arg: str) -> bytes:
+        """Encode one argument as an argfile line."""
+        # Argfile lines are stripped and split on newlines; #[CSTR] lines keep both intact
+        if '\n' in arg or '\r' in arg or arg != arg.strip() or arg.startswith('#'):
+            escaped = arg.replace('\\', '\\\\').replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
+            return b'#[CSTR]' + escaped.encode('utf-8')
+        return arg.encode('utf-8')
+    
+    def execute_many(self, jobs: List[List[str]], timeout: float = 60) -> List[Tuple[bool, bytes]]:
+        """Run several exiftool commands back to back; returns (ok, stderr) per command."""
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                self._start()
+            
+            lines = []
+            markers = []
+            for args in jobs:
+                self._sequence += 1
+                marker = f'{{ready{self._sequence}}}'.encode()
+                lines.extend(self._encode_arg(arg) for arg in args)
+                lines.extend([b'-echo4', marker, f'-execute{self._sequence}'.encode()])
+                markers.append(marker)
+            
+            try:
+                _, stderr = self._communicate(b'\n'.join(lines) + b'\n', markers[-1], timeout)
+            except Exception:
+                # The daemon is in an unknown state; start a fresh one next time
+                self._kill()
+                raise
+        
+        # stdout only carries exiftool's "N image files updated" summaries and the
+        # {ready} markers; errors are reported on stderr, so only that is kept
+        results = []
+        for marker in markers:
+            job_stderr, _, stderr = stderr.partition(marker)
+            ok = not any(line.startswith(b'Error') for line in job_stderr.splitlines())
+            results.append((ok, job_stderr.strip()))
+        return results
+    
+    def _communicate(self, payload: bytes, marker: bytes, timeout: float) -> Tuple[bytes, bytes]:
+        """Write payload and read stdout/stderr until both carry the final marker."""
+        process = self._process
+        deadline = time.monotonic() + timeout
+        output = {process.stdout: bytearray(), process.stderr: bytearray()}
+        pending = set(output)
+        view = memoryview(payload)
+        
+        with selectors.DefaultSelector() as selector:
+            # Write and read concurrently so a large batch can't fill both pipes and stall
+            selector.register(process.stdin, selectors.EVENT_WRITE)
+            for stream in output:
+                selector.register(stream, selectors.EVENT_READ)
+            
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired('exiftool -stay_open', timeout)
+                for key, _ in selector.select(remaining):
+                    if key.fileobj is process.stdin:
+                        # Writes of up to PIPE_BUF bytes never block once the pipe is writable
+                        written = os.write(process.stdin.fileno(), view[:select.PIPE_BUF])
+                        view = view[written:]
+                        if not view:
+                            selector.unregister(process.stdin)
+                        continue
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        raise RuntimeError('exiftool daemon exited unexpectedly')
+                    buffer = output[key.fileobj]
+                    buffer += chunk
+                    if marker in buffer:
+                        selector.unregister(key.fileobj)
+                        pending.discard(key.fileobj)
+        
+        return bytes(output[process.stdout]), bytes(output[process.stderr])
+    
+    def close(self):
+        """Ask exiftool to exit (registered with atexit)."""
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                return
+            try:
+                self._process.stdin.write(b'-stay_open\nFalse\n')
+                self._process.wait(timeout=5)
+            except Exception:
+                self._kill()
+            self._process = None
+
+
+_daemon = _ExiftoolDaemon()
+atexit.register(_daemon.close)
+os.register_at_fork(after_in_child=_daemon._reset_after_fork)
+
+
+# Last XMP tag set written to each file's sidecar, with the sidecar's (mtime_ns, size) after that write
+_sidecar_writes: Dict[str, Tuple[bytes, tuple]] = {}
+_sidecar_writes_lock = threading.Lock()
+
+
+def _tags_digest(tags: Dict[str, str]) -> bytes:
+    """Digest of the XMP tags a sidecar write of these tags would carry."""
+    xmp_items = sorted(item for item in tags.items() if item[0].startswith('XMP'))
+    return hashlib.blake2b(repr(xmp_items).encode('utf-8'), digest_size=16).digest()
+
+
+def _sidecar_stamp(file_path: str):
+    try:
+        st = os.stat(get_sidecar_path(file_path))
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _sidecar_up_to_date(file_path: str, tags: Dict[str, str]) -> bool:
+    """True if these exact tags were our last write to the sidecar and it hasn't changed since."""
+    with _sidecar_writes_lock:
+        last = _sidecar_writes.get(file_path)
+    if last is None:
+        return False
+    stamp = _sidecar_stamp(file_path)
+    return stamp is not None and last == (_tags_digest(tags), stamp)
+
+
+def _remember_sidecar_write(file_path: str, tags: Dict[str, str]):
+    stamp = _sidecar_stamp(file_path)
+    if stamp is not None:
+        with _sidecar_writes_lock:
+            _sidecar_writes[file_path] = (_tags_digest(tags), stamp)
+
+
+@lru_cache(maxsize=8192)
+def _parse_location_name(location_name: str) -> tuple:
+    """Parse location name into city and country if possible."""
+    # Simple parsing: assume format like "City, Country" or just "City"
+    # Libraries revisit the same few places, hence the cache
+    if not location_name:
+        return None, None
+    
+    comma = location_name.find(',')
+    if comma < 0:
+        # If only one part, assume it's a city
+        return location_name.strip() or None, None
+    return location_name[:comma].strip() or None, location_name[location_name.rfind(',') + 1:].strip() or None
+
 
 class MetadataWriter:
     """Write metadata to media files using exiftool."""
     
+    @staticmethod
+    def _build_args(file_path: str, tags: Dict[str, str], write_sidecar: bool = False, skip_tag: Optional[str] = None) -> List[str]:
+        """Build the exiftool arguments for one write (embedded or sidecar)."""
+        # Sidecar writes take the full tag dict and keep only its XMP tags here,
+        # so callers don't build a filtered copy per file
+        args = []
+        if write_sidecar:
+            # For sidecar writes, use -o to write XMP tags to sidecar file
+            sidecar_path = get_sidecar_path(file_path)
+            # Ensure sidecar directory exists
+            ensure_dir(os.path.dirname(sidecar_path))
+            # Use -o to write to sidecar file
+            args.append('-o')
+            args.append(sidecar_path)
+        
+        for key, value in tags.items():
+            if key == skip_tag or (write_sidecar and not key.startswith('XMP')):
+                continue
+            if value is not None and value != '':
+                # Escape special characters in values
+                value_str = str(value).translate(_VALUE_ESCAPES)
+                # Standard tag format: -TagName=value
+                args.append(f'-{key}={value_str}')
+        
+        # Use -overwrite_original to avoid backup files, -P to preserve file modification date
+        # -m to ignore minor errors
+        # -fast2 skips MakerNotes parsing wherever exiftool reads the file; no tag written here needs it
+        options = ['-P', '-m', '-fast2']
+        if write_sidecar:
+            # For sidecar, don't use -overwrite_original (we're writing to a different file)
+            return options + args + [file_path]
+        return ['-overwrite_original'] + options + args + [file_path]
+    
+    @staticmethod
+    def _build_commands(file_path: str, tags: Dict[str, str], write_sidecar: bool = False) -> List[List[str]]:
+        """Build the exiftool command(s) for one write, gating the review status tag."""
+        if _REVIEW_TAG not in tags:
+            return [MetadataWriter._build_args(file_path, tags, write_sidecar)]
+        # -if skips a whole command, so write everything when the condition holds and
+        # everything but UserComment when it doesn't; exactly one of the two applies
+        return [
+            ['-if', _REVIEW_CONDITION] + MetadataWriter._build_args(file_path, tags, write_sidecar),
+            ['-if', f'not ({_REVIEW_CONDITION})'] + MetadataWriter._build_args(file_path, tags, write_sidecar, _REVIEW_TAG),
+        ]
+    
     @staticmethod
     def _run_exiftool(file_path: str, tags: Dict[str, str], write_sidecar: bool = False) -> bool:
         """Run exiftool to write tags."""
+        return MetadataWriter._run_exiftool_multi(file_path, [(tags, write_sidecar)])
+    
+    @staticmethod
+    def _run_exiftool_multi(file_path: str, jobs: List[Tuple[Dict[str, str], bool]]) -> bool:
+        """Run several writes for one file, given as (tags, write_sidecar) jobs, in one exiftool transaction."""
         try:
             # Check if file is writable
             if not os.access(file_path, os.W_OK):
                 logger.error(f"File is not writable: {file_path}")
                 return False
             
-            args = []
-            if write_sidecar:
-                # For sidecar writes, use -o to write XMP tags to sidecar file
-                from backend.utils.sidecar import get_sidecar_path
-                sidecar_path = get_sidecar_path(file_path)
-                # Ensure sidecar directory exists
-                os.makedirs(os.path.dirname(sidecar_path), exist_ok=True)
-                # Use -o to write to sidecar file
-                args.append('-o')
-                args.append(sidecar_path)
-            
-            for key, value in tags.items():
-                if value is not None and value != '':
-                    # Escape special characters in values
-                    value_str = str(value).replace('\\', '\\\\').replace('$', '\\$')
-                    # Standard tag format: -TagName=value
-                    args.append(f'-{key}={value_str}')
-            
-            # Use -overwrite_original to avoid backup files, -P to preserve file modification date
-            # -m to ignore minor errors
-            if write_sidecar:
-                # For sidecar, don't use -overwrite_original (we're writing to a different file)
-                cmd = ['exiftool', '-P', '-m'] + args + [file_path]
-            else:
-                cmd = ['exiftool', '-overwrite_original', '-P', '-m'] + args + [file_path]
+            commands = []
+            owners = []  # (tags, write_sidecar) for each command
+            for tags, write_sidecar in jobs:
+                for cmd in MetadataWriter._build_commands(file_path, tags, write_sidecar):
+                    commands.append(cmd)
+                    owners.append((tags, write_sidecar))
+            if logger.isEnabledFor(logging.DEBUG):
+                for cmd in commands:
+                    logger.debug(f"Running exiftool: {' '.join(cmd)}")
+            results = _daemon.execute_many(commands)
             
-            logger.debug(f"Running exiftool: {' '.join(cmd)}")
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            success = True
+            for (tags, write_sidecar), (ok, stderr) in zip(owners, results):
+                if ok and write_sidecar:
+                    _remember_sidecar_write(file_path, tags)
+                if not ok:
+                    logger.error(f"Exiftool failed for {file_path}: {stderr.decode('utf-8', 'replace')}")
+                    if write_sidecar:
+                        forget_dir(os.path.dirname(get_sidecar_path(file_path)))
+                    success = False
             
-            if result.returncode != 0:
-                logger.error(f"Exiftool failed for {file_path}: {result.stderr}")
-                logger.debug(f"Exiftool stdout: {result.stdout}")
-                return False
-            
-            logger.info(f"Successfully wrote metadata to {file_path}")
-            return True
+            if success:
+                logger.info(f"Successfully wrote metadata to {file_path}")
+            return success
         except subprocess.TimeoutExpired:
             logger.error(f"Exiftool timed out for {file_path}")
             return False
@@ -69,24 +328,6 @@ class MetadataWriter:
             logger.error(f"Exception in _run_exiftool for {file_path}: {e}", exc_info=True)
             return False
     
-    @staticmethod
-    def _parse_location_name(location_name: str) -> tuple:
-        """Parse location name into city and country if possible."""
-        # Simple parsing: assume format like "City, Country" or just "City"
-        # This is a basic implementation - could be enhanced with geocoding
-        if not location_name:
-            return None, None
-        
-        parts = [p.strip() for p in location_name.split(',')]
-        if len(parts) >= 2:
-            city = parts[0]
-            country = parts[-1]
-            return city, country
-        elif len(parts) == 1:
-            # If only one part, assume it's a city
-            return parts[0], None
-        return None, None
-    
     @staticmethod
     def write_metadata(file_path: str, metadata: Dict[str, Any], is_image: bool = True) -> bool:
         """
@@ -102,14 +343,23 @@ class MetadataWriter:
         - People/Keywords: XMP-dc:subject[], IPTC:Keywords[]
         - Title: XMP-dc:title, IPTC:ObjectName
         """
+        jobs = MetadataWriter._build_jobs(file_path, metadata, is_image)
+        if not jobs:
+            return True
+        # Embedded and sidecar writes go to exiftool as one transaction
+        return MetadataWriter._run_exiftool_multi(file_path, jobs)
+    
+    @staticmethod
+    def _build_tags(metadata: Dict[str, Any], is_image: bool) -> Dict[str, str]:
+        """Map logical metadata onto the exiftool tags to write."""
         tags = {}
+        date_tags, title_tags, notes_tags, people_tags, city_tags, country_tags = (
+            _IMAGE_TAG_SETS if is_image else _VIDEO_TAG_SETS
+        )
         
         # Event date - write to all specified tags
         event_date = metadata.get('eventDate')
         if event_date:
-            from backend.utils.timestamp import parse_event_date
-            from datetime import datetime
-            
             # Parse date string if needed
             if isinstance(event_date, str):
                 dt = parse_event_date(event_date)
@@ -127,11 +377,8 @@ class MetadataWriter:
             
             if formatted_date:
                 # Write to all date tags as specified
-                tags['XMP-exif:DateTimeOriginal'] = formatted_date
-                if is_image:
-                    tags['EXIF:DateTimeOriginal'] = formatted_date
-                    tags['EXIF:CreateDate'] = formatted_date
-                    tags['EXIF:ModifyDate'] = formatted_date
+                for tag in date_tags:
+                    tags[tag] = formatted_date
         
         # Custom PhotoMedit fields
         if metadata.get('eventDateDisplay'):
@@ -145,17 +392,15 @@ class MetadataWriter:
         if 'subject' in metadata:
             subject = metadata['subject'] or ''
             if subject:
-                tags['XMP-dc:title'] = subject
-                if is_image:
-                    tags['IPTC:ObjectName'] = subject
+                for tag in title_tags:
+                    tags[tag] = subject
         
         # Notes/Description
         if 'notes' in metadata:
             notes = metadata['notes'] or ''
             if notes:
-                tags['XMP-dc:description'] = notes
-                if is_image:
-                    tags['IPTC:Caption-Abstract'] = notes
+                for tag in notes_tags:
+                    tags[tag] = notes
         
         # People (Keywords)
         if 'people' in metadata:
@@ -165,27 +410,23 @@ class MetadataWriter:
                 # We'll write each person as a separate subject tag
                 people_list = [str(p).strip() for p in people if p and str(p).strip()]
                 if people_list:
-                    # IPTC:Keywords accepts comma-separated or can be written multiple times
+                    # IPTC:Keywords accepts comma-separated or can be written multiple times;
+                    # XMP-dc:subject is written comma-separated too, exiftool will parse as array
                     keywords_str = ','.join(people_list)
-                    if is_image:
-                        tags['IPTC:Keywords'] = keywords_str
-                    
-                    # XMP-dc:subject - write as comma-separated, exiftool will parse as array
-                    tags['XMP-dc:subject'] = ','.join(people_list)
+                    for tag in people_tags:
+                        tags[tag] = keywords_str
         
         # Location
         if 'locationName' in metadata:
             location = metadata['locationName'] or ''
             if location:
-                city, country = MetadataWriter._parse_location_name(location)
+                city, country = _parse_location_name(location)
                 if city:
-                    tags['XMP-photoshop:City'] = city
-                    if is_image:
-                        tags['IPTC:City'] = city
+                    for tag in city_tags:
+                        tags[tag] = city
                 if country:
-                    tags['XMP-photoshop:Country'] = country
-                    if is_image:
-                        tags['IPTC:Country-PrimaryLocationName'] = country
+                    for tag in country_tags:
+                        tags[tag] = country
         
         # GPS coordinates
         if 'locationCoords' in metadata and metadata['locationCoords']:
@@ -200,57 +441,41 @@ class MetadataWriter:
         # This keeps workflow data separate from archival metadata
         
         # Review status - use XMP:UserComment with PhotoMedit prefix
-        # Only use UserComment if it's different from Notes (to avoid overwriting Notes stored in UserComment)
+        # Only use UserComment if it's different from Notes (to avoid overwriting Notes stored in UserComment);
+        # that check runs inside exiftool, see _REVIEW_CONDITION
         # Format: "PhotoMedit:reviewed" or "PhotoMedit:unreviewed"
         if 'reviewStatus' in metadata:
             review_value = str(metadata['reviewStatus']).lower()
-            
-            # Read existing UserComment and Notes to check if UserComment is being used for Notes
-            from backend.media.metadata_reader import MetadataReader as MR
-            existing_exif = MR._run_exiftool(file_path, ['-XMP:UserComment', '-XMP:Description', '-IPTC:Caption-Abstract'])
-            existing_user_comment = (existing_exif.get('XMP:UserComment', '') if existing_exif else '') or ''
-            existing_notes = (
-                (existing_exif.get('XMP:Description', '') if existing_exif else '') or
-                (existing_exif.get('IPTC:Caption-Abstract', '') if existing_exif else '') or
-                ''
-            )
-            
-            # Only write to UserComment if it's empty, PhotoMedit-prefixed, or different from Notes
-            notes_in_usercomment = (
-                existing_user_comment and 
-                existing_notes and 
-                existing_user_comment.strip() == existing_notes.strip()
-            )
-            
-            if not notes_in_usercomment or existing_user_comment.startswith('PhotoMedit:'):
-                tags['XMP:UserComment'] = f'PhotoMedit:{review_value}'
+            tags[_REVIEW_TAG] = f'PhotoMedit:{review_value}'
+        
+        return tags
+    
+    @staticmethod
+    def _build_jobs(file_path: str, metadata: Dict[str, Any], is_image: bool) -> List[Tuple[Dict[str, str], bool]]:
+        """Work out the (tags, write_sidecar) writes needed for one file."""
+        tags = MetadataWriter._build_tags(metadata, is_image)
         
-        # Write to file
         if is_image:
             # Determine if this is a RAW file (needs sidecar) or standard image (embedded only)
             ext = Path(file_path).suffix.lower()
             raw_extensions = {'.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng', '.rw2', '.srw', '.pef', '.x3f'}
             is_raw = ext in raw_extensions
             
-            # Write to embedded metadata first (all tags)
-            embedded_success = MetadataWriter._run_exiftool(file_path, tags, write_sidecar=False)
+            jobs = []
             
             # Only create sidecar for RAW files (JPGs and other standard formats support embedded XMP)
             if is_raw:
-                # Also write XMP tags to sidecar file for RAW files
-                # Extract only XMP tags for sidecar
-                xmp_tags = {k: v for k, v in tags.items() if k.startswith('XMP')}
-                if xmp_tags:
-                    sidecar_success = MetadataWriter._run_exiftool(file_path, xmp_tags, write_sidecar=True)
-                else:
-                    sidecar_success = True  # No XMP tags to write
-                return embedded_success and sidecar_success
-            else:
-                # For JPGs and other standard formats, embedded metadata only (no sidecar)
-                return embedded_success
+                # Also write XMP tags to sidecar file for RAW files (_build_args keeps only the XMP ones)
+                # Skip rewriting a sidecar that already holds exactly these tags
+                if any(k.startswith('XMP') for k in tags) and not _sidecar_up_to_date(file_path, tags):
+                    jobs.append((tags, True))
+            
+            # Embedded metadata gets all tags; written after the sidecar so the review
+            # status condition sees the same (pre-write) file for both
+            jobs.append((tags, False))
+            return jobs
         else:
             # For videos, write primarily to sidecar (XMP tags only)
-            xmp_tags = {k: v for k, v in tags.items() if k.startswith('XMP')}
-            if xmp_tags:
-                return MetadataWriter._run_exiftool(file_path, xmp_tags, write_sidecar=True)
-            return True
+            if any(k.startswith('XMP') for k in tags) and not _sidecar_up_to_date(file_path, tags):
+                return [(tags, True)]
+            return []
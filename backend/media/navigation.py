@@ -1,7 +1,21 @@
 """Media navigation utilities."""
+import os
 from typing import Optional, List, Dict, Any
 from backend.libraries.filesystem import scan_media_files
+from backend.media.index import get_media_index
 from backend.media.metadata_reader import MetadataReader
+from backend.utils.pools import lazy_pool
+
+
+# Shared pool for metadata reads; they spend their time waiting on exiftool,
+# so threads are enough
+get_metadata_pool = lazy_pool('metadata-read', os.cpu_count() or 4)
+
+
+def read_review_statuses(paths: List[str]) -> List[str]:
+    """Review status for each path, several files at a time."""
+    # Unchanged files come from the reader's cache
+    return list(get_metadata_pool().map(MetadataReader.read_review_status, paths))
 
 
 class MediaNavigator:
@@ -10,41 +24,34 @@ class MediaNavigator:
     @staticmethod
     def get_media_list(root_path: str, relative_path: str = "", review_status_filter: str = 'unreviewed') -> List[Dict[str, Any]]:
         """Get list of media files with metadata."""
+        index = get_media_index()
+        if index is not None:
+            return index.list_folder(root_path, relative_path, review_status_filter)
+        
         media_files = scan_media_files(root_path, relative_path)
+        
+        # Read even for 'all': entries carry the status, as the index's listings do
         media_list = []
+        review_statuses = read_review_statuses([mf['path'] for mf in media_files])
         
-        for mf in media_files:
-            # Read metadata to check review status
-            metadata = MetadataReader.read_logical_metadata(mf['path'])
-            review_status = metadata.get('reviewStatus', 'unreviewed')
-            
-            # Apply filter
+        for mf, review_status in zip(media_files, review_statuses):
+            # Apply filter: 'reviewed' shows only reviewed images, 'unreviewed' shows
+            # all images that are NOT reviewed (including those without status)
             if review_status_filter == 'all':
-                # Show all images
+                include = True
+            elif review_status_filter == 'reviewed':
+                include = review_status == 'reviewed'
+            elif review_status_filter == 'unreviewed':
+                include = review_status != 'reviewed'
+            else:
+                include = False
+            if include:
                 media_list.append({
                     'path': mf['path'],
                     'relativePath': mf['relativePath'],
                     'filename': mf['filename'],
                     'reviewStatus': review_status
                 })
-            elif review_status_filter == 'reviewed':
-                # Show only reviewed images
-                if review_status == 'reviewed':
-                    media_list.append({
-                        'path': mf['path'],
-                        'relativePath': mf['relativePath'],
-                        'filename': mf['filename'],
-                        'reviewStatus': review_status
-                    })
-            elif review_status_filter == 'unreviewed':
-                # Show all images that are NOT reviewed (including those without status)
-                if review_status != 'reviewed':
-                    media_list.append({
-                        'path': mf['path'],
-                        'relativePath': mf['relativePath'],
-                        'filename': mf['filename'],
-                        'reviewStatus': review_status
-                    })
         
         return media_list
     
@@ -62,6 +69,10 @@ class MediaNavigator:
         """
         # Get all media in the same folder
         folder_path = '/'.join(current_relative_path.split('/')[:-1])
+        index = get_media_index()
+        if index is not None:
+            return index.neighbor(root_path, folder_path, current_relative_path, direction, review_status_filter)
+        
         media_list = MediaNavigator.get_media_list(root_path, folder_path, review_status_filter)
         
         # Find current index
@@ -84,4 +95,11 @@ class MediaNavigator:
                 return media_list[current_idx - 1]['relativePath']
         
         return None
-
+    
+    @staticmethod
+    def invalidate(root_path: str, relative_path: str):
+        """Drop cached listing state for the folder containing relative_path."""
+        folder = '/'.join(relative_path.split('/')[:-1])
+        index = get_media_index()
+        if index is not None:
+            index.invalidate(root_path, folder)
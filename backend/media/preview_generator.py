@@ -1,11 +1,149 @@
 """Preview and thumbnail generator."""
+import io
 import os
+import shutil
 import hashlib
 import subprocess
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 from PIL import Image
 import rawpy
+from backend.utils.file_io import ensure_dir, forget_dir
+
+try:
+    # Optional: libvips shrinks on load and resizes with SIMD in tiles,
+    # much faster and leaner than Pillow for large sources
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+
+
+# The preview route serves these as they are, so they never need a generated preview
+DIRECT_PREVIEW_EXTS = frozenset({'.jpg', '.jpeg'})
+
+
+@lru_cache(maxsize=65536)
+def _path_hash(media_path: str) -> str:
+    """Cache key for a media path; a grid page asks for the same paths over and over."""
+    # blake2b is fast and in the standard library; changing the hash would orphan every cached file
+    return hashlib.blake2b(media_path.encode(), digest_size=16).hexdigest()
+
+
+# The flat layout before sharding: cache_root/<size>/<md5>_<mtime>_<size>.jpg. Shard
+# directories are two hex characters, so these names never clash with them
+_LEGACY_CACHE_DIRS = ('thumb', 'preview')
+
+
+def remove_legacy_cache_dirs(cache_root: str) -> Optional[threading.Thread]:
+    """
+    Delete the cache directories of the pre-sharding layout, which nothing reads anymore.
+    
+    Runs in a background thread, since an old cache can hold many files; returns
+    the thread, or None if there was nothing to delete.
+    """
+    legacy = [os.path.join(cache_root, name) for name in _LEGACY_CACHE_DIRS]
+    legacy = [path for path in legacy if os.path.isdir(path)]
+    if not legacy:
+        return None
+    
+    def remove():
+        for path in legacy:
+            shutil.rmtree(path, ignore_errors=True)
+    
+    thread = threading.Thread(target=remove, name='legacy-cache-cleanup', daemon=True)
+    thread.start()
+    return thread
+
+
+# jpegoptim, when installed, shrinks cached JPEGs losslessly after Pillow writes them
+_JPEGOPTIM = shutil.which('jpegoptim')
+
+
+def _optimize_jpeg(cache_path: str):
+    """Strip metadata and re-encode Huffman tables in place; best effort."""
+    if _JPEGOPTIM is None:
+        return
+    try:
+        subprocess.run(
+            [_JPEGOPTIM, '--strip-all', '--all-progressive', '-q', cache_path],
+            stdin=subprocess.DEVNULL, capture_output=True, timeout=5
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+
+
+def _vips_resize(source_path: str, cache_path: str, max_size: Tuple[int, int], quality: int) -> bool:
+    """Resize a regular image file straight to a cached JPEG with libvips; False to fall back to Pillow."""
+    if pyvips is None:
+        return False
+    try:
+        # no_rotate keeps the orientation the same as the Pillow path produces
+        img = pyvips.Image.thumbnail(source_path, max_size[0], height=max_size[1], size='down', no_rotate=True)
+        if img.hasalpha():
+            img = img.flatten(background=[255, 255, 255])
+        if img.interpretation != 'srgb':
+            img = img.colourspace('srgb')
+        ensure_dir(os.path.dirname(cache_path))
+        img.jpegsave(cache_path, Q=quality, strip=True, optimize_coding=True)
+        return True
+    except pyvips.Error:
+        return False
+
+
+# libraw's flip value -> the PIL transpose that puts the embedded preview upright
+_RAW_FLIP_TRANSPOSE = {
+    3: Image.Transpose.ROTATE_180,
+    5: Image.Transpose.ROTATE_90,
+    6: Image.Transpose.ROTATE_270,
+}
+
+
+def _load_raw_image(raw_path: str, max_size: Tuple[int, int]) -> Image.Image:
+    """Load a RAW file for resizing, preferring the camera's embedded JPEG preview."""
+    with rawpy.imread(raw_path) as raw:
+        # Almost every RAW embeds a full-size preview; decoding it skips demosaicing entirely
+        try:
+            thumb = raw.extract_thumb()
+        except (rawpy.LibRawNoThumbnailError, rawpy.LibRawUnsupportedThumbnailError):
+            thumb = None
+        
+        img = None
+        if thumb is not None and thumb.format == rawpy.ThumbFormat.JPEG:
+            img = Image.open(io.BytesIO(thumb.data))
+            # Let libjpeg scale down while decoding; the result is still at least max_size
+            img.draft('RGB', max_size)
+        elif thumb is not None and thumb.format == rawpy.ThumbFormat.BITMAP:
+            img = Image.fromarray(thumb.data)
+        
+        if img is not None and max(img.size) >= max(max_size):
+            transpose = _RAW_FLIP_TRANSPOSE.get(raw.sizes.flip)
+            if transpose is not None:
+                img = img.transpose(transpose)
+            return img if img.mode == 'RGB' else img.convert('RGB')
+        
+        # No usable preview: half-size decode is still plenty for thumbnails and previews
+        rgb = raw.postprocess(half_size=True, use_camera_wb=True)
+        return Image.fromarray(rgb)
+
+
+def _load_regular_image(image_path: str, max_size: Tuple[int, int]) -> Image.Image:
+    """Open a non-RAW image as RGB, decoding no more pixels than max_size needs."""
+    img = Image.open(image_path)
+    # For JPEGs, libjpeg scales by 1/2-1/8 while decoding instead of
+    # decoding every pixel; no-op for other formats
+    img.draft('RGB', max_size)
+    # Convert to RGB if necessary
+    if img.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+    return img
 
 
 class PreviewGenerator:
@@ -15,26 +153,29 @@ class PreviewGenerator:
         self.cache_root = cache_root
         os.makedirs(cache_root, exist_ok=True)
     
-    def _get_cache_path(self, media_path: str, size: str = 'thumb') -> str:
+    def _get_cache_path(self, media_path: str, size: str = 'thumb', mtime: Optional[float] = None) -> str:
         """Get cache path for a media file."""
         # Create hash-based cache key
-        path_hash = hashlib.md5(media_path.encode()).hexdigest()
-        try:
-            mtime = os.path.getmtime(media_path)
-        except OSError:
-            # If file doesn't exist or can't access, use 0 as mtime
-            mtime = 0
+        path_hash = _path_hash(media_path)
+        if mtime is None:
+            try:
+                mtime = os.path.getmtime(media_path)
+            except OSError:
+                # If file doesn't exist or can't access, use 0 as mtime
+                mtime = 0
         cache_key = f"{path_hash}_{int(mtime)}_{size}"
         
-        # Use a single cache directory (not organized by date) for better persistence
-        cache_dir = os.path.join(self.cache_root, size)
-        os.makedirs(cache_dir, exist_ok=True)
+        # Shard by hash prefix (cache_root/ab/cd/) so no directory grows without bound;
+        # the lookup stays deterministic, independent of when the file was cached.
+        # Lookups don't create the directory; writers call ensure_dir first
+        cache_dir = os.path.join(self.cache_root, path_hash[:2], path_hash[2:4])
         
         return os.path.join(cache_dir, f"{cache_key}.jpg")
     
-    def has_thumbnail(self, media_path: str) -> bool:
+    def has_thumbnail(self, media_path: str, mtime: Optional[float] = None) -> bool:
         """Check if thumbnail exists in cache without generating it."""
-        cache_path = self._get_cache_path(media_path, 'thumb')
+        # Callers that already stat'ed the file (e.g. scan_media_files) pass mtime in
+        cache_path = self._get_cache_path(media_path, 'thumb', mtime)
         return os.path.exists(cache_path)
     
     def generate_image_thumbnail(self, image_path: str, max_size: Tuple[int, int] = (300, 300)) -> Optional[str]:
@@ -51,34 +192,86 @@ class PreviewGenerator:
             # For JPEGs, we can serve directly, but generate thumbnail for consistency
             # Handle RAW files
             if ext in ['.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng']:
-                with rawpy.imread(image_path) as raw:
-                    rgb = raw.postprocess()
-                    img = Image.fromarray(rgb)
+                img = _load_raw_image(image_path, max_size)
+            elif _vips_resize(image_path, cache_path, max_size, 85):
+                _optimize_jpeg(cache_path)
+                return cache_path
             else:
                 # Regular image
-                img = Image.open(image_path)
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
+                img = _load_regular_image(image_path, max_size)
             
             # Resize maintaining aspect ratio
             img.thumbnail(max_size, Image.Resampling.LANCZOS)
             
             # Save to cache
+            ensure_dir(os.path.dirname(cache_path))
             img.save(cache_path, 'JPEG', quality=85)
+            _optimize_jpeg(cache_path)
             return cache_path
             
         except Exception as e:
             import logging
             logging.error(f"Thumbnail generation failed for {image_path}: {e}")
+            forget_dir(os.path.dirname(cache_path))
             return None
     
+    def generate_all(
+        self,
+        media_path: str,
+        is_image: bool = True,
+        thumb_size: Tuple[int, int] = (300, 300),
+        preview_size: Tuple[int, int] = (1920, 1920)
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Generate thumbnail and preview from a single decode of the source.
+        
+        Returns (thumbnail_path, preview_path); either is None if it couldn't be made.
+        """
+        if not is_image:
+            # Videos use one extracted frame for both
+            thumb_path = self.generate_video_thumbnail(media_path, thumb_size)
+            return thumb_path, thumb_path
+        
+        try:
+            mtime = os.path.getmtime(media_path)
+        except OSError:
+            return None, None
+        thumb_path = self._get_cache_path(media_path, 'thumb', mtime)
+        preview_path = self._get_cache_path(media_path, 'preview', mtime)
+        have_thumb = os.path.exists(thumb_path)
+        have_preview = os.path.exists(preview_path)
+        if have_thumb and have_preview:
+            return thumb_path, preview_path
+        
+        try:
+            ext = Path(media_path).suffix.lower()
+            if ext in ['.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng']:
+                img = _load_raw_image(media_path, preview_size)
+            else:
+                img = _load_regular_image(media_path, preview_size)
+            
+            # Largest first, then shrink the already-reduced image for the thumbnail
+            img.thumbnail(preview_size, Image.Resampling.LANCZOS)
+            if not have_preview:
+                ensure_dir(os.path.dirname(preview_path))
+                img.save(preview_path, 'JPEG', quality=90)
+                _optimize_jpeg(preview_path)
+            if not have_thumb:
+                img.thumbnail(thumb_size, Image.Resampling.LANCZOS)
+                ensure_dir(os.path.dirname(thumb_path))
+                img.save(thumb_path, 'JPEG', quality=85)
+                _optimize_jpeg(thumb_path)
+            return thumb_path, preview_path
+        except Exception as e:
+            import logging
+            logging.error(f"Thumbnail/preview generation failed for {media_path}: {e}")
+            forget_dir(os.path.dirname(thumb_path))
+            forget_dir(os.path.dirname(preview_path))
+            return (
+                thumb_path if os.path.exists(thumb_path) else None,
+                preview_path if os.path.exists(preview_path) else None
+            )
+    
     def has_video_thumbnail(self, video_path: str) -> bool:
         """Check if video thumbnail exists in cache without generating it."""
         cache_path = self._get_cache_path(video_path, 'thumb')
@@ -93,33 +286,28 @@ class PreviewGenerator:
             return cache_path
         
         try:
-            # Get video duration
-            probe_cmd = [
-                'ffprobe', '-v', 'error', '-show_entries',
-                'format=duration', '-of', 'default=noprint_wrappers=1:nokey=1',
-                video_path
-            ]
-            result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=10)
-            duration = float(result.stdout.strip()) if result.returncode == 0 else 1.0
-            
-            # Extract frame at 10% of duration
-            seek_time = duration * 0.1
-            
-            # Extract frame
-            extract_cmd = [
-                'ffmpeg', '-i', video_path,
-                '-ss', str(seek_time),
-                '-vframes', '1',
-                '-vf', f'scale={max_size[0]}:{max_size[1]}:force_original_aspect_ratio=decrease',
-                '-y', cache_path
-            ]
-            
-            result = subprocess.run(extract_cmd, capture_output=True, timeout=30)
-            if result.returncode == 0 and os.path.exists(cache_path):
-                return cache_path
+            ensure_dir(os.path.dirname(cache_path))
+            # One ffmpeg run, no ffprobe: seeking before -i jumps to a keyframe near 1s
+            # without decoding from the start; clips shorter than that fall back to the first frame
+            for seek_time in ('1', '0'):
+                # Thumbnail workers already run in parallel, so decode and encode
+                # single-threaded (-threads before and after -i) to avoid oversubscribing
+                extract_cmd = [
+                    'ffmpeg', '-ss', seek_time, '-noaccurate_seek', '-threads', '1', '-i', video_path,
+                    '-frames:v', '1', '-an', '-sn',
+                    '-vf', f'scale={max_size[0]}:{max_size[1]}:force_original_aspect_ratio=decrease',
+                    '-threads', '1',
+                    '-y', cache_path
+                ]
+                
+                result = subprocess.run(extract_cmd, capture_output=True, timeout=30)
+                if result.returncode == 0 and os.path.exists(cache_path):
+                    _optimize_jpeg(cache_path)
+                    return cache_path
         except Exception:
             pass
         
+        forget_dir(os.path.dirname(cache_path))
         return None
     
     def generate_preview(self, media_path: str, is_image: bool = True, max_size: Tuple[int, int] = (1920, 1920)) -> Optional[str]:
@@ -135,27 +323,23 @@ class PreviewGenerator:
                 ext = Path(media_path).suffix.lower()
                 
                 if ext in ['.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng']:
-                    with rawpy.imread(media_path) as raw:
-                        rgb = raw.postprocess()
-                        img = Image.fromarray(rgb)
+                    img = _load_raw_image(media_path, max_size)
+                elif _vips_resize(media_path, cache_path, max_size, 90):
+                    _optimize_jpeg(cache_path)
+                    return cache_path
                 else:
-                    img = Image.open(media_path)
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        background = Image.new('RGB', img.size, (255, 255, 255))
-                        if img.mode == 'P':
-                            img = img.convert('RGBA')
-                        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                        img = background
-                    elif img.mode != 'RGB':
-                        img = img.convert('RGB')
+                    img = _load_regular_image(media_path, max_size)
                 
                 # Resize maintaining aspect ratio
                 img.thumbnail(max_size, Image.Resampling.LANCZOS)
                 
                 # Save to cache
+                ensure_dir(os.path.dirname(cache_path))
                 img.save(cache_path, 'JPEG', quality=90)
+                _optimize_jpeg(cache_path)
                 return cache_path
             except Exception:
+                forget_dir(os.path.dirname(cache_path))
                 return None
         else:
             # For videos, return thumbnail as preview for now
@@ -1,22 +1,72 @@
 """Media routes."""
-from flask import Blueprint, request, jsonify, send_file, current_app
+from flask import Blueprint, request, jsonify, send_file, current_app, Response
 from backend.config.loader import Config
+from backend.libraries.filesystem import IMAGE_EXTENSIONS
 from backend.media.metadata_reader import MetadataReader
 from backend.media.metadata_writer import MetadataWriter
-from backend.media.preview_generator import PreviewGenerator
+from backend.media.preview_generator import PreviewGenerator, DIRECT_PREVIEW_EXTS
 from backend.media.navigation import MediaNavigator
 from backend.security.sanitizer import PathSanitizer
-from backend.utils.geocoding import GeocodingService
+from backend.utils.geocoding import get_geocoding_service
 from backend.utils.corrections import get_correction, add_correction, clear_correction
 from backend.utils.publishing import get_publish_info
+from backend.utils.sidecar import get_sidecar_path
 from backend.validation.schemas import MediaUpdateRequest, NavigateQuery
 from pydantic import ValidationError
+from functools import lru_cache
+from urllib.parse import quote
+from typing import Optional
+import mimetypes
 import os
+import stat
 
 
 media_bp = Blueprint('media', __name__)
 
 
+# Browser cache lifetime for thumbnails and previews. Not "immutable": the URL
+# stays the same when the file changes, so after this the browser revalidates
+# with If-None-Match and gets a 304 unless the file changed.
+IMAGE_MAX_AGE = 3600
+# Longest a thumbnail request waits for a background worker already generating it
+THUMBNAIL_WAIT_TIMEOUT = 30
+# A large JPEG can stand in for its own thumbnail, so its request waits only briefly
+JPEG_THUMBNAIL_WAIT_TIMEOUT = 0.5
+
+
+def _send_file(path: str, mimetype: str = None, as_attachment: bool = False, max_age: int = None):
+    """send_file, or hand the transfer to nginx when accelRedirectPrefix is configured."""
+    config = current_app.config.get('PHOTOMEDIT_CONFIG')
+    prefix = getattr(config, 'accel_redirect_prefix', None)
+    if not prefix:
+        # send_file sets an ETag from the file's mtime/size and answers
+        # If-None-Match / If-Modified-Since with 304 itself
+        response = send_file(path, mimetype=mimetype, as_attachment=as_attachment, max_age=max_age)
+        if max_age is not None:
+            # Media sits behind authentication, so only the user's browser may cache it
+            response.cache_control.public = False
+            response.cache_control.private = True
+        return response
+    
+    # nginx sends the file with sendfile(2) and handles ETag/304 itself; the worker only writes headers
+    response = Response()
+    if max_age is not None:
+        response.headers['Cache-Control'] = f'private, max-age={max_age}'
+
+    response.headers['X-Accel-Redirect'] = quote(prefix.rstrip('/') + os.path.abspath(path))
+    response.headers['Content-Type'] = mimetype or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if as_attachment:
+        filename = os.path.basename(path)
+        try:
+            filename.encode('ascii')
+            response.headers.set('Content-Disposition', 'attachment', filename=filename)
+        except UnicodeEncodeError:
+            # Headers are latin-1; use the RFC 5987 form for other names, as send_file does
+            response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    return response
+
+
+@lru_cache(maxsize=8192)
 def _parse_media_id(media_id: str) -> tuple:
     """Parse media ID into library_id and relative_path."""
     if '|' not in media_id:
@@ -39,12 +89,56 @@ def _get_media_path(library_id: str, relative_path: str) -> tuple:
     if not is_valid:
         return None, None, {'error': 'validation_error', 'message': error}, 400
     
-    if not os.path.exists(resolved_path) or not os.path.isfile(resolved_path):
+    # One stat answers both "exists" and "is a regular file"; kept live on every
+    # request (not cached) so moved or rejected files are noticed immediately
+    try:
+        is_file = stat.S_ISREG(os.stat(resolved_path).st_mode)
+    except OSError:
+        is_file = False
+    if not is_file:
         return None, None, {'error': 'not_found', 'message': 'Media file not found'}, 404
     
     return resolved_path, library, None, None
 
 
+def _get_thumbnail(preview_gen: PreviewGenerator, config, media_path: str, is_image: bool) -> Optional[str]:
+    """Cached thumbnail path, generating it if needed; None on failure."""
+    cache_path = preview_gen._get_cache_path(media_path, 'thumb')
+    if os.path.exists(cache_path):
+        return cache_path
+    
+    # The listing usually queued this file already; don't decode it twice at once
+    try:
+        from backend.media.thumbnail_worker import get_thumbnail_worker
+        worker = get_thumbnail_worker(config.thumbnail_cache_root)
+        thumbnail_path = worker.wait_or_cancel(media_path, timeout=THUMBNAIL_WAIT_TIMEOUT)
+        if thumbnail_path:
+            return thumbnail_path
+    except Exception:
+        pass  # Non-critical, generate here
+    
+    if is_image:
+        return preview_gen.generate_image_thumbnail(media_path)
+    return preview_gen.generate_video_thumbnail(media_path)
+
+
+def _get_jpeg_thumbnail(preview_gen: PreviewGenerator, config, media_path: str) -> Optional[str]:
+    """Cached thumbnail for a JPEG, or None if the original should be served instead."""
+    cache_path = preview_gen._get_cache_path(media_path, 'thumb')
+    if os.path.exists(cache_path):
+        return cache_path
+    
+    # Never decode here: the worker makes it for next time, and this request only
+    # takes it if that finishes almost at once
+    try:
+        from backend.media.thumbnail_worker import get_thumbnail_worker
+        worker = get_thumbnail_worker(config.thumbnail_cache_root)
+        worker.queue_thumbnail(media_path, True)
+        return worker.wait(media_path, timeout=JPEG_THUMBNAIL_WAIT_TIMEOUT)
+    except Exception:
+        return None
+
+
 @media_bp.route('/media/<path:media_id>', methods=['GET'])
 def get_media(media_id: str):
     """Get media detail."""
@@ -58,8 +152,7 @@ def get_media(media_id: str):
     
     # Determine media type
     ext = os.path.splitext(media_path)[1].lower()
-    image_exts = {'.jpg', '.jpeg', '.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng', '.tif', '.tiff'}
-    is_image = ext in image_exts
+    is_image = ext in IMAGE_EXTENSIONS
     
     # Read metadata
     logical_metadata = MetadataReader.read_logical_metadata(media_path)
@@ -67,8 +160,13 @@ def get_media(media_id: str):
     
     # Generate preview URL
     config = current_app.config.get('PHOTOMEDIT_CONFIG')
-    preview_gen = PreviewGenerator(config.thumbnail_cache_root)
-    preview_path = preview_gen.generate_preview(media_path, is_image)
+    if is_image and ext in DIRECT_PREVIEW_EXTS:
+        # Served as the preview directly, so there is nothing to generate
+        preview_path = media_path
+    else:
+        preview_gen = PreviewGenerator(config.thumbnail_cache_root)
+        # Decoding once for both means the grid thumbnail comes for free
+        _, preview_path = preview_gen.generate_all(media_path, is_image)
     preview_url = f"/api/media/{media_id}/preview" if preview_path else None
     
     # Get correction data from CSV file (not from image metadata)
@@ -120,30 +218,28 @@ def get_preview(media_id: str):
     
     # Determine media type
     ext = os.path.splitext(media_path)[1].lower()
-    image_exts = {'.jpg', '.jpeg', '.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng', '.tif', '.tiff'}
-    is_image = ext in image_exts
+    is_image = ext in IMAGE_EXTENSIONS
     
     # Generate preview
     config = current_app.config.get('PHOTOMEDIT_CONFIG')
     preview_gen = PreviewGenerator(config.thumbnail_cache_root)
     
     if is_image:
-        ext = os.path.splitext(media_path)[1].lower()
         # For JPEGs, serve directly for preview (no need to generate)
-        if ext in ['.jpg', '.jpeg']:
-            return send_file(media_path, mimetype='image/jpeg')
+        if ext in DIRECT_PREVIEW_EXTS:
+            return _send_file(media_path, mimetype='image/jpeg', max_age=IMAGE_MAX_AGE)
         else:
             # For RAW files, generate preview
             preview_path = preview_gen.generate_preview(media_path, is_image=True)
             if not preview_path or not os.path.exists(preview_path):
                 return jsonify({'error': 'internal_error', 'message': 'Failed to generate preview'}), 500
-            return send_file(preview_path, mimetype='image/jpeg')
+            return _send_file(preview_path, mimetype='image/jpeg', max_age=IMAGE_MAX_AGE)
     else:
         # For videos, return thumbnail as preview
         preview_path = preview_gen.generate_video_thumbnail(media_path)
         if not preview_path or not os.path.exists(preview_path):
             return jsonify({'error': 'internal_error', 'message': 'Failed to generate preview'}), 500
-        return send_file(preview_path, mimetype='image/jpeg')
+        return _send_file(preview_path, mimetype='image/jpeg', max_age=IMAGE_MAX_AGE)
 
 
 @media_bp.route('/media/<path:media_id>/thumbnail', methods=['GET'])
@@ -159,8 +255,7 @@ def get_thumbnail(media_id: str):
     
     # Determine media type
     ext = os.path.splitext(media_path)[1].lower()
-    image_exts = {'.jpg', '.jpeg', '.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng', '.tif', '.tiff'}
-    is_image = ext in image_exts
+    is_image = ext in IMAGE_EXTENSIONS
     
     # Generate thumbnail
     config = current_app.config.get('PHOTOMEDIT_CONFIG')
@@ -173,50 +268,19 @@ def get_thumbnail(media_id: str):
             # Check file size - if small enough, serve directly
             file_size = os.path.getsize(media_path)
             if file_size < 5 * 1024 * 1024:  # Less than 5MB, serve directly
-                return send_file(media_path, mimetype='image/jpeg')
-            # Otherwise check for cached thumbnail first
-            thumbnail_path = preview_gen.generate_image_thumbnail(media_path)
-            if thumbnail_path and os.path.exists(thumbnail_path):
-                return send_file(thumbnail_path, mimetype='image/jpeg')
-            # If no cached thumbnail, queue it for background generation and serve original
-            try:
-                from backend.media.thumbnail_worker import queue_thumbnail_generation
-                queue_thumbnail_generation(media_path, is_image=True, thumbnail_cache_root=config.thumbnail_cache_root)
-            except Exception:
-                pass  # Non-critical, just serve original
-            return send_file(media_path, mimetype='image/jpeg')
-        else:
-            # For RAW and other formats, check for cached thumbnail first
-            thumbnail_path = preview_gen.generate_image_thumbnail(media_path)
+                return _send_file(media_path, mimetype='image/jpeg', max_age=IMAGE_MAX_AGE)
+            thumbnail_path = _get_jpeg_thumbnail(preview_gen, config, media_path)
             if thumbnail_path and os.path.exists(thumbnail_path):
-                return send_file(thumbnail_path, mimetype='image/jpeg')
-            # If no cached thumbnail, queue it for background generation
-            try:
-                from backend.media.thumbnail_worker import queue_thumbnail_generation
-                queue_thumbnail_generation(media_path, is_image=True, thumbnail_cache_root=config.thumbnail_cache_root)
-            except Exception:
-                pass  # Non-critical
-            # For now, try to generate synchronously as fallback (will be slow)
-            thumbnail_path = preview_gen.generate_image_thumbnail(media_path)
-            if not thumbnail_path or not os.path.exists(thumbnail_path):
-                return jsonify({'error': 'internal_error', 'message': 'Failed to generate thumbnail'}), 500
-            return send_file(thumbnail_path, mimetype='image/jpeg')
-    else:
-        # For videos, check for cached thumbnail first
-        thumbnail_path = preview_gen.generate_video_thumbnail(media_path)
-        if thumbnail_path and os.path.exists(thumbnail_path):
-            return send_file(thumbnail_path, mimetype='image/jpeg')
-        # If no cached thumbnail, queue it for background generation
-        try:
-            from backend.media.thumbnail_worker import queue_thumbnail_generation
-            queue_thumbnail_generation(media_path, is_image=False, thumbnail_cache_root=config.thumbnail_cache_root)
-        except Exception:
-            pass  # Non-critical
-        # For now, try to generate synchronously as fallback (will be slow)
-        thumbnail_path = preview_gen.generate_video_thumbnail(media_path)
-        if not thumbnail_path or not os.path.exists(thumbnail_path):
-            return jsonify({'error': 'internal_error', 'message': 'Failed to generate thumbnail'}), 500
-        return send_file(thumbnail_path, mimetype='image/jpeg')
+                return _send_file(thumbnail_path, mimetype='image/jpeg', max_age=IMAGE_MAX_AGE)
+            # No thumbnail yet, serve original; uncached, so the grid picks up the
+            # thumbnail once the worker has made it
+            return _send_file(media_path, mimetype='image/jpeg', max_age=0)
+    
+    # RAW, other image formats and videos
+    thumbnail_path = _get_thumbnail(preview_gen, config, media_path, is_image)
+    if not thumbnail_path or not os.path.exists(thumbnail_path):
+        return jsonify({'error': 'internal_error', 'message': 'Failed to generate thumbnail'}), 500
+    return _send_file(thumbnail_path, mimetype='image/jpeg', max_age=IMAGE_MAX_AGE)
 
 
 @media_bp.route('/media/<path:media_id>/download', methods=['GET'])
@@ -230,7 +294,7 @@ def download_media(media_id: str):
     if error_dict:
         return jsonify(error_dict), status
     
-    return send_file(media_path, as_attachment=True)
+    return _send_file(media_path, as_attachment=True)
 
 
 @media_bp.route('/media/<path:media_id>', methods=['PATCH'])
@@ -245,15 +309,17 @@ def update_media(media_id: str):
         return jsonify(error_dict), status
     
     # Validate request body
+    body = request.get_json(silent=True)
+    if body is None:
+        return jsonify({'error': 'validation_error', 'message': 'Request body must be valid JSON'}), 400
     try:
-        update_data = MediaUpdateRequest(**request.get_json() or {})
+        update_data = MediaUpdateRequest.model_validate(body)
     except ValidationError as e:
         return jsonify({'error': 'validation_error', 'message': str(e)}), 400
     
     # Determine media type
     ext = os.path.splitext(media_path)[1].lower()
-    image_exts = {'.jpg', '.jpeg', '.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng', '.tif', '.tiff'}
-    is_image = ext in image_exts
+    is_image = ext in IMAGE_EXTENSIONS
     
     # Convert to dict, excluding None values
     metadata = update_data.model_dump(exclude_none=True)
@@ -283,20 +349,22 @@ def update_media(media_id: str):
             return jsonify({'error': 'correction_write_failed', 'message': 'Failed to save correction flag'}), 500
     
     # Check if we should mark as reviewed when saving
-    mark_reviewed = request.get_json().get('markReviewed', False) if request.get_json() else False
+    mark_reviewed = body.get('markReviewed', False)
     if mark_reviewed:
         metadata['reviewStatus'] = 'reviewed'
     
     # Geocode location if locationName is provided and locationCoords is not
     if 'locationName' in metadata and 'locationCoords' not in metadata:
         config = current_app.config.get('PHOTOMEDIT_CONFIG')
-        geocoding = GeocodingService(config)
+        geocoding = get_geocoding_service(config)
         coords = geocoding.geocode(metadata['locationName'])
         if coords:
             metadata['locationCoords'] = coords
     
     # Write metadata
     success = MetadataWriter.write_metadata(media_path, metadata, is_image)
+    # The write may have changed review status, so the folder listing is stale either way
+    MediaNavigator.invalidate(library['rootPath'], relative_path)
     if not success:
         return jsonify({'error': 'metadata_write_failed', 'message': 'Failed to write metadata'}), 500
     
@@ -321,9 +389,8 @@ def reject_media(media_id: str):
         # Get the library root path
         root_path = Path(library['rootPath'])
         
-        # Create .rejected folder in library root if it doesn't exist
+        # .rejected folder in library root
         rejected_folder = root_path / '.rejected'
-        rejected_folder.mkdir(exist_ok=True)
         
         # Get the source file path
         source_path = Path(media_path)
@@ -331,21 +398,27 @@ def reject_media(media_id: str):
         # Determine destination path in .rejected folder
         # Preserve folder structure by including parent folder name
         parent_folder = source_path.parent.name if source_path.parent != root_path else ''
-        if parent_folder:
-            dest_folder = rejected_folder / parent_folder
-            dest_folder.mkdir(exist_ok=True)
-            dest_path = dest_folder / source_path.name
-        else:
-            dest_path = rejected_folder / source_path.name
+        dest_folder = rejected_folder / parent_folder if parent_folder else rejected_folder
+        dest_folder.mkdir(parents=True, exist_ok=True)
+        dest_path = dest_folder / source_path.name
+        
+        def move(src, dst):
+            # .rejected is inside the library, so this is normally a single rename;
+            # shutil.move only for the odd case of a mount point in between
+            try:
+                os.replace(src, dst)
+            except OSError:
+                shutil.move(str(src), str(dst))
         
         # Move the file
-        shutil.move(str(source_path), str(dest_path))
+        move(source_path, dest_path)
         
         # Also move sidecar file if it exists
-        sidecar_path = source_path.with_suffix(source_path.suffix + '.xmp')
-        if sidecar_path.exists():
-            dest_sidecar = dest_path.with_suffix(dest_path.suffix + '.xmp')
-            shutil.move(str(sidecar_path), str(dest_sidecar))
+        sidecar_path = get_sidecar_path(str(source_path))
+        if os.path.exists(sidecar_path):
+            move(sidecar_path, get_sidecar_path(str(dest_path)))
+        
+        MediaNavigator.invalidate(library['rootPath'], relative_path)
         
         return jsonify({'message': 'Media file moved to rejected folder'}), 200
         
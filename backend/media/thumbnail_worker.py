@@ -1,95 +1,201 @@
 """Background worker for generating thumbnails asynchronously."""
 import os
 import threading
-import queue
 import logging
-from typing import Optional
-from backend.media.preview_generator import PreviewGenerator
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, List, Tuple
+from backend.media.preview_generator import PreviewGenerator, DIRECT_PREVIEW_EXTS
 
 logger = logging.getLogger(__name__)
 
 
+# PreviewGenerator for the cache root, one per pool process
+_process_preview_gen: Optional[PreviewGenerator] = None
+
+
+def _generate_thumbnail(media_path: str, is_image: bool, thumbnail_cache_root: str) -> Optional[str]:
+    """Process pool entry point: generate one thumbnail, returning its cache path."""
+    global _process_preview_gen
+    if _process_preview_gen is None or _process_preview_gen.cache_root != thumbnail_cache_root:
+        _process_preview_gen = PreviewGenerator(thumbnail_cache_root)
+    if is_image and os.path.splitext(media_path)[1].lower() in DIRECT_PREVIEW_EXTS:
+        return _process_preview_gen.generate_image_thumbnail(media_path)
+    # One decode makes the preview too, so opening the item later doesn't decode again
+    thumb_path, _ = _process_preview_gen.generate_all(media_path, is_image)
+    return thumb_path
+
+
 class ThumbnailWorker:
     """Background worker that processes thumbnail generation tasks."""
     
+    # Tasks allowed to wait at once; beyond this the oldest waiting task is dropped
+    # (a grid scrolled past doesn't need its thumbnails first)
+    MAX_PENDING = 1000
+    
     def __init__(self, thumbnail_cache_root: str, max_workers: int = 2):
         self.thumbnail_cache_root = thumbnail_cache_root
         self.max_workers = max_workers
-        self.task_queue = queue.Queue()
-        self.workers = []
+        self.pool: Optional[ProcessPoolExecutor] = None
         self.running = False
         self.preview_gen = PreviewGenerator(thumbnail_cache_root)
+        # Paths queued or being generated -> their future (None while submitting), oldest first;
+        # repeated requests for a path don't queue duplicates
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+    
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # Decoding and resizing are CPU-bound, so each worker gets its own process.
+        # spawn rather than fork: the app process has threads (and locks) of its own
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'))
     
     def start(self):
-        """Start the worker threads."""
+        """Start the worker processes."""
         if self.running:
             return
         
         self.running = True
-        for i in range(self.max_workers):
-            worker = threading.Thread(target=self._worker_loop, daemon=True, name=f"ThumbnailWorker-{i}")
-            worker.start()
-            self.workers.append(worker)
-        logger.info(f"Started {self.max_workers} thumbnail worker threads")
+        self.pool = self._new_pool()
+        logger.info(f"Started thumbnail worker pool with {self.max_workers} processes")
     
     def stop(self):
-        """Stop the worker threads."""
+        """Stop the worker processes, dropping tasks that haven't started."""
         self.running = False
-        # Add None sentinels to wake up workers
-        for _ in range(self.max_workers):
-            self.task_queue.put(None)
-        for worker in self.workers:
-            worker.join(timeout=5)
-        self.workers.clear()
-        logger.info("Stopped thumbnail worker threads")
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+        with self._inflight_lock:
+            self._inflight.clear()
+        logger.info("Stopped thumbnail worker pool")
     
     def queue_thumbnail(self, media_path: str, is_image: bool = True):
         """Queue a thumbnail generation task."""
-        if not os.path.exists(media_path):
-            logger.warning(f"Cannot queue thumbnail for non-existent file: {media_path}")
+        self.queue_batch([(media_path, is_image)])
+    
+    def queue_batch(self, items: List[Tuple[str, bool]]):
+        """Queue thumbnail generation for (media_path, is_image) pairs, e.g. a whole listing."""
+        if not self.running:
+            logger.warning(f"Thumbnail worker is not running, not queueing {len(items)} thumbnail(s)")
             return
         
-        # Check if thumbnail already exists
-        cache_path = self.preview_gen._get_cache_path(media_path, 'thumb')
-        if os.path.exists(cache_path):
-            logger.debug(f"Thumbnail already exists for {media_path}, skipping")
-            return
+        missing = []
+        for media_path, is_image in items:
+            # One stat both checks the file exists and gives the cache key's mtime
+            try:
+                mtime = os.path.getmtime(media_path)
+            except OSError:
+                logger.warning(f"Cannot queue thumbnail for non-existent file: {media_path}")
+                continue
+            
+            # Check if thumbnail already exists
+            cache_path = self.preview_gen._get_cache_path(media_path, 'thumb', mtime)
+            if os.path.exists(cache_path):
+                logger.debug(f"Thumbnail already exists for {media_path}, skipping")
+                continue
+            missing.append((media_path, is_image))
         
-        self.task_queue.put({
-            'media_path': media_path,
-            'is_image': is_image
-        })
+        # Reserve slots for the whole batch under one lock acquisition
+        queued = []
+        with self._inflight_lock:
+            for media_path, is_image in missing:
+                if media_path in self._inflight:
+                    logger.debug(f"Thumbnail already queued for {media_path}, skipping")
+                    continue
+                if len(queued) >= self.MAX_PENDING:
+                    # The rest of a very large listing is generated on demand
+                    break
+                self._inflight[media_path] = None
+                queued.append((media_path, is_image))
+            overflow = len(self._inflight) - self.MAX_PENDING
+        for _ in range(max(overflow, 0)):
+            self._drop_oldest()
+        
+        for media_path, is_image in queued:
+            self._submit(media_path, is_image)
+    
+    def _submit(self, media_path: str, is_image: bool):
+        """Submit a task whose in-flight slot is already reserved."""
+        try:
+            future = self.pool.submit(_generate_thumbnail, media_path, is_image, self.thumbnail_cache_root)
+        except BrokenProcessPool:
+            # A worker process died (e.g. killed for memory); start a fresh pool
+            logger.error("Thumbnail worker pool broke, restarting it")
+            self.pool = self._new_pool()
+            future = self.pool.submit(_generate_thumbnail, media_path, is_image, self.thumbnail_cache_root)
+        except Exception:
+            with self._inflight_lock:
+                self._inflight.pop(media_path, None)
+            raise
+        with self._inflight_lock:
+            if media_path in self._inflight:
+                self._inflight[media_path] = future
+        future.add_done_callback(lambda f: self._task_done(media_path, f))
         logger.debug(f"Queued thumbnail generation for {media_path}")
     
-    def _worker_loop(self):
-        """Worker thread loop."""
-        while self.running:
-            try:
-                task = self.task_queue.get(timeout=1)
-                if task is None:  # Sentinel to stop
-                    break
-                
-                media_path = task['media_path']
-                is_image = task['is_image']
-                
-                try:
-                    if is_image:
-                        self.preview_gen.generate_image_thumbnail(media_path)
-                    else:
-                        self.preview_gen.generate_video_thumbnail(media_path)
-                    logger.info(f"Generated thumbnail for {media_path}")
-                except Exception as e:
-                    logger.error(f"Failed to generate thumbnail for {media_path}: {e}", exc_info=True)
-                finally:
-                    self.task_queue.task_done()
-            except queue.Empty:
-                continue
-            except Exception as e:
-                logger.error(f"Error in thumbnail worker: {e}", exc_info=True)
+    def wait_or_cancel(self, media_path: str, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Hand a thumbnail over to a request that is about to generate it itself.
+        
+        Waits for the result if a worker is already generating it, otherwise cancels
+        the queued task. Returns the thumbnail path, or None if the caller should generate it.
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(media_path)
+        # A task still waiting behind the rest of a listing would be slower than decoding now
+        if future is None or future.cancel():
+            return None
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return None
+    
+    def wait(self, media_path: str, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Wait for a queued or running thumbnail without taking it over.
+        
+        Returns the thumbnail path, or None if there is no task for the path or it
+        doesn't finish in time (it keeps going in the background).
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(media_path)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return None
+    
+    def _drop_oldest(self):
+        """Cancel the oldest task that hasn't started yet."""
+        with self._inflight_lock:
+            futures = [f for f in self._inflight.values() if f is not None]
+        for future in futures:
+            # cancel() fails for tasks already running; the done-callback releases the slot
+            if future.cancel():
+                logger.debug("Thumbnail queue full, dropped oldest pending task")
+                return
+    
+    def _task_done(self, media_path: str, future: Future):
+        """Log the outcome of a task and release its in-flight slot."""
+        with self._inflight_lock:
+            # None: the task finished before queue_thumbnail stored its future
+            if self._inflight.get(media_path, future) in (None, future):
+                self._inflight.pop(media_path, None)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Failed to generate thumbnail for {media_path}: {error}")
+        elif future.result() is None:
+            logger.warning(f"Thumbnail generation produced no output for {media_path}")
+        else:
+            logger.info(f"Generated thumbnail for {media_path}")
     
     def get_queue_size(self) -> int:
         """Get the number of pending tasks."""
-        return self.task_queue.qsize()
+        with self._inflight_lock:
+            return len(self._inflight)
 
 
 # Global worker instance
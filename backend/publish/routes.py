@@ -1,26 +1,33 @@
 """Publish to DAM routes."""
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, current_app
 from backend.security.sanitizer import PathSanitizer
 from backend.utils.publishing import (
-    publish_file, publish_multiple, is_published, get_publish_info
+    publish_file, publish_multiple, is_published, get_publish_info, get_published_file_path
 )
+from backend.utils.responses import ojsonify
 import os
 
 publish_bp = Blueprint('publish', __name__)
 
+# Browser cache lifetime for the DAM settings
+PUBLISH_CONFIG_MAX_AGE = 300
+
 
 @publish_bp.route('/publish/config', methods=['GET'])
 def get_publish_config():
     """Get DAM configuration for the frontend."""
     config = current_app.config.get('PHOTOMEDIT_CONFIG')
     if not config:
-        return jsonify({'error': 'internal_error', 'message': 'Configuration not available'}), 500
+        return ojsonify({'error': 'internal_error', 'message': 'Configuration not available'}), 500
     
-    return jsonify({
+    response = ojsonify({
         'enabled': config.dam_enabled,
         'name': config.dam_name,
         'url': config.dam_url
-    }), 200
+    })
+    # DAM settings only change with the config file, which is read at startup
+    response.headers['Cache-Control'] = f'private, max-age={PUBLISH_CONFIG_MAX_AGE}'
+    return response, 200
 
 
 @publish_bp.route('/publish', methods=['POST'])
@@ -36,20 +43,20 @@ def publish_media():
     """
     config = current_app.config.get('PHOTOMEDIT_CONFIG')
     if not config:
-        return jsonify({'error': 'internal_error', 'message': 'Configuration not available'}), 500
+        return ojsonify({'error': 'internal_error', 'message': 'Configuration not available'}), 500
     
     if not config.dam_enabled:
-        return jsonify({'error': 'not_configured', 'message': 'DAM integration is not enabled'}), 400
+        return ojsonify({'error': 'not_configured', 'message': 'DAM integration is not enabled'}), 400
     
     if not config.dam_folder_path:
-        return jsonify({'error': 'not_configured', 'message': 'DAM folder path is not configured'}), 400
+        return ojsonify({'error': 'not_configured', 'message': 'DAM folder path is not configured'}), 400
     
     data = request.get_json() or {}
     media_ids = data.get('mediaIds', [])
     preserve_structure = data.get('preserveFolderStructure', True)
     
     if not media_ids:
-        return jsonify({'error': 'validation_error', 'message': 'No media IDs provided'}), 400
+        return ojsonify({'error': 'validation_error', 'message': 'No media IDs provided'}), 400
     
     # Get current user
     username = getattr(request, 'current_user', 'unknown')
@@ -57,6 +64,8 @@ def publish_media():
     # Resolve media IDs to file paths
     source_paths = []
     errors = []
+    # A batch is usually from one library: look each library up once
+    libraries = {}
     
     for media_id in media_ids:
         if '|' not in media_id:
@@ -64,7 +73,9 @@ def publish_media():
             continue
         
         library_id, relative_path = media_id.split('|', 1)
-        library = config.get_library(library_id)
+        if library_id not in libraries:
+            libraries[library_id] = config.get_library(library_id)
+        library = libraries[library_id]
         
         if not library:
             errors.append({'mediaId': media_id, 'error': 'Library not found'})
@@ -82,7 +93,7 @@ def publish_media():
         source_paths.append(resolved_path)
     
     if not source_paths:
-        return jsonify({
+        return ojsonify({
             'error': 'validation_error',
             'message': 'No valid files to publish',
             'errors': errors
@@ -100,7 +111,7 @@ def publish_media():
     if errors:
         result['errors'] = errors
     
-    return jsonify(result), 200
+    return ojsonify(result), 200
 
 
 @publish_bp.route('/publish/status/<path:media_id>', methods=['GET'])
@@ -108,38 +119,49 @@ def get_publish_status(media_id: str):
     """Check if a media file has been published."""
     config = current_app.config.get('PHOTOMEDIT_CONFIG')
     if not config:
-        return jsonify({'error': 'internal_error', 'message': 'Configuration not available'}), 500
+        return ojsonify({'error': 'internal_error', 'message': 'Configuration not available'}), 500
     
     if '|' not in media_id:
-        return jsonify({'error': 'validation_error', 'message': 'Invalid media ID format'}), 400
+        return ojsonify({'error': 'validation_error', 'message': 'Invalid media ID format'}), 400
     
     library_id, relative_path = media_id.split('|', 1)
     library = config.get_library(library_id)
     
     if not library:
-        return jsonify({'error': 'not_found', 'message': 'Library not found'}), 404
+        return ojsonify({'error': 'not_found', 'message': 'Library not found'}), 404
     
     is_valid, resolved_path, error = PathSanitizer.sanitize_path(library['rootPath'], relative_path)
     if not is_valid:
-        return jsonify({'error': 'validation_error', 'message': error}), 400
+        return ojsonify({'error': 'validation_error', 'message': error}), 400
     
     folder_path = os.path.dirname(resolved_path)
     filename = os.path.basename(resolved_path)
     
-    publish_info = get_publish_info(folder_path, filename)
-    
-    if publish_info:
-        return jsonify({
-            'isPublished': True,
-            'publishedAt': publish_info.get('publishedAt'),
-            'publishedBy': publish_info.get('username'),
-            'damName': publish_info.get('damName'),
-            'damPath': publish_info.get('damPath')
-        }), 200
+    # published.csv's stat is the version of every status in the folder: a poll that
+    # already has it gets a 304 without the CSV being read
+    try:
+        csv_stat = os.stat(get_published_file_path(folder_path))
+        etag = f"{csv_stat.st_mtime_ns:x}-{csv_stat.st_size:x}"
+    except OSError:
+        etag = 'unpublished'
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
     else:
-        return jsonify({
-            'isPublished': False
-        }), 200
-
-
-
+        publish_info = get_publish_info(folder_path, filename)
+        
+        if publish_info:
+            response = ojsonify({
+                'isPublished': True,
+                'publishedAt': publish_info.get('publishedAt'),
+                'publishedBy': publish_info.get('username'),
+                'damName': publish_info.get('damName'),
+                'damPath': publish_info.get('damPath')
+            })
+        else:
+            response = ojsonify({
+                'isPublished': False
+            })
+    response.set_etag(etag)
+    # Always revalidate: a publish from any worker changes the file, and so the ETag
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -1,40 +1,135 @@
 """Search routes."""
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, current_app, Response
 from backend.config.loader import Config
-from backend.libraries.filesystem import scan_media_files
+from backend.libraries.filesystem import scan_media_files, IMAGE_EXTENSIONS
 from backend.media.metadata_reader import MetadataReader
 from backend.media.preview_generator import PreviewGenerator
 from backend.security.sanitizer import PathSanitizer
 from backend.validation.schemas import SearchQuery
+from backend.utils.pools import lazy_pool
+from backend.utils.responses import ojsonify
 from pydantic import ValidationError
+from typing import Optional, Dict, Any
+import logging
+import orjson
 import os
+import threading
+
+logger = logging.getLogger(__name__)
 
 
 search_bp = Blueprint('search', __name__)
 
 
+# Shared pool for per-file search work; metadata reads wait on exiftool and
+# Pillow releases the GIL while decoding
+get_search_pool = lazy_pool('search', os.cpu_count() or 4)
+
+
+# (path, mtime) of files this process has already made a thumbnail for; repeat searches
+# skip the cache lookup (and the generator) for them
+_known_thumbnails = set()
+_known_thumbnails_lock = threading.Lock()
+_KNOWN_THUMBNAILS_MAX = 50_000
+
+
+def _ensure_thumbnail(mf: Dict[str, Any], is_image: bool, preview_gen: PreviewGenerator) -> bool:
+    """Make sure the file has a cached thumbnail; False if it couldn't be generated."""
+    key = (mf['path'], mf['mtime'])
+    if key in _known_thumbnails:
+        return True
+    
+    if is_image:
+        thumbnail_path = preview_gen.generate_image_thumbnail(mf['path'])
+    else:
+        thumbnail_path = preview_gen.generate_video_thumbnail(mf['path'])
+    if not thumbnail_path:
+        return False
+    
+    with _known_thumbnails_lock:
+        if len(_known_thumbnails) >= _KNOWN_THUMBNAILS_MAX:
+            _known_thumbnails.clear()
+        _known_thumbnails.add(key)
+    return True
+
+
+def _search_result(mf: Dict[str, Any], query: SearchQuery, preview_gen: PreviewGenerator) -> Optional[Dict[str, Any]]:
+    """Result entry for one media file, or None if it doesn't match the query."""
+    # Determine media type
+    ext = mf['extension'].lower()
+    is_image = ext in IMAGE_EXTENSIONS
+    
+    # Read metadata
+    metadata = MetadataReader.read_logical_metadata(mf['path'])
+    
+    # Apply filters
+    if query.reviewStatus != 'all':
+        file_review_status = metadata.get('reviewStatus', 'unreviewed')
+        if file_review_status != query.reviewStatus:
+            return None
+    
+    if query.hasSubject is not None:
+        has_subject = bool(metadata.get('subject'))
+        if has_subject != query.hasSubject:
+            return None
+    
+    if query.hasNotes is not None:
+        has_notes = bool(metadata.get('notes'))
+        if has_notes != query.hasNotes:
+            return None
+    
+    if query.hasPeople is not None:
+        has_people = bool(metadata.get('people'))
+        if has_people != query.hasPeople:
+            return None
+    
+    # Generate thumbnail URL (only for files that passed the filters); without
+    # up-front generation the URL is always given and generates on demand
+    has_thumbnail = not query.thumbnails or _ensure_thumbnail(mf, is_image, preview_gen)
+    
+    # Build media ID
+    media_id = f"{query.libraryId}|{mf['relativePath']}"
+    
+    thumbnail_url = None
+    if has_thumbnail:
+        thumbnail_url = f"/api/media/{media_id}/thumbnail"
+    
+    return {
+        'id': media_id,
+        'filename': mf['filename'],
+        'relativePath': mf['relativePath'],
+        'mediaType': 'image' if is_image else 'video',
+        'thumbnailUrl': thumbnail_url,
+        'eventDate': metadata.get('eventDate'),
+        'hasSubject': bool(metadata.get('subject')),
+        'hasNotes': bool(metadata.get('notes')),
+        'hasPeople': bool(metadata.get('people')),
+        'reviewStatus': metadata.get('reviewStatus', 'unreviewed')
+    }
+
+
 @search_bp.route('/search', methods=['GET'])
 def search():
     """Search for media files."""
     config = current_app.config.get('PHOTOMEDIT_CONFIG')
     if not config:
-        return jsonify({'error': 'internal_error', 'message': 'Configuration not available'}), 500
+        return ojsonify({'error': 'internal_error', 'message': 'Configuration not available'}), 500
     
     # Validate query parameters
     try:
         query = SearchQuery(**request.args)
     except ValidationError as e:
-        return jsonify({'error': 'validation_error', 'message': str(e)}), 400
+        return ojsonify({'error': 'validation_error', 'message': str(e)}), 400
     
     library = config.get_library(query.libraryId)
     if not library:
-        return jsonify({'error': 'not_found', 'message': 'Library not found'}), 404
+        return ojsonify({'error': 'not_found', 'message': 'Library not found'}), 404
     
     # Get folder path
     folder_path = query.folder or ""
     is_valid, resolved_path, error = PathSanitizer.sanitize_path(library['rootPath'], folder_path)
     if not is_valid:
-        return jsonify({'error': 'validation_error', 'message': error}), 400
+        return ojsonify({'error': 'validation_error', 'message': error}), 400
     
     # Scan media files
     media_files = scan_media_files(library['rootPath'], folder_path)
@@ -42,65 +137,26 @@ def search():
     # Generate preview generator
     preview_gen = PreviewGenerator(config.thumbnail_cache_root)
     
-    # Filter results
-    results = []
-    for mf in media_files:
-        # Read metadata
-        metadata = MetadataReader.read_logical_metadata(mf['path'])
-        
-        # Apply filters
-        if query.reviewStatus != 'all':
-            file_review_status = metadata.get('reviewStatus', 'unreviewed')
-            if file_review_status != query.reviewStatus:
-                continue
-        
-        if query.hasSubject is not None:
-            has_subject = bool(metadata.get('subject'))
-            if has_subject != query.hasSubject:
-                continue
-        
-        if query.hasNotes is not None:
-            has_notes = bool(metadata.get('notes'))
-            if has_notes != query.hasNotes:
-                continue
-        
-        if query.hasPeople is not None:
-            has_people = bool(metadata.get('people'))
-            if has_people != query.hasPeople:
-                continue
-        
-        # Determine media type
-        ext = mf['extension'].lower()
-        image_exts = {'.jpg', '.jpeg', '.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng', '.tif', '.tiff'}
-        is_image = ext in image_exts
-        
-        # Generate thumbnail URL
-        thumbnail_path = None
-        if is_image:
-            thumbnail_path = preview_gen.generate_image_thumbnail(mf['path'])
-        else:
-            thumbnail_path = preview_gen.generate_video_thumbnail(mf['path'])
-        
-        thumbnail_url = None
-        if thumbnail_path:
-            media_id = f"{query.libraryId}|{mf['relativePath']}"
-            thumbnail_url = f"/api/media/{media_id}/thumbnail"
-        
-        # Build media ID
-        media_id = f"{query.libraryId}|{mf['relativePath']}"
-        
-        results.append({
-            'id': media_id,
-            'filename': mf['filename'],
-            'relativePath': mf['relativePath'],
-            'mediaType': 'image' if is_image else 'video',
-            'thumbnailUrl': thumbnail_url,
-            'eventDate': metadata.get('eventDate'),
-            'hasSubject': bool(metadata.get('subject')),
-            'hasNotes': bool(metadata.get('notes')),
-            'hasPeople': bool(metadata.get('people')),
-            'reviewStatus': metadata.get('reviewStatus', 'unreviewed')
-        })
-    
-    return jsonify(results), 200
+    def search_one(mf):
+        # The 200 is sent before the first result, so an error here can't become an
+        # error response; skip the file rather than cut the JSON array short
+        try:
+            return _search_result(mf, query, preview_gen)
+        except Exception as e:
+            logger.error(f"Search failed for {mf['path']}: {e}", exc_info=True)
+            return None
+    
+    # Filter results; map keeps results in scan order
+    results = get_search_pool().map(search_one, media_files)
+    
+    def generate():
+        # Stream the JSON array as results come in instead of building it all first
+        separator = b'['
+        for result in results:
+            if result is not None:
+                yield separator + orjson.dumps(result)
+                separator = b','
+        yield b'[]' if separator == b'[' else b']'
+    
+    return Response(generate(), status=200, mimetype='application/json')
 
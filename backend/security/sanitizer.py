@@ -1,9 +1,20 @@
 """Path sanitization utilities."""
 import os
 from pathlib import Path
+from functools import lru_cache
 from typing import Tuple, Optional
 
 
+# Characters replaced with '_' in filenames
+_DANGEROUS_CHARS = str.maketrans({'/': '_', '\\': '_', '\x00': '_'})
+
+
+@lru_cache(maxsize=4096)
+def _resolve_root(root_path: str) -> Path:
+    """Resolved library root; roots don't move while the app runs."""
+    return Path(root_path).resolve()
+
+
 class PathSanitizer:
     """Sanitize and validate file paths."""
     
@@ -36,7 +47,9 @@ class PathSanitizer:
                     return False, None, "Invalid path"
             
             # Resolve against root
-            root = Path(root_path).resolve()
+            # Only the root is cached: the rest must be resolved each time so a symlink
+            # changed since the last call can't slip past the containment checks
+            root = _resolve_root(root_path)
             resolved = (root / normalized).resolve()
             
             # Ensure resolved path is still within root
@@ -62,11 +75,9 @@ class PathSanitizer:
     @staticmethod
     def sanitize_filename(filename: str) -> str:
         """Sanitize a filename by removing dangerous characters."""
-        # Remove path separators and dangerous characters
-        dangerous = ['/', '\\', '..', '\x00']
-        sanitized = filename
-        for char in dangerous:
-            sanitized = sanitized.replace(char, '_')
+        # Remove path separators and dangerous characters (one pass for the
+        # single characters; replacing them can't create a new '..')
+        sanitized = filename.translate(_DANGEROUS_CHARS).replace('..', '_')
         
         # Remove leading/trailing dots and spaces
         sanitized = sanitized.strip('. ')
@@ -1,25 +1,46 @@
 """Upload routes per upload-download.md specification."""
-from flask import Blueprint, request, jsonify, current_app, g
+from flask import Blueprint, request, current_app, g
 from backend.config.loader import Config
 from backend.security.sanitizer import PathSanitizer
+from backend.libraries.filesystem import IMAGE_EXTENSIONS
 from backend.media.metadata_reader import MetadataReader
+from backend.media.thumbnail_worker import queue_thumbnail_generation
 from backend.database.log_service import LogService
 from backend.utils.file_io import create_directory_with_permissions
+from backend.utils.pools import lazy_pool
+from backend.utils.responses import ojsonify
 from flask import request as flask_request
 import os
 import re
+import stat
 import magic
-import tempfile
-import shutil
+import threading
+import time
 from datetime import datetime
-from pathlib import Path
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 upload_bp = Blueprint('upload', __name__)
 
+# Read size for copying an upload to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Uploads at least this large get their disk space reserved before writing
+PREALLOCATE_MIN_BYTES = 16 * 1024 * 1024
 
+
+# Post-upload metadata imports run here, apart from the pool serving listings
+POST_UPLOAD_WORKERS = 2
+get_post_upload_pool = lazy_pool('post-upload', POST_UPLOAD_WORKERS)
+
+
+# Characters not allowed in upload batch directory names
+_UNSAFE_UPLOAD_NAME_CHARS = re.compile(r'[^a-z0-9_-]')
+
+
+@lru_cache(maxsize=1024)
 def sanitize_upload_name(name: str) -> str:
     """Sanitize upload name for directory creation."""
     # Lowercase
@@ -27,7 +48,7 @@ def sanitize_upload_name(name: str) -> str:
     # Replace spaces with hyphens
     sanitized = sanitized.replace(' ', '-')
     # Remove unsafe characters (keep alphanumeric, hyphens, underscores)
-    sanitized = re.sub(r'[^a-z0-9_-]', '', sanitized)
+    sanitized = _UNSAFE_UPLOAD_NAME_CHARS.sub('', sanitized)
     # Remove leading/trailing hyphens and underscores
     sanitized = sanitized.strip('-_')
     # Limit length
@@ -39,30 +60,121 @@ def sanitize_upload_name(name: str) -> str:
     return sanitized
 
 
-def get_unique_filename(directory: str, filename: str) -> str:
-    """Get a unique filename, appending numeric suffix if needed."""
-    # Ensure directory exists
-    if not os.path.exists(directory):
-        raise ValueError(f"Directory does not exist: {directory}")
-    if not os.path.isdir(directory):
-        raise ValueError(f"Path is not a directory: {directory}")
+# Upload target folders found or created recently -> monotonic expiry; repeat uploads
+# into the same folder skip the stat (or the makedirs/chown/chmod). The batch directory
+# listing below still catches a folder removed in the meantime
+_KNOWN_DIR_TTL = 30.0
+_known_dirs: Dict[str, float] = {}
+_known_dirs_lock = threading.Lock()
+
+
+def _dir_known(path: str) -> bool:
+    with _known_dirs_lock:
+        expiry = _known_dirs.get(path)
+    return expiry is not None and time.monotonic() < expiry
+
+
+def _remember_dir(path: str):
+    now = time.monotonic()
+    with _known_dirs_lock:
+        if len(_known_dirs) >= 1024:
+            for stale in [p for p, expiry in _known_dirs.items() if expiry <= now]:
+                del _known_dirs[stale]
+        _known_dirs[path] = now + _KNOWN_DIR_TTL
+
+
+def _forget_dir(path: str) -> bool:
+    """Drop a cached folder; True if it was cached."""
+    with _known_dirs_lock:
+        return _known_dirs.pop(path, None) is not None
+
+
+def open_unique_file(directory: str, filename: str, existing_names: set) -> Tuple[int, str]:
+    """
+    Create a file under a unique name in directory, appending numeric suffix if needed.
+    
+    The file is created with O_EXCL, so two uploads into the same folder can't both
+    claim a name. Returns the open (write-only) fd and the name; the caller writes
+    the file through the fd.
+    existing_names is a snapshot of the directory's entries used to skip names known
+    to be taken; claimed names are added to it.
+    """
+    name, ext = os.path.splitext(filename)
+    counter = 0
+    candidate = filename
     
-    base_path = os.path.join(directory, filename)
-    if not os.path.exists(base_path):
-        return filename
+    while True:
+        if candidate not in existing_names:
+            try:
+                fd = os.open(os.path.join(directory, candidate), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                pass
+            else:
+                existing_names.add(candidate)
+                return fd, candidate
+            existing_names.add(candidate)
+        counter += 1
+        if counter > 10000:  # Safety limit
+            raise ValueError("Too many filename conflicts")
+        candidate = f"{name}-{counter}{ext}"
+
+
+def link_unique_file(temp_path: str, directory: str, filename: str, existing_names: set) -> str:
+    """
+    Give a finished temp file a unique name in directory, appending numeric suffix if needed.
     
-    # Split name and extension
+    Each candidate is claimed with os.link, which fails if the name exists, so two
+    uploads into the same folder can't both take a name and the name only ever
+    appears with the complete file behind it. The caller unlinks temp_path afterwards.
+    existing_names works as for open_unique_file.
+    """
     name, ext = os.path.splitext(filename)
-    counter = 1
+    counter = 0
+    candidate = filename
     
     while True:
-        new_filename = f"{name}-{counter}{ext}"
-        new_path = os.path.join(directory, new_filename)
-        if not os.path.exists(new_path):
-            return new_filename
+        if candidate not in existing_names:
+            try:
+                os.link(temp_path, os.path.join(directory, candidate))
+            except FileExistsError:
+                pass
+            else:
+                existing_names.add(candidate)
+                return candidate
+            existing_names.add(candidate)
         counter += 1
         if counter > 10000:  # Safety limit
             raise ValueError("Too many filename conflicts")
+        candidate = f"{name}-{counter}{ext}"
+
+
+_magic: Optional[magic.Magic] = None
+_magic_lock = threading.Lock()
+
+
+def _get_magic() -> magic.Magic:
+    """Shared libmagic handle; opening one loads the whole magic database."""
+    # Magic.from_buffer serializes calls on the handle with its own lock
+    global _magic
+    if _magic is None:
+        with _magic_lock:
+            if _magic is None:
+                _magic = magic.Magic(mime=True)
+    return _magic
+
+
+# Allowed image types
+_IMAGE_MIME_TYPES = frozenset({
+    'image/jpeg', 'image/jpg', 'image/tiff', 'image/x-tiff',
+    'image/x-canon-cr2', 'image/x-canon-cr3', 'image/x-olympus-orf',
+    'image/x-nikon-nef', 'image/x-fuji-raf', 'image/x-sony-arw',
+    'image/x-adobe-dng', 'image/x-panasonic-rw2'
+})
+
+# Allowed video types
+_VIDEO_MIME_TYPES = frozenset({
+    'video/mp4', 'video/quicktime', 'video/x-m4v'
+})
 
 
 def validate_file_type_binary(file_content: bytes) -> tuple:
@@ -72,39 +184,120 @@ def validate_file_type_binary(file_content: bytes) -> tuple:
     
     # Use python-magic for binary detection
     try:
-        mime = magic.Magic(mime=True)
-        file_type = mime.from_buffer(file_content[:8192])  # Peek at first 8KB
+        file_type = _get_magic().from_buffer(file_content[:8192])  # Peek at first 8KB
     except Exception as e:
         logger.error(f"Magic detection failed: {e}")
         return False, None
     
-    # Allowed image types
-    image_types = {
-        'image/jpeg', 'image/jpg', 'image/tiff', 'image/x-tiff',
-        'image/x-canon-cr2', 'image/x-canon-cr3', 'image/x-olympus-orf',
-        'image/x-nikon-nef', 'image/x-fuji-raf', 'image/x-sony-arw',
-        'image/x-adobe-dng', 'image/x-panasonic-rw2'
-    }
-    
-    # Allowed video types
-    video_types = {
-        'video/mp4', 'video/quicktime', 'video/x-m4v'
-    }
-    
-    if file_type in image_types:
+    if file_type in _IMAGE_MIME_TYPES:
         return True, 'image'
-    elif file_type in video_types:
+    elif file_type in _VIDEO_MIME_TYPES:
         return True, 'video'
     else:
         return False, None
 
 
+# Leading bytes that confirm a file's extension without asking libmagic:
+# extension -> (media type, accepted prefixes)
+_TIFF_SIGNATURES = (b'II*\x00', b'MM\x00*')
+_SIGNATURES = {
+    '.jpg': ('image', (b'\xff\xd8\xff',)),
+    '.jpeg': ('image', (b'\xff\xd8\xff',)),
+    '.tif': ('image', _TIFF_SIGNATURES),
+    '.tiff': ('image', _TIFF_SIGNATURES),
+    # TIFF-based RAW formats
+    '.nef': ('image', _TIFF_SIGNATURES),
+    '.cr2': ('image', _TIFF_SIGNATURES),
+    '.arw': ('image', _TIFF_SIGNATURES),
+    '.dng': ('image', _TIFF_SIGNATURES),
+    '.orf': ('image', (b'IIRO', b'IIRS', b'MMOR')),
+    '.raf': ('image', (b'FUJIFILMCCD-RAW',)),
+}
+
+# ISO base media files ('ftyp' box at offset 4): extension -> (media type, accepted major brands)
+_VIDEO_BRANDS = frozenset({b'isom', b'iso2', b'mp41', b'mp42', b'avc1', b'qt  ', b'M4V ', b'M4VH', b'M4VP'})
+_FTYP_BRANDS = {
+    '.cr3': ('image', frozenset({b'crx '})),
+    '.mp4': ('video', _VIDEO_BRANDS),
+    '.m4v': ('video', _VIDEO_BRANDS),
+    '.mov': ('video', _VIDEO_BRANDS),
+}
+
+
+def validate_file_type(filename: str, file_content: bytes) -> tuple:
+    """
+    Validate file type from its extension and leading bytes.
+    
+    A file whose signature matches its extension is accepted without libmagic;
+    anything else (unknown extension, mismatch, unusual brand) goes through
+    validate_file_type_binary.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    
+    signature = _SIGNATURES.get(ext)
+    if signature is not None and file_content.startswith(signature[1]):
+        return True, signature[0]
+    
+    brands = _FTYP_BRANDS.get(ext)
+    if brands is not None and file_content[4:8] == b'ftyp' and file_content[8:12] in brands[1]:
+        return True, brands[0]
+    
+    return validate_file_type_binary(file_content)
+
+
+def _spooled_fileno(stream) -> Optional[int]:
+    """fd of the temp file Werkzeug spooled an upload to, or None if it is in memory."""
+    # Asking a SpooledTemporaryFile that hasn't rolled over for its fileno would write it out
+    if not getattr(stream, '_rolled', True):
+        return None
+    try:
+        return stream.fileno()
+    except (AttributeError, OSError):
+        return None
+
+
+def _copy_in_kernel(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    """
+    Copy count bytes at offset from src_fd to the same offset in dst_fd without
+    passing them through Python; returns how many bytes were copied.
+    
+    Stops early (and leaves the rest to the caller) if the filesystem or kernel
+    doesn't support copy_file_range between these files.
+    """
+    copied = 0
+    try:
+        while copied < count:
+            n = os.copy_file_range(src_fd, dst_fd, count - copied, offset + copied, offset + copied)
+            if n == 0:
+                break
+            copied += n
+    except OSError as e:
+        logger.debug(f"copy_file_range stopped after {copied} bytes: {e}")
+    return copied
+
+
+def _post_upload(file_path: str, is_image: bool, thumbnail_cache_root: str):
+    """Queue a saved upload's thumbnail and import its metadata; runs off the request."""
+    try:
+        queue_thumbnail_generation(file_path, is_image=is_image, thumbnail_cache_root=thumbnail_cache_root)
+        logger.debug(f"Queued thumbnail generation for {file_path}")
+    except Exception as e:
+        logger.warning(f"Failed to queue thumbnail generation: {e}")
+    
+    try:
+        # Read metadata (this will discover sidecar if present) so it is cached for the UI
+        MetadataReader.read_logical_metadata(file_path)
+    except Exception as e:
+        logger.warning(f"Failed to import metadata for {file_path}: {e}")
+        # Continue anyway - file is uploaded successfully
+
+
 @upload_bp.route('/upload', methods=['POST'])
 def upload_files():
     """Upload media files to uploadRoot with batch naming, or directly to a library folder."""
     config = current_app.config.get('PHOTOMEDIT_CONFIG')
     if not config:
-        return jsonify({'error': 'internal_error', 'message': 'Configuration not available'}), 500
+        return ojsonify({'error': 'internal_error', 'message': 'Configuration not available'}), 500
     
     # Get form data
     upload_name = request.form.get('uploadName', '').strip()
@@ -113,14 +306,16 @@ def upload_files():
     
     logger.info(f"Upload request: uploadName={upload_name}, libraryId={library_id}, folder={folder}")
     
-    # Determine target directory
+    # Determine target directory; files are written straight to their final name only
+    # in a new uploadRoot batch, which nothing else lists while the upload runs
+    direct_write = False
     if library_id:
         # Uploading to a library
         library = config.get_library(library_id)
         if not library:
             logger.error(f"Library not found: {library_id}")
             user = getattr(g, 'current_user', None) or getattr(request, 'current_user', None)
-            LogService.log(
+            LogService.log_async(
                 level='WARNING',
                 message=f"Upload failed: Library not found: {library_id}",
                 logger_name='upload',
@@ -128,97 +323,104 @@ def upload_files():
                 ip_address=flask_request.remote_addr,
                 details={'libraryId': library_id, 'uploadName': upload_name}
             )
-            return jsonify({'error': 'not_found', 'message': f'Library not found: {library_id}'}), 404
+            return ojsonify({'error': 'not_found', 'message': f'Library not found: {library_id}'}), 404
+        root_path = library['rootPath']
         
         if folder:
             # Upload directly to specified library folder
-            is_valid, resolved_path, error = PathSanitizer.sanitize_path(library['rootPath'], folder)
+            is_valid, resolved_path, error = PathSanitizer.sanitize_path(root_path, folder)
             if not is_valid:
-                return jsonify({'error': 'validation_error', 'message': error}), 400
+                return ojsonify({'error': 'validation_error', 'message': error}), 400
             
-            # Ensure the target folder exists
-            if not os.path.exists(resolved_path):
+            # Ensure the target folder exists (usually it does: one stat answers that)
+            if _dir_known(resolved_path):
+                pass
+            elif not os.path.isdir(resolved_path):
+                if os.path.exists(resolved_path):
+                    return ojsonify({'error': 'validation_error', 'message': 'Target path exists but is not a directory'}), 400
                 try:
                     if not create_directory_with_permissions(resolved_path):
                         logger.error(f"Failed to create target folder: {resolved_path}")
-                        return jsonify({'error': 'internal_error', 'message': 'Failed to create target folder'}), 500
+                        return ojsonify({'error': 'internal_error', 'message': 'Failed to create target folder'}), 500
                 except Exception as e:
                     logger.error(f"Failed to create target folder: {e}", exc_info=True)
-                    return jsonify({'error': 'internal_error', 'message': 'Failed to create target folder'}), 500
-            elif not os.path.isdir(resolved_path):
-                return jsonify({'error': 'validation_error', 'message': 'Target path exists but is not a directory'}), 400
+                    return ojsonify({'error': 'internal_error', 'message': 'Failed to create target folder'}), 500
+            _remember_dir(resolved_path)
             
             batch_path = resolved_path
-            target_root = library['rootPath']
+            target_root = root_path
         else:
             # Uploading to library root - create folder from upload name
             if not upload_name:
-                return jsonify({'error': 'validation_error', 'message': 'Upload name is required to create a folder in the library root'}), 400
+                return ojsonify({'error': 'validation_error', 'message': 'Upload name is required to create a folder in the library root'}), 400
             
             if len(upload_name) > 100:
-                return jsonify({'error': 'validation_error', 'message': 'uploadName too long (max 100 characters)'}), 400
+                return ojsonify({'error': 'validation_error', 'message': 'uploadName too long (max 100 characters)'}), 400
             
             # Sanitize upload name and create folder in library root
             sanitized_name = sanitize_upload_name(upload_name)
-            new_folder_path = os.path.join(library['rootPath'], sanitized_name)
-            
-            # Verify library root path exists and is accessible
-            logger.info(f"Library root path: {library['rootPath']}")
-            logger.info(f"Library root exists: {os.path.exists(library['rootPath'])}")
-            logger.info(f"Library root is dir: {os.path.isdir(library['rootPath']) if os.path.exists(library['rootPath']) else 'N/A'}")
-            logger.info(f"Library root readable: {os.access(library['rootPath'], os.R_OK) if os.path.exists(library['rootPath']) else 'N/A'}")
-            logger.info(f"Library root writable: {os.access(library['rootPath'], os.W_OK) if os.path.exists(library['rootPath']) else 'N/A'}")
+            new_folder_path = os.path.join(root_path, sanitized_name)
             
-            # Check if it's a mount point
-            try:
-                import stat
-                root_stat = os.stat(library['rootPath'])
-                logger.info(f"Library root device: {root_stat.st_dev}")
-                # Check parent to see if it's on a different device (mount point)
-                parent_path = os.path.dirname(library['rootPath'])
-                if os.path.exists(parent_path):
-                    parent_stat = os.stat(parent_path)
-                    is_mount = (root_stat.st_dev != parent_stat.st_dev)
-                    logger.info(f"Library root appears to be mount point: {is_mount}")
-            except Exception as e:
-                logger.warning(f"Could not check mount status: {e}")
+            # Mount/permission diagnostics cost several syscalls per upload; only gather them
+            # when debugging (one stat per path, reused for every check)
+            debug = logger.isEnabledFor(logging.DEBUG)
+            root_stat = None
+            if debug:
+                logger.debug(f"Library root path: {root_path}")
+                try:
+                    root_stat = os.stat(root_path)
+                except OSError as e:
+                    logger.debug(f"Library root not accessible: {e}")
+                else:
+                    logger.debug(f"Library root is dir: {stat.S_ISDIR(root_stat.st_mode)}")
+                    logger.debug(f"Library root readable: {os.access(root_path, os.R_OK)}")
+                    logger.debug(f"Library root writable: {os.access(root_path, os.W_OK)}")
+                    logger.debug(f"Library root device: {root_stat.st_dev}")
+                    # Check parent to see if it's on a different device (mount point)
+                    try:
+                        parent_stat = os.stat(os.path.dirname(root_path))
+                        logger.debug(f"Library root appears to be mount point: {root_stat.st_dev != parent_stat.st_dev}")
+                    except OSError as e:
+                        logger.debug(f"Could not check mount status: {e}")
             
-            logger.info(f"Creating upload folder: {new_folder_path} (library root: {library['rootPath']})")
+            logger.info(f"Creating upload folder: {new_folder_path} (library root: {root_path})")
             logger.info(f"Sanitized upload name: '{upload_name}' -> '{sanitized_name}'")
             
             try:
-                if not create_directory_with_permissions(new_folder_path):
+                if _dir_known(new_folder_path):
+                    logger.info(f"Folder already in place: {new_folder_path}")
+                elif not create_directory_with_permissions(new_folder_path):
                     logger.error(f"Failed to create folder in library root: {new_folder_path}")
-                    return jsonify({'error': 'internal_error', 'message': 'Failed to create folder'}), 500
-                logger.info(f"Successfully created folder: {new_folder_path}")
-                # Verify folder exists and get its actual location
-                if os.path.exists(new_folder_path):
-                    real_path = os.path.realpath(new_folder_path)
-                    logger.info(f"Verified folder exists: {new_folder_path}")
-                    logger.info(f"Real path (resolved symlinks): {real_path}")
-                    # Check if it's actually on the mounted volume
+                    return ojsonify({'error': 'internal_error', 'message': 'Failed to create folder'}), 500
+                else:
+                    _remember_dir(new_folder_path)
+                    logger.info(f"Successfully created folder: {new_folder_path}")
+                if debug:
+                    # Verify folder exists and get its actual location
                     try:
                         folder_stat = os.stat(new_folder_path)
-                        root_stat = os.stat(library['rootPath'])
-                        same_device = (folder_stat.st_dev == root_stat.st_dev)
-                        logger.info(f"Folder is on same device as root: {same_device} (folder dev={folder_stat.st_dev}, root dev={root_stat.st_dev})")
-                    except Exception as e:
-                        logger.warning(f"Could not verify device: {e}")
-                else:
-                    logger.error(f"Folder creation reported success but folder does not exist: {new_folder_path}")
+                    except FileNotFoundError:
+                        logger.error(f"Folder creation reported success but folder does not exist: {new_folder_path}")
+                    else:
+                        logger.debug(f"Verified folder exists: {new_folder_path}")
+                        logger.debug(f"Real path (resolved symlinks): {os.path.realpath(new_folder_path)}")
+                        # Check if it's actually on the mounted volume
+                        if root_stat is not None:
+                            same_device = (folder_stat.st_dev == root_stat.st_dev)
+                            logger.debug(f"Folder is on same device as root: {same_device} (folder dev={folder_stat.st_dev}, root dev={root_stat.st_dev})")
             except Exception as e:
                 logger.error(f"Failed to create folder in library root: {e}", exc_info=True)
-                return jsonify({'error': 'internal_error', 'message': 'Failed to create folder'}), 500
+                return ojsonify({'error': 'internal_error', 'message': 'Failed to create folder'}), 500
             
             batch_path = new_folder_path
-            target_root = library['rootPath']
+            target_root = root_path
     else:
         # Default: upload to uploadRoot with batch naming (standalone upload page)
         if not upload_name:
-            return jsonify({'error': 'validation_error', 'message': 'uploadName is required'}), 400
+            return ojsonify({'error': 'validation_error', 'message': 'uploadName is required'}), 400
         
         if len(upload_name) > 100:
-            return jsonify({'error': 'validation_error', 'message': 'uploadName too long (max 100 characters)'}), 400
+            return ojsonify({'error': 'validation_error', 'message': 'uploadName too long (max 100 characters)'}), 400
         
         # Sanitize upload name and create batch directory
         sanitized_name = sanitize_upload_name(upload_name)
@@ -230,40 +432,60 @@ def upload_files():
         try:
             if not create_directory_with_permissions(batch_path):
                 logger.error(f"Failed to create batch directory: {batch_path}")
-                return jsonify({'error': 'internal_error', 'message': 'Failed to create upload directory'}), 500
+                return ojsonify({'error': 'internal_error', 'message': 'Failed to create upload directory'}), 500
         except Exception as e:
             logger.error(f"Failed to create batch directory: {e}")
-            return jsonify({'error': 'internal_error', 'message': 'Failed to create upload directory'}), 500
-    
-    # Verify batch_path exists and is a directory before processing files
-    if not os.path.exists(batch_path):
-        logger.error(f"Batch path does not exist: {batch_path}")
-        return jsonify({'error': 'internal_error', 'message': 'Upload directory does not exist'}), 500
-    
-    if not os.path.isdir(batch_path):
-        logger.error(f"Batch path is not a directory: {batch_path}")
-        return jsonify({'error': 'internal_error', 'message': 'Upload path is not a directory'}), 500
+            return ojsonify({'error': 'internal_error', 'message': 'Failed to create upload directory'}), 500
+        direct_write = True
     
     # Get files
     if 'files' not in request.files:
-        return jsonify({'error': 'validation_error', 'message': 'No files provided'}), 400
+        return ojsonify({'error': 'validation_error', 'message': 'No files provided'}), 400
     
     files = request.files.getlist('files')
     if not files or len(files) == 0:
-        return jsonify({'error': 'validation_error', 'message': 'No files provided'}), 400
+        return ojsonify({'error': 'validation_error', 'message': 'No files provided'}), 400
     
     # Check file count limit
     if len(files) > config.max_upload_files:
-        return jsonify({
+        return ojsonify({
             'error': 'validation_error',
             'message': f'Too many files (max {config.max_upload_files})'
         }), 400
     
+    # Limits and paths used for every file
+    max_bytes_per_file = config.max_upload_bytes_per_file
+    max_bytes_total = config.max_upload_bytes_total
+    thumbnail_cache_root = config.thumbnail_cache_root
+    
     # Process files
     uploaded_files = []
     total_size = 0
     errors = []
     
+    # Directory facts for the per-file diagnostics, looked up on first use
+    batch_real_path = None
+    library_root_stat = None
+    
+    # One directory listing for the whole batch instead of an exists() per candidate name;
+    # it also verifies batch_path exists and is a directory before processing files
+    try:
+        with os.scandir(batch_path) as entries:
+            existing_names = {entry.name for entry in entries}
+    except FileNotFoundError:
+        # Removed since it was last seen: create it again rather than fail the upload
+        if _forget_dir(batch_path) and create_directory_with_permissions(batch_path):
+            existing_names = set()
+        else:
+            logger.error(f"Batch path does not exist: {batch_path}")
+            return ojsonify({'error': 'internal_error', 'message': 'Upload directory does not exist'}), 500
+    except NotADirectoryError:
+        logger.error(f"Batch path is not a directory: {batch_path}")
+        return ojsonify({'error': 'internal_error', 'message': 'Upload path is not a directory'}), 500
+    except OSError as e:
+        logger.error(f"Failed to list upload directory {batch_path}: {e}")
+        return ojsonify({'error': 'internal_error', 'message': 'Failed to read upload directory'}), 500
+    
     for file in files:
         if not file.filename:
             continue
@@ -276,17 +498,17 @@ def upload_files():
         file.seek(0)
         
         # Check per-file size limit
-        if file_size > config.max_upload_bytes_per_file:
+        if file_size > max_bytes_per_file:
             errors.append({
                 'originalName': original_name,
                 'status': 'error',
                 'errorCode': 'FILE_TOO_LARGE',
-                'errorMessage': f'File exceeds maximum size ({config.max_upload_bytes_per_file / (1024*1024):.0f} MB)'
+                'errorMessage': f'File exceeds maximum size ({max_bytes_per_file / (1024*1024):.0f} MB)'
             })
             continue
         
         # Check total size limit
-        if total_size + file_size > config.max_upload_bytes_total:
+        if total_size + file_size > max_bytes_total:
             errors.append({
                 'originalName': original_name,
                 'status': 'error',
@@ -295,12 +517,12 @@ def upload_files():
             })
             continue
         
-        # Read first 8KB for binary validation
+        # Read first 8KB for binary validation; it is written out ahead of the rest
+        # below, so the upload is read once, front to back
         peek_content = file.read(8192)
-        file.seek(0)
         
         # Validate file type
-        is_valid, media_type = validate_file_type_binary(peek_content)
+        is_valid, media_type = validate_file_type(original_name, peek_content)
         if not is_valid:
             errors.append({
                 'originalName': original_name,
@@ -321,9 +543,14 @@ def upload_files():
             })
             continue
         
-        # Get unique filename
+        # A new uploadRoot batch gets the final name claimed up front and written in
+        # place. A library folder is listed while the upload runs, so the file is written
+        # under a hidden temp name and only linked to its final name once complete
         try:
-            unique_filename = get_unique_filename(batch_path, sanitized_filename)
+            if direct_write:
+                fd, unique_filename = open_unique_file(batch_path, sanitized_filename, existing_names)
+            else:
+                fd, temp_name = open_unique_file(batch_path, f".{sanitized_filename}.upload.tmp", existing_names)
         except Exception as e:
             errors.append({
                 'originalName': original_name,
@@ -333,19 +560,41 @@ def upload_files():
             })
             continue
         
-        # Atomic write: write to temp file, then rename
-        temp_filename = f"{unique_filename}.tmp"
-        temp_path = os.path.join(batch_path, temp_filename)
-        final_path = os.path.join(batch_path, unique_filename)
+        if direct_write:
+            final_path = temp_path = os.path.join(batch_path, unique_filename)
+        else:
+            final_path = None
+            temp_path = os.path.join(batch_path, temp_name)
+        saved = False
         
         try:
-            # Write to temp file
-            logger.debug(f"Writing file to temp path: {temp_path}")
-            with open(temp_path, 'wb') as f:
-                shutil.copyfileobj(file, f)
+            logger.debug(f"Writing file to path: {temp_path}")
+            with os.fdopen(fd, 'wb') as f:
+                if file_size >= PREALLOCATE_MIN_BYTES and hasattr(os, 'posix_fallocate'):
+                    # Reserve the whole extent up front so large videos aren't fragmented
+                    try:
+                        os.posix_fallocate(f.fileno(), 0, file_size)
+                    except OSError as e:
+                        logger.debug(f"Could not preallocate {temp_path}: {e}")
+                f.write(peek_content)
+                written = len(peek_content)
+                src_fd = _spooled_fileno(file.stream) if hasattr(os, 'copy_file_range') else None
+                if src_fd is not None and written < file_size:
+                    # Large uploads are already on disk in Werkzeug's temp file; copy the
+                    # rest in the kernel and let the loop below pick up anything left over
+                    f.flush()
+                    written += _copy_in_kernel(src_fd, f.fileno(), written, file_size - written)
+                    f.seek(written)
+                    file.seek(written)
+                while True:
+                    chunk = file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    written += len(chunk)
             
             # Verify file was written correctly
-            if os.path.getsize(temp_path) != file_size:
+            if written != file_size:
                 os.remove(temp_path)
                 errors.append({
                     'originalName': original_name,
@@ -355,68 +604,57 @@ def upload_files():
                 })
                 continue
             
-            # Atomically rename
-            os.rename(temp_path, final_path)
+            if not direct_write:
+                try:
+                    unique_filename = link_unique_file(temp_path, batch_path, sanitized_filename, existing_names)
+                except ValueError as e:
+                    os.remove(temp_path)
+                    errors.append({
+                        'originalName': original_name,
+                        'status': 'error',
+                        'errorCode': 'FILENAME_CONFLICT',
+                        'errorMessage': f'Failed to resolve filename conflict: {str(e)}'
+                    })
+                    continue
+                final_path = os.path.join(batch_path, unique_filename)
+                os.remove(temp_path)
+            saved = True
             logger.info(f"Successfully saved file '{original_name}' to '{final_path}'")
             
-            # Detailed diagnostics for saved file
-            if os.path.exists(final_path):
-                file_size_actual = os.path.getsize(final_path)
-                logger.info(f"✓ Verified file exists: {final_path} (size: {file_size_actual} bytes)")
-                
-                # Check device ID and mount status
+            # Detailed diagnostics for saved file; one stat covers existence, size and device
+            if logger.isEnabledFor(logging.DEBUG):
                 try:
                     file_stat = os.stat(final_path)
-                    real_path = os.path.realpath(final_path)
-                    logger.info(f"✓ File device ID: {file_stat.st_dev}, inode: {file_stat.st_ino}")
-                    logger.info(f"✓ File real path (resolved): {real_path}")
-                    
-                    # If uploading to library, check if it's on the same device as library root
-                    if library_id and library:
-                        root_stat = os.stat(library['rootPath'])
-                        same_device = (file_stat.st_dev == root_stat.st_dev)
-                        logger.info(f"✓ File is on same device as library root: {same_device}")
-                        logger.info(f"  - File device: {file_stat.st_dev}, Root device: {root_stat.st_dev}")
-                        if not same_device:
-                            logger.error(f"✗ WARNING: File is NOT on the same device as library root!")
-                            logger.error(f"✗ This means the file is being written to a different filesystem!")
-                            logger.error(f"✗ Library root: {library['rootPath']} (device {root_stat.st_dev})")
-                            logger.error(f"✗ File location: {final_path} (device {file_stat.st_dev})")
+                except FileNotFoundError:
+                    logger.error(f"✗ File save reported success but file does not exist: {final_path}")
+                else:
+                    logger.debug(f"✓ Verified file exists: {final_path} (size: {file_stat.st_size} bytes)")
                     
-                    # Check parent directory device
-                    parent_dir = os.path.dirname(final_path)
-                    if os.path.exists(parent_dir):
-                        parent_stat = os.stat(parent_dir)
-                        is_mount = (file_stat.st_dev != parent_stat.st_dev)
-                        logger.info(f"✓ Parent directory device: {parent_stat.st_dev}, is mount point: {is_mount}")
-                except Exception as e:
-                    logger.warning(f"Could not get file diagnostics: {e}")
-            else:
-                logger.error(f"✗ File save reported success but file does not exist: {final_path}")
-            
-            # Queue thumbnail generation in background
-            try:
-                from backend.media.thumbnail_worker import queue_thumbnail_generation
-                from pathlib import Path
-                config = current_app.config.get('PHOTOMEDIT_CONFIG')
-                if config:
-                    # Determine if it's an image or video
-                    ext = Path(final_path).suffix.lower()
-                    image_exts = {'.jpg', '.jpeg', '.orf', '.nef', '.cr2', '.cr3', '.raf', '.arw', '.dng', '.tif', '.tiff'}
-                    is_image = ext in image_exts
-                    queue_thumbnail_generation(final_path, is_image=is_image, thumbnail_cache_root=config.thumbnail_cache_root)
-                    logger.debug(f"Queued thumbnail generation for {final_path}")
-            except Exception as e:
-                logger.warning(f"Failed to queue thumbnail generation: {e}")
+                    # Check device ID
+                    try:
+                        # The file was just renamed into batch_path, so only the directory needs resolving
+                        if batch_real_path is None:
+                            batch_real_path = os.path.realpath(batch_path)
+                        logger.debug(f"✓ File device ID: {file_stat.st_dev}, inode: {file_stat.st_ino}")
+                        logger.debug(f"✓ File real path (resolved): {os.path.join(batch_real_path, unique_filename)}")
+                        
+                        # If uploading to library, check if it's on the same device as library root
+                        if library_id and library:
+                            if library_root_stat is None:
+                                library_root_stat = os.stat(root_path)
+                            same_device = (file_stat.st_dev == library_root_stat.st_dev)
+                            logger.debug(f"✓ File is on same device as library root: {same_device}")
+                            if not same_device:
+                                logger.error(f"✗ WARNING: File is NOT on the same device as library root!")
+                                logger.error(f"✗ Library root: {root_path} (device {library_root_stat.st_dev})")
+                                logger.error(f"✗ File location: {final_path} (device {file_stat.st_dev})")
+                    except Exception as e:
+                        logger.warning(f"Could not get file diagnostics: {e}")
             
-            # Post-upload: import metadata
-            try:
-                # Read metadata (this will discover sidecar if present)
-                logical_metadata = MetadataReader.read_logical_metadata(final_path)
-                # Metadata is now available for the UI
-            except Exception as e:
-                logger.warning(f"Failed to import metadata for {final_path}: {e}")
-                # Continue anyway - file is uploaded successfully
+            # Post-upload: thumbnail and metadata import happen in the background so the
+            # next file's copy (and the response) doesn't wait on them
+            is_image = os.path.splitext(unique_filename)[1].lower() in IMAGE_EXTENSIONS
+            get_post_upload_pool().submit(_post_upload, final_path, is_image, thumbnail_cache_root)
             
             # Calculate relative path from target root
             relative_path = os.path.relpath(final_path, target_root).replace(os.sep, '/')
@@ -432,8 +670,8 @@ def upload_files():
             total_size += file_size
             
         except Exception as e:
-            # Clean up temp file if it exists
-            if os.path.exists(temp_path):
+            # Clean up the temp file; once linked, the file is saved under its final name
+            if os.path.exists(temp_path) and (not saved or temp_path != final_path):
                 try:
                     os.remove(temp_path)
                 except:
@@ -458,14 +696,14 @@ def upload_files():
                 'files': uploaded_files + errors
             }
         else:
-            # Created new folder in library root
-            folder_name = sanitize_upload_name(upload_name)
+            # Created new folder in library root (named when it was created above)
+            folder_name = sanitized_name
             logger.info(f"Upload complete: {len(uploaded_files)} files uploaded to library root folder: {folder_name}")
             response = {
                 'uploadId': f"{library_id}|{folder_name}",
                 'uploadName': upload_name,
                 'targetDirectory': folder_name,
-                'targetPath': os.path.join(library['rootPath'], folder_name),  # Add full path for debugging
+                'targetPath': os.path.join(root_path, folder_name),  # Add full path for debugging
                 'libraryId': library_id,
                 'files': uploaded_files + errors
             }
@@ -481,7 +719,7 @@ def upload_files():
     user = getattr(g, 'current_user', None) or getattr(request, 'current_user', None)
     success_count = len(uploaded_files)
     error_count = len(errors)
-    LogService.log(
+    LogService.log_async(
         level='INFO' if error_count == 0 else 'WARNING',
         message=f"Upload completed: {success_count} successful, {error_count} failed",
         logger_name='upload',
@@ -497,4 +735,4 @@ def upload_files():
         }
     )
     
-    return jsonify(response), 200
+    return ojsonify(response), 200
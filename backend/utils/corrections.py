@@ -1,154 +1,219 @@
-"""Corrections CSV file management."""
+"""
+Corrections CSV file management.
+
+Each folder's corrections.csv is an append-only journal: flagging a file and
+clearing its flag each append one row, and the last row for a filename decides
+its state (a non-empty cleared_at means no active correction). Compaction
+rewrites the file with only the cleared rows, which are the audit trail, and
+each file's latest row.
+"""
 import csv
+import fcntl
+import io
 import os
+import sys
 from pathlib import Path
-from typing import Optional, Dict, List
-from datetime import datetime
+from typing import Optional, Dict, Iterator, List, Tuple
 import logging
+from backend.utils.csv_files import CSV_BUFFER, StampedCSVCache, now_iso
+from backend.utils.file_io import atomic_write
 
 logger = logging.getLogger(__name__)
 
 CORRECTIONS_FILENAME = 'corrections.csv'
 CSV_FIELDS = ['filename', 'username', 'correction_notes', 'flagged_at', 'cleared_at']
 
+# Appends compact the journal once it reaches this size, and again each time it
+# doubles from its size after the last compaction (csv path -> that size)
+_COMPACT_MIN_BYTES = 256 * 1024
+_compacted_sizes: Dict[str, int] = {}
+
 
 def get_corrections_file_path(folder_path: str) -> str:
     """Get the path to the corrections.csv file in a folder."""
     return os.path.join(folder_path, CORRECTIONS_FILENAME)
 
 
-def read_corrections(folder_path: str) -> Dict[str, Dict]:
-    """
-    Read all corrections from a folder's corrections.csv file.
-    
-    Returns a dict mapping filename -> correction data
-    """
-    corrections = {}
-    csv_path = get_corrections_file_path(folder_path)
-    
-    if not os.path.exists(csv_path):
-        return corrections
-    
+def _iter_correction_rows(csv_path: str) -> Iterator[Tuple[str, Dict]]:
+    """Stream (filename, entry) for each row of a corrections.csv file, in file order."""
     try:
-        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        with open(csv_path, 'r', newline='', encoding='utf-8', buffering=CSV_BUFFER) as f:
             reader = csv.DictReader(f)
             for row in reader:
                 filename = row.get('filename', '')
-                if filename and not row.get('cleared_at'):  # Only include active (not cleared) corrections
-                    corrections[filename] = {
-                        'username': row.get('username', ''),
+                if filename:
+                    # Parsed entries stay cached; the few distinct usernames share one string
+                    yield filename, {
+                        'username': sys.intern(row.get('username', '')),
                         'correctionNotes': row.get('correction_notes', ''),
                         'flaggedAt': row.get('flagged_at', ''),
-                        'correctionNeeded': True
+                        'clearedAt': row.get('cleared_at', '')
                     }
+    except FileNotFoundError:
+        return
     except Exception as e:
         logger.error(f"Error reading corrections file {csv_path}: {e}")
+
+
+def _parse_corrections(csv_path: str) -> Dict[str, Dict]:
+    """Parse the active (not cleared) corrections out of a corrections.csv file."""
+    corrections = {}
+    # The last row for a file decides, so lookups can't stop at the first match;
+    # they go through the stamp cache instead
+    for filename, entry in _iter_correction_rows(csv_path):
+        if entry['clearedAt']:
+            corrections.pop(filename, None)
+        else:
+            corrections[filename] = {
+                'username': entry['username'],
+                'correctionNotes': entry['correctionNotes'],
+                'flaggedAt': entry['flaggedAt'],
+                'correctionNeeded': True
+            }
     
     return corrections
 
 
-def get_correction(folder_path: str, filename: str) -> Optional[Dict]:
-    """Get correction data for a specific file."""
-    corrections = read_corrections(folder_path)
-    return corrections.get(filename)
+# Active corrections per corrections.csv
+_cache = StampedCSVCache(_parse_corrections)
 
 
-def add_correction(folder_path: str, filename: str, username: str, correction_notes: str) -> bool:
+def _read_corrections_cached(folder_path: str) -> Dict[str, Dict]:
+    """read_corrections without the copy; callers must not modify the result."""
+    return _cache.get(get_corrections_file_path(folder_path))
+
+
+def read_corrections(folder_path: str) -> Dict[str, Dict]:
     """
-    Add or update a correction entry for a file.
+    Read all corrections from a folder's corrections.csv file.
     
-    If a correction already exists for this file, it will be updated.
+    Returns a dict mapping filename -> correction data
     """
-    csv_path = get_corrections_file_path(folder_path)
-    corrections = []
-    found = False
-    
-    # Read existing corrections
-    if os.path.exists(csv_path):
-        try:
-            with open(csv_path, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('filename') == filename and not row.get('cleared_at'):
-                        # Update existing entry
-                        row['username'] = username
-                        row['correction_notes'] = correction_notes
-                        row['flagged_at'] = datetime.utcnow().isoformat() + 'Z'
-                        found = True
-                    corrections.append(row)
-        except Exception as e:
-            logger.error(f"Error reading corrections file {csv_path}: {e}")
-            return False
-    
-    # Add new entry if not found
-    if not found:
-        corrections.append({
-            'filename': filename,
-            'username': username,
-            'correction_notes': correction_notes,
-            'flagged_at': datetime.utcnow().isoformat() + 'Z',
-            'cleared_at': ''
-        })
+    return dict(_read_corrections_cached(folder_path))
+
+
+def get_correction(folder_path: str, filename: str) -> Optional[Dict]:
+    """Get correction data for a specific file."""
+    return _read_corrections_cached(folder_path).get(filename)
+
+
+def _append_correction_row(csv_path: str, row: Dict) -> bool:
+    """Append one row to corrections.csv, writing the header if the file is new."""
+    try:
+        while True:
+            # One short row per open, flushed below anyway, so no CSV_BUFFER here; the
+            # multi-row compaction rewrite goes out as a single write
+            with open(csv_path, 'a', newline='', encoding='utf-8') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                # A compaction may have replaced the file while we waited for the lock
+                if os.fstat(f.fileno()).st_ino != os.stat(csv_path).st_ino:
+                    continue
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+                if os.fstat(f.fileno()).st_size == 0:
+                    writer.writeheader()
+                writer.writerow(row)
+                f.flush()
+                size = os.fstat(f.fileno()).st_size
+            break
+    except Exception as e:
+        logger.error(f"Error writing corrections file {csv_path}: {e}")
+        return False
+    finally:
+        _cache.forget(csv_path)
     
-    # Write back to file
+    if size >= max(_COMPACT_MIN_BYTES, 2 * _compacted_sizes.get(csv_path, 0)):
+        _compact_corrections_file(csv_path)
+    return True
+
+
+def _compact_corrections_file(csv_path: str) -> bool:
+    """Drop the superseded active rows from a corrections.csv file."""
     try:
-        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-            writer.writeheader()
-            writer.writerows(corrections)
-        logger.info(f"Added/updated correction for {filename} in {csv_path}")
+        with open(csv_path, 'r', newline='', encoding='utf-8', buffering=CSV_BUFFER) as f:
+            # Appenders wait on this lock, then find the replaced file and retry there
+            fcntl.flock(f, fcntl.LOCK_EX)
+            rows = [row for row in csv.DictReader(f) if row.get('filename')]
+            last = {row['filename']: i for i, row in enumerate(rows)}
+            # Cleared rows are the audit trail; an active row only matters while it is the latest
+            kept = [row for i, row in enumerate(rows) if row.get('cleared_at') or last[row['filename']] == i]
+            if len(kept) < len(rows):
+                out = io.StringIO(newline='')
+                writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(kept)
+                mode = os.fstat(f.fileno()).st_mode
+                if not atomic_write(csv_path, out.getvalue().encode('utf-8')):
+                    logger.error(f"Error compacting corrections file {csv_path}")
+                    return False
+                os.chmod(csv_path, mode & 0o7777)
+                logger.info(f"Compacted {csv_path} from {len(rows)} to {len(kept)} rows")
+        _compacted_sizes[csv_path] = os.stat(csv_path).st_size
+        return True
+    except FileNotFoundError:
         return True
     except Exception as e:
-        logger.error(f"Error writing corrections file {csv_path}: {e}")
+        logger.error(f"Error compacting corrections file {csv_path}: {e}")
         return False
+    finally:
+        _cache.forget(csv_path)
 
 
-def clear_correction(folder_path: str, filename: str) -> bool:
+def compact_corrections(folder_path: str) -> bool:
     """
-    Clear a correction entry for a file (mark as resolved).
+    Compact a folder's corrections.csv.
     
-    Instead of deleting, we set the cleared_at timestamp for audit trail.
+    Keeps every cleared row and the latest row for each file, so the active
+    corrections and the audit trail read the same afterwards.
     """
-    csv_path = get_corrections_file_path(folder_path)
-    
-    if not os.path.exists(csv_path):
-        return True  # Nothing to clear
-    
-    corrections = []
-    found = False
+    return _compact_corrections_file(get_corrections_file_path(folder_path))
+
+
+def add_correction(folder_path: str, filename: str, username: str, correction_notes: str) -> bool:
+    """
+    Add or update a correction entry for a file.
     
-    try:
-        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get('filename') == filename and not row.get('cleared_at'):
-                    # Mark as cleared
-                    row['cleared_at'] = datetime.utcnow().isoformat() + 'Z'
-                    found = True
-                corrections.append(row)
-    except Exception as e:
-        logger.error(f"Error reading corrections file {csv_path}: {e}")
+    If a correction already exists for this file, the new row supersedes it.
+    """
+    csv_path = get_corrections_file_path(folder_path)
+    if not _append_correction_row(csv_path, {
+        'filename': filename,
+        'username': username,
+        'correction_notes': correction_notes,
+        'flagged_at': now_iso(),
+        'cleared_at': ''
+    }):
         return False
+    logger.info(f"Added/updated correction for {filename} in {csv_path}")
+    return True
+
+
+def clear_correction(folder_path: str, filename: str) -> bool:
+    """
+    Clear a correction entry for a file (mark as resolved).
     
-    if not found:
+    Instead of deleting, we append a copy of the correction with its cleared_at
+    timestamp for audit trail.
+    """
+    correction = _read_corrections_cached(folder_path).get(filename)
+    if not correction:
         return True  # Nothing to clear
     
-    # Write back to file
-    try:
-        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-            writer.writeheader()
-            writer.writerows(corrections)
-        logger.info(f"Cleared correction for {filename} in {csv_path}")
-        return True
-    except Exception as e:
-        logger.error(f"Error writing corrections file {csv_path}: {e}")
+    csv_path = get_corrections_file_path(folder_path)
+    if not _append_correction_row(csv_path, {
+        'filename': filename,
+        'username': correction['username'],
+        'correction_notes': correction['correctionNotes'],
+        'flagged_at': correction['flaggedAt'],
+        'cleared_at': now_iso()
+    }):
         return False
+    logger.info(f"Cleared correction for {filename} in {csv_path}")
+    return True
 
 
 def list_corrections_in_folder(folder_path: str) -> List[Dict]:
     """List all active corrections in a folder."""
-    corrections = read_corrections(folder_path)
+    corrections = _read_corrections_cached(folder_path)
     return [
         {'filename': filename, **data}
         for filename, data in corrections.items()
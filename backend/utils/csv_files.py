@@ -0,0 +1,52 @@
+"""Shared helpers for the per-folder CSV files (corrections.csv, published.csv)."""
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict
+
+# Folders can hold thousands of rows; read and rewrite the CSVs in large chunks
+CSV_BUFFER = 1024 * 1024
+
+
+def now_iso() -> str:
+    """Current UTC time as an ISO 8601 string, e.g. 2024-05-01T12:00:00.123456Z."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+class StampedCSVCache:
+    """
+    Parsed CSV files by path, parsed again when a file's (mtime_ns, size) changes.
+    
+    A different stamp means the file was rewritten, here or by another worker.
+    Writers still call forget(): a write within one mtime tick can keep the stamp.
+    """
+    
+    MAX_ENTRIES = 1024
+    
+    def __init__(self, parse: Callable[[str], Dict]):
+        self._parse = parse
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, csv_path: str) -> Dict:
+        """Parsed csv_path, or {} if it doesn't exist; callers must not modify the result."""
+        try:
+            st = os.stat(csv_path)
+        except OSError:
+            return {}
+        
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._entries.get(csv_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        parsed = self._parse(csv_path)
+        with self._lock:
+            if len(self._entries) >= self.MAX_ENTRIES:
+                self._entries.clear()
+            self._entries[csv_path] = (stamp, parsed)
+        return parsed
+    
+    def forget(self, csv_path: str):
+        """Drop csv_path's entry after writing to it."""
+        self._entries.pop(csv_path, None)
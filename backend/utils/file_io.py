@@ -1,11 +1,11 @@
 """File I/O utilities with atomic writes."""
 import os
-import shutil
 import tempfile
 from pathlib import Path
 from typing import Optional
 import stat
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -28,28 +28,60 @@ def atomic_write(file_path: str, content: bytes) -> bool:
             prefix='.tmp_',
             suffix=file_path_obj.suffix
         ) as tmp:
-            tmp.write(content)
             tmp_path = tmp.name
+            tmp.write(content)
+            # Data must be on disk before the rename, or a crash can leave an empty file
+            tmp.flush()
+            os.fsync(tmp.fileno())
         
-        # Validate (basic check - file exists and is readable)
-        if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) != len(content):
-            os.unlink(tmp_path)
-            return False
+        # Atomically replace original; the temp file is in the same directory, so
+        # this is a single rename
+        os.replace(tmp_path, file_path)
         
-        # Atomically replace original
-        shutil.move(tmp_path, file_path)
+        # Persist the rename itself; the new content is in place either way, so a
+        # filesystem that can't sync directories doesn't fail the write
+        if hasattr(os, 'O_DIRECTORY'):
+            try:
+                dir_fd = os.open(file_path_obj.parent, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+            except OSError as e:
+                logger.debug(f"Could not sync directory {file_path_obj.parent}: {e}")
         return True
         
     except Exception:
-        # Clean up temp file if it exists
-        if 'tmp_path' in locals() and os.path.exists(tmp_path):
+        # Clean up temp file if it was created (and not already renamed)
+        if 'tmp_path' in locals():
             try:
                 os.unlink(tmp_path)
-            except Exception:
+            except OSError:
                 pass
         return False
 
 
+# Directories already created (or found) by this process
+_created_dirs = set()
+_created_dirs_lock = threading.Lock()
+
+
+def ensure_dir(directory: str):
+    """os.makedirs(exist_ok=True), once per directory per process."""
+    with _created_dirs_lock:
+        if directory in _created_dirs:
+            return
+    os.makedirs(directory, exist_ok=True)
+    with _created_dirs_lock:
+        _created_dirs.add(directory)
+
+
+def forget_dir(directory: str):
+    """Drop ensure_dir's memo for directory after a failed write, in case it was removed underneath us."""
+    with _created_dirs_lock:
+        _created_dirs.discard(directory)
+
+
 def read_file_safe(file_path: str) -> Optional[bytes]:
     """Safely read a file, returning None on error."""
     try:
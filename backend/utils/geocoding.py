@@ -1,10 +1,20 @@
 """Geocoding service."""
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
 from typing import Optional, Dict, Any
 from backend.config.loader import Config
 
 
+# Normalized location name -> result of a completed lookup (None when Nominatim found
+# nothing); shared by all service instances, least recently used dropped first
+_GEOCODE_CACHE_MAX = 4096
+_geocode_cache: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+_geocode_cache_lock = threading.Lock()
+
+
 class GeocodingService:
     """Geocoding service using Nominatim."""
     
@@ -14,17 +24,28 @@ class GeocodingService:
         self.user_agent = config.geocoding_user_agent
         self.rate_limit = config.geocoding_rate_limit
         self.last_request_time = 0.0
+        self._rate_lock = threading.Lock()
+        # Keep the connection to Nominatim open between lookups instead of a new
+        # TCP + TLS handshake per request
+        self._session = requests.Session()
+        self._session.headers.update({'User-Agent': self.user_agent})
+        self._session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    
+    def close(self):
+        """Close the pooled connections."""
+        self._session.close()
     
     def _rate_limit(self):
         """Enforce rate limiting."""
         if not self.enabled:
             return
         
-        now = time.time()
-        elapsed = now - self.last_request_time
-        if elapsed < self.rate_limit:
-            time.sleep(self.rate_limit - elapsed)
-        self.last_request_time = time.time()
+        with self._rate_lock:
+            now = time.time()
+            elapsed = now - self.last_request_time
+            if elapsed < self.rate_limit:
+                time.sleep(self.rate_limit - elapsed)
+            self.last_request_time = time.time()
     
     def geocode(self, location_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -36,6 +57,15 @@ class GeocodingService:
         if not self.enabled or not location_name:
             return None
         
+        # The same place recurs across a batch of photos; only new names cost a
+        # (rate-limited) request
+        key = " ".join(location_name.lower().split())
+        with _geocode_cache_lock:
+            if key in _geocode_cache:
+                _geocode_cache.move_to_end(key)
+                coords = _geocode_cache[key]
+                return dict(coords) if coords else None
+        
         self._rate_limit()
         
         try:
@@ -45,23 +75,48 @@ class GeocodingService:
                 'format': 'json',
                 'limit': 1
             }
-            headers = {
-                'User-Agent': self.user_agent
-            }
             
-            response = requests.get(url, params=params, headers=headers, timeout=5)
+            response = self._session.get(url, params=params, timeout=5)
             response.raise_for_status()
             
             data = response.json()
+            coords = None
             if data and len(data) > 0:
                 result = data[0]
-                return {
+                coords = {
                     'lat': float(result.get('lat', 0)),
                     'lon': float(result.get('lon', 0))
                 }
         except Exception:
-            # Log error but don't fail the request
-            pass
+            # Log error but don't fail the request; failures aren't cached
+            return None
         
-        return None
+        with _geocode_cache_lock:
+            _geocode_cache[key] = dict(coords) if coords else None
+            _geocode_cache.move_to_end(key)
+            if len(_geocode_cache) > _GEOCODE_CACHE_MAX:
+                _geocode_cache.popitem(last=False)
+        return coords
+
+
+_service: Optional[GeocodingService] = None
+_service_lock = threading.Lock()
 
+
+def get_geocoding_service(config: Config) -> GeocodingService:
+    """
+    Get the shared service for the given config.
+    
+    One instance per process keeps its session's connections and its rate limit
+    across requests; a different config (e.g. after a reload) replaces it.
+    """
+    global _service
+    service = _service
+    if service is None or service.config is not config:
+        with _service_lock:
+            if _service is None or _service.config is not config:
+                if _service is not None:
+                    _service.close()
+                _service = GeocodingService(config)
+            service = _service
+    return service
@@ -0,0 +1,25 @@
+"""Shared thread pools, created on first use."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+def lazy_pool(name: str, workers: int) -> Callable[[], ThreadPoolExecutor]:
+    """
+    Return a getter for a pool of workers threads named after name.
+    
+    The pool is only created by the first call, so importing a module that
+    declares one starts no threads (and a forked worker process gets its own).
+    """
+    pool: Optional[ThreadPoolExecutor] = None
+    lock = threading.Lock()
+    
+    def get_pool() -> ThreadPoolExecutor:
+        nonlocal pool
+        if pool is None:
+            with lock:
+                if pool is None:
+                    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        return pool
+    
+    return get_pool
@@ -2,63 +2,128 @@
 import csv
 import os
 import shutil
+import sys
 from pathlib import Path
-from typing import Optional, Dict, List
-from datetime import datetime
+from typing import Optional, Dict, Iterator, List, Tuple
 import logging
+from backend.utils.csv_files import CSV_BUFFER, StampedCSVCache, now_iso
+from backend.utils.pools import lazy_pool
+from backend.utils.sidecar import get_sidecar_path
 
 logger = logging.getLogger(__name__)
 
 PUBLISHED_FILENAME = 'published.csv'
 CSV_FIELDS = ['filename', 'username', 'published_at', 'dam_name', 'dam_path']
 
+# Copies into the DAM wait on (often network) storage, so several run at once
+PUBLISH_WORKERS = 8
+get_publish_pool = lazy_pool('publish', PUBLISH_WORKERS)
+
 
 def get_published_file_path(folder_path: str) -> str:
     """Get the path to the published.csv file in a folder."""
     return os.path.join(folder_path, PUBLISHED_FILENAME)
 
 
-def read_published(folder_path: str) -> Dict[str, Dict]:
-    """
-    Read all published records from a folder's published.csv file.
-    
-    Returns a dict mapping filename -> publish data
-    """
-    published = {}
-    csv_path = get_published_file_path(folder_path)
-    
-    if not os.path.exists(csv_path):
-        return published
-    
+def _iter_published_rows(csv_path: str) -> Iterator[Tuple[str, Dict]]:
+    """Stream (filename, publish record) for each row of a published.csv file."""
     try:
-        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        with open(csv_path, 'r', newline='', encoding='utf-8', buffering=CSV_BUFFER) as f:
             reader = csv.DictReader(f)
             for row in reader:
                 filename = row.get('filename', '')
                 if filename:
-                    published[filename] = {
-                        'username': row.get('username', ''),
+                    # Parsed records stay cached; the few distinct users and DAMs share one string
+                    yield filename, {
+                        'username': sys.intern(row.get('username', '')),
                         'publishedAt': row.get('published_at', ''),
-                        'damName': row.get('dam_name', ''),
+                        'damName': sys.intern(row.get('dam_name', '')),
                         'damPath': row.get('dam_path', ''),
                         'isPublished': True
                     }
+    except FileNotFoundError:
+        return
     except Exception as e:
         logger.error(f"Error reading published file {csv_path}: {e}")
+
+
+def _parse_published(csv_path: str) -> Dict[str, Dict]:
+    """Parse the publish records out of a published.csv file."""
+    return dict(_iter_published_rows(csv_path))
+
+
+# Publish records per published.csv
+_cache = StampedCSVCache(_parse_published)
+
+
+def _read_published_cached(folder_path: str) -> Dict[str, Dict]:
+    """read_published without the copy; callers must not modify the result."""
+    return _cache.get(get_published_file_path(folder_path))
+
+
+def read_published(folder_path: str) -> Dict[str, Dict]:
+    """
+    Read all published records from a folder's published.csv file.
     
-    return published
+    Returns a dict mapping filename -> publish data
+    """
+    return dict(_read_published_cached(folder_path))
 
 
 def is_published(folder_path: str, filename: str) -> bool:
     """Check if a file has been published."""
-    published = read_published(folder_path)
-    return filename in published
+    return filename in _read_published_cached(folder_path)
 
 
 def get_publish_info(folder_path: str, filename: str) -> Optional[Dict]:
     """Get publish info for a specific file."""
-    published = read_published(folder_path)
-    return published.get(filename)
+    return _read_published_cached(folder_path).get(filename)
+
+
+def _copy_file(src: str, dst: str, exclusive: bool = False, missing_ok: bool = False) -> bool:
+    """
+    Copy src to dst with its metadata (like shutil.copy2), letting the kernel move the data.
+    
+    copy_file_range can reflink on copy-on-write filesystems (Btrfs, XFS); sendfile
+    covers kernels and filesystem pairs that refuse it, and a plain read/write loop
+    anything else. With exclusive, an existing dst raises FileExistsError; with
+    missing_ok, a missing src returns False instead of raising.
+    """
+    try:
+        fsrc = open(src, 'rb')
+    except FileNotFoundError:
+        if missing_ok:
+            return False
+        raise
+    with fsrc:
+        fdst = open(dst, 'xb' if exclusive else 'wb')
+        try:
+            with fdst:
+                in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+                remaining = os.fstat(in_fd).st_size
+                for kernel_copy in (getattr(os, 'copy_file_range', None), getattr(os, 'sendfile', None)):
+                    if kernel_copy is None or remaining <= 0:
+                        continue
+                    try:
+                        while remaining > 0:
+                            if kernel_copy is os.sendfile:
+                                n = os.sendfile(out_fd, in_fd, None, remaining)
+                            else:
+                                n = kernel_copy(in_fd, out_fd, remaining)
+                            if n == 0:
+                                break
+                            remaining -= n
+                    except OSError as e:
+                        logger.debug(f"{kernel_copy.__name__} unavailable for {dst}: {e}")
+                # Both descriptors advanced past what was copied; finish in user space
+                fsrc.seek(os.lseek(in_fd, 0, os.SEEK_CUR))
+                fdst.seek(os.lseek(out_fd, 0, os.SEEK_CUR))
+                shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+            shutil.copystat(src, dst)
+        except BaseException:
+            os.unlink(dst)
+            raise
+    return True
 
 
 def publish_file(
@@ -66,7 +131,8 @@ def publish_file(
     dam_folder_path: str,
     dam_name: str,
     username: str,
-    preserve_folder_structure: bool = True
+    preserve_folder_structure: bool = True,
+    record: bool = True
 ) -> Dict:
     """
     Publish a file to the DAM folder.
@@ -77,6 +143,7 @@ def publish_file(
         dam_name: Name of the DAM (for logging)
         username: User performing the publish
         preserve_folder_structure: If True, preserve relative folder structure
+        record: If False, leave recording in published.csv to the caller
         
     Returns:
         Dict with 'success', 'message', and optionally 'dam_path'
@@ -103,22 +170,22 @@ def publish_file(
         
         dest_path = dest_folder / filename
         
-        # Check if file already exists in DAM
-        if dest_path.exists():
+        # Copy file to DAM; exclusive creation also stops two concurrent publishes
+        # from writing the same destination
+        try:
+            _copy_file(str(source), str(dest_path), exclusive=True)
+        except FileExistsError:
             return {'success': False, 'message': f'File already exists in {dam_name}'}
         
-        # Copy file to DAM
-        shutil.copy2(str(source), str(dest_path))
-        
-        # Also copy sidecar XMP file if it exists
-        sidecar_source = source.with_suffix(source.suffix + '.xmp')
-        if sidecar_source.exists():
-            sidecar_dest = dest_path.with_suffix(dest_path.suffix + '.xmp')
-            shutil.copy2(str(sidecar_source), str(sidecar_dest))
+        # Also copy sidecar XMP file if it exists (opening it is the existence check)
+        sidecar_source = get_sidecar_path(str(source))
+        sidecar_dest = get_sidecar_path(str(dest_path))
+        if _copy_file(sidecar_source, sidecar_dest, missing_ok=True):
             logger.info(f"Copied sidecar file to {sidecar_dest}")
         
         # Record in published.csv
-        record_published(folder_path, filename, username, dam_name, str(dest_path))
+        if record:
+            record_published(folder_path, filename, username, dam_name, str(dest_path))
         
         logger.info(f"Published {filename} to {dam_name} at {dest_path}")
         
@@ -144,33 +211,45 @@ def record_published(
     dam_path: str
 ) -> bool:
     """Record a file as published in the CSV."""
+    return record_published_bulk(folder_path, {filename: dam_path}, username, dam_name)
+
+
+def record_published_bulk(
+    folder_path: str,
+    dam_paths: Dict[str, str],
+    username: str,
+    dam_name: str
+) -> bool:
+    """Record several files of one folder (filename -> DAM path) as published, rewriting the CSV once."""
     csv_path = get_published_file_path(folder_path)
     records = []
     
     # Read existing records
     if os.path.exists(csv_path):
         try:
-            with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            with open(csv_path, 'r', newline='', encoding='utf-8', buffering=CSV_BUFFER) as f:
                 reader = csv.DictReader(f)
                 for row in reader:
                     # Skip if this file is already recorded (will be re-added with new data)
-                    if row.get('filename') != filename:
+                    if row.get('filename') not in dam_paths:
                         records.append(row)
         except Exception as e:
             logger.error(f"Error reading published file {csv_path}: {e}")
     
-    # Add new record
-    records.append({
-        'filename': filename,
-        'username': username,
-        'published_at': datetime.utcnow().isoformat() + 'Z',
-        'dam_name': dam_name,
-        'dam_path': dam_path
-    })
+    # Add new records
+    published_at = now_iso()
+    for filename, dam_path in dam_paths.items():
+        records.append({
+            'filename': filename,
+            'username': username,
+            'published_at': published_at,
+            'dam_name': dam_name,
+            'dam_path': dam_path
+        })
     
     # Write back
     try:
-        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        with open(csv_path, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER) as f:
             writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
             writer.writeheader()
             writer.writerows(records)
@@ -178,11 +257,13 @@ def record_published(
     except Exception as e:
         logger.error(f"Error writing published file {csv_path}: {e}")
         return False
+    finally:
+        _cache.forget(csv_path)
 
 
 def list_published_in_folder(folder_path: str) -> List[Dict]:
     """List all published files in a folder."""
-    published = read_published(folder_path)
+    published = _read_published_cached(folder_path)
     return [
         {'filename': filename, **data}
         for filename, data in published.items()
@@ -200,25 +281,32 @@ def publish_multiple(
     
     Returns summary with 'published' count, 'failed' count, and 'results' list.
     """
-    results = []
+    # Copy concurrently; map keeps results in request order
+    results = list(get_publish_pool().map(
+        lambda source_path: publish_file(source_path, dam_folder_path, dam_name, username, record=False),
+        source_paths
+    ))
+    
     published_count = 0
     failed_count = 0
+    # folder -> {filename: DAM path}, so each folder's published.csv is rewritten once
+    by_folder: Dict[str, Dict[str, str]] = {}
     
-    for source_path in source_paths:
-        result = publish_file(source_path, dam_folder_path, dam_name, username)
-        result['filename'] = os.path.basename(source_path)
-        results.append(result)
+    for source_path, result in zip(source_paths, results):
+        source = Path(source_path)
+        result['filename'] = source.name
         
         if result['success']:
             published_count += 1
+            by_folder.setdefault(str(source.parent), {})[source.name] = result['dam_path']
         else:
             failed_count += 1
     
+    for folder_path, dam_paths in by_folder.items():
+        record_published_bulk(folder_path, dam_paths, username, dam_name)
+    
     return {
         'published': published_count,
         'failed': failed_count,
         'results': results
     }
-
-
-
@@ -3,24 +3,77 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 
 
+# Accepted fixed-width shapes, longest first: digits are '0', everything else must match
+# exactly. Shapes with a time may be followed by a suffix (fraction, timezone) that is
+# ignored; date-only shapes must be the whole string
+_DATE_SHAPES = (
+    '0000-00-00T00:00:00',
+    '0000-00-00 00:00:00',
+    # Already in EXIF form
+    '0000:00:00 00:00:00',
+    '0000-00-00T00:00',
+    '0000-00-00 00:00',
+    '0000-00-00',
+    '0000:00:00',
+    '0000-00',
+    '0000',
+)
+# Year, month, day, hour, minute, second sit at the same offsets in every shape
+_FIELD_SLICES = ((0, 4), (5, 7), (8, 10), (11, 13), (14, 16), (17, 19))
+# (length, separator positions and characters, field slices, suffix allowed) per shape
+_DATE_FORMATS = tuple(
+    (
+        len(shape),
+        tuple((i, c) for i, c in enumerate(shape) if c != '0'),
+        tuple(field for field in _FIELD_SLICES if field[1] <= len(shape)),
+        len(shape) > 10
+    )
+    for shape in _DATE_SHAPES
+)
+# Whole-string formats for input that isn't zero-padded (e.g. '2024-5-1')
+_LOOSE_FORMATS = (
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y:%m:%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%Y:%m:%d',
+    '%Y-%m',
+)
+
+
 def parse_event_date(date_str: Optional[str]) -> Optional[datetime]:
-    """Parse event date string to datetime."""
+    """
+    Parse event date string to datetime.
+    
+    Returns None if the string isn't a recognised date or its values are out of
+    range (e.g. '2024-02-30'); it is never read as a shorter, different date.
+    """
     if not date_str:
         return None
     
-    # Try various formats
-    formats = [
-        '%Y-%m-%dT%H:%M:%S',
-        '%Y-%m-%d %H:%M:%S',
-        '%Y-%m-%d',
-        '%Y-%m',
-        '%Y',
-    ]
+    # The shape is picked by length and separators alone; fields are then sliced
+    # out and converted directly rather than going through strptime
+    n = len(date_str)
+    for length, separators, fields, suffix_allowed in _DATE_FORMATS:
+        if n < length or (n > length and not suffix_allowed):
+            continue
+        if any(date_str[i] != c for i, c in separators):
+            continue
+        values = [date_str[start:end] for start, end in fields]
+        # isdigit alone also accepts characters like '²' that int() rejects
+        if not all(value.isascii() and value.isdigit() for value in values):
+            return None
+        # Missing month/day default to 1, as strptime did
+        parts = [int(value) for value in values] + [1] * (3 - len(values))
+        try:
+            return datetime(*parts)
+        except ValueError:
+            return None
     
-    for fmt in formats:
+    for fmt in _LOOSE_FORMATS:
         try:
-            return datetime.strptime(date_str[:len(fmt)], fmt)
-        except (ValueError, IndexError):
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
             continue
     
     return None
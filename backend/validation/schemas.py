@@ -1,17 +1,21 @@
 """Pydantic validation schemas."""
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List, Literal
 from datetime import datetime
 
 
 class LoginRequest(BaseModel):
     """Login request schema."""
+    model_config = ConfigDict(frozen=True)
+    
     username: str = Field(..., min_length=1)
     password: str = Field(..., min_length=1)
 
 
 class MediaUpdateRequest(BaseModel):
     """Media update request schema."""
+    model_config = ConfigDict(frozen=True)
+    
     eventDate: Optional[str] = None
     eventDateDisplay: Optional[str] = None
     eventDatePrecision: Optional[Literal['YEAR', 'MONTH', 'DAY', 'UNKNOWN']] = None
@@ -43,22 +47,30 @@ class MediaUpdateRequest(BaseModel):
 
 class NavigateQuery(BaseModel):
     """Navigate query parameters."""
+    model_config = ConfigDict(frozen=True)
+    
     direction: Literal['next', 'previous']
     reviewStatus: Literal['unreviewed', 'reviewed', 'all'] = 'unreviewed'
 
 
 class SearchQuery(BaseModel):
     """Search query parameters."""
+    model_config = ConfigDict(frozen=True)
+    
     libraryId: str
     folder: Optional[str] = None
     hasSubject: Optional[bool] = None
     hasNotes: Optional[bool] = None
     hasPeople: Optional[bool] = None
     reviewStatus: Literal['unreviewed', 'reviewed', 'all'] = 'all'
+    # False: don't generate thumbnails up front; the thumbnail URL generates on first request
+    thumbnails: bool = True
 
 
 class UploadRequest(BaseModel):
     """Upload request (multipart form data - validated separately)."""
+    model_config = ConfigDict(frozen=True)
+    
     targetFolder: str = ""
     batchName: Optional[str] = None
 
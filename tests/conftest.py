@@ -3,12 +3,27 @@ import pytest
 import tempfile
 import os
 import shutil
+import bcrypt
+from contextlib import contextmanager
 from backend.app import create_app
 from backend.config.loader import Config
-from backend.database.models import Base, get_engine, get_session_local
+from backend.database.models import Base, get_engine, get_session_local, set_engine
 from backend.database.connection import init_db
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _fast_bcrypt():
+    """Hash passwords at bcrypt's minimum cost; hashes stay real, so checkpw still verifies them."""
+    original_gensalt = bcrypt.gensalt
+    
+    def gensalt(rounds: int = 4, prefix: bytes = b'2b') -> bytes:
+        return original_gensalt(rounds, prefix)
+    
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(bcrypt, 'gensalt', gensalt)
+        yield
+
+
 @pytest.fixture
 def temp_dir():
     """Create a temporary directory."""
@@ -18,8 +33,31 @@ def temp_dir():
 
 
 @pytest.fixture
-def sample_config(temp_dir):
+def media_library(tmp_path):
+    """
+    (root, statuses): a library with one folder, f, of three empty images, and
+    their review statuses by path (2.jpg is reviewed; others are unreviewed).
+    """
+    folder = tmp_path / 'f'
+    folder.mkdir()
+    for name in ['1.jpg', '2.jpg', '3.jpg']:
+        (folder / name).touch()
+    return str(tmp_path), {str(folder / '2.jpg'): 'reviewed'}
+
+
+@pytest.fixture(scope="session")
+def app_dir():
+    """Temporary directory for the session-wide app (config, database, library, caches)."""
+    temp = tempfile.mkdtemp()
+    yield temp
+    shutil.rmtree(temp)
+
+
+@pytest.fixture(scope="session")
+def sample_config(app_dir):
     """Create a sample configuration file."""
+    # Admin password is "admin"; minimum bcrypt cost keeps each login check cheap
+    admin_hash = bcrypt.hashpw(b'admin', bcrypt.gensalt(rounds=4)).decode('utf-8')
     config_content = f"""
 server:
   port: 4750
@@ -31,16 +69,16 @@ auth:
   adminUser:
     username: "admin"
     email: "admin@test.com"
-    passwordHash: "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyY5Y5Y5Y5Y5"
+    passwordHash: "{admin_hash}"
     isAdmin: true
 
 libraries:
   - id: "testlib"
     name: "Test Library"
-    rootPath: "{temp_dir}/photos"
+    rootPath: "{app_dir}/photos"
 
-thumbnailCacheRoot: "{temp_dir}/thumbnails"
-uploadRoot: "{temp_dir}/uploads"
+thumbnailCacheRoot: "{app_dir}/thumbnails"
+uploadRoot: "{app_dir}/uploads"
 
 limits:
   maxUploadFiles: 500
@@ -58,53 +96,99 @@ geocoding:
 logging:
   level: "DEBUG"
 """
-    config_path = os.path.join(temp_dir, 'config.yaml')
+    config_path = os.path.join(app_dir, 'config.yaml')
     with open(config_path, 'w') as f:
         f.write(config_content)
     return config_path
 
 
-@pytest.fixture
-def test_database(temp_dir):
-    """Create a test database."""
-    # Use SQLite for testing instead of MariaDB
-    db_path = os.path.join(temp_dir, 'test.db')
-    database_url = f'sqlite:///{db_path}'
-    
-    # Override the database URL
-    import backend.database.models as db_models
-    original_get_url = db_models.get_database_url
+def _create_test_engine(database_url: str):
+    """SQLite engine with the schema, for tests that roll back (see _rolled_back_sessions)."""
+    # SQLite directly (avoids the MariaDB connect_timeout issue); one shared connection,
+    # so each test's transaction sees its own writes
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.pool import StaticPool
+    engine = create_engine(
+        database_url,
+        echo=False,
+        poolclass=StaticPool,
+        connect_args={'check_same_thread': False}
+    )
     
-    def test_get_url():
-        return database_url
+    # pysqlite defers BEGIN to the first write, so a SAVEPOINT could open (and its
+    # release commit) the per-test transaction; take over transaction control
+    @event.listens_for(engine, 'connect')
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
     
-    db_models.get_database_url = test_get_url
+    @event.listens_for(engine, 'begin')
+    def do_begin(conn):
+        conn.exec_driver_sql('BEGIN')
     
-    # Reset engine to force recreation
-    db_models._engine = None
-    db_models._SessionLocal = None
-    
-    # Create tables using SQLite directly (avoid connect_timeout issue)
-    from sqlalchemy import create_engine
-    test_engine = create_engine(database_url, echo=False)
-    Base.metadata.create_all(bind=test_engine)
+    # A new database: nothing to check for before creating tables
+    Base.metadata.create_all(bind=engine, checkfirst=False)
+    return engine
+
+
+@contextmanager
+def _rolled_back_sessions(engine):
+    """Point the services' sessions at a transaction on engine that is rolled back on exit."""
+    import backend.database.models as db_models
+    from sqlalchemy.orm import sessionmaker, scoped_session
     
-    # Set the engine in the module
-    db_models._engine = test_engine
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Services commit; on this session a commit only releases a savepoint
+    original_session_local = db_models._SessionLocal
+    db_models._SessionLocal = scoped_session(sessionmaker(
+        bind=connection,
+        autocommit=False,
+        autoflush=False,
+        join_transaction_mode='create_savepoint'
+    ))
+    try:
+        yield
+    finally:
+        db_models._SessionLocal.remove()
+        db_models._SessionLocal = original_session_local
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """In-memory database engine for unit tests, created once for the whole run."""
+    engine = _create_test_engine('sqlite://')
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def test_db(db_engine):
+    """Run the test in a transaction on db_engine that is rolled back afterwards."""
+    with _rolled_back_sessions(db_engine):
+        yield
+
+
+@pytest.fixture(scope="session")
+def test_database(app_dir):
+    """Create a test database."""
+    # Use SQLite for testing instead of MariaDB
+    db_path = os.path.join(app_dir, 'test.db')
+    database_url = f'sqlite:///{db_path}'
+    test_engine = _create_test_engine(database_url)
+    set_engine(test_engine)
     
     yield database_url
     
     # Cleanup
-    db_models.get_database_url = original_get_url
-    if db_models._engine:
-        db_models._engine.dispose()
-    db_models._engine = None
-    db_models._SessionLocal = None
+    set_engine(None)
+    test_engine.dispose()
     if os.path.exists(db_path):
         os.unlink(db_path)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def app(sample_config, test_database):
     """Create Flask app for testing."""
     # Set test database environment
@@ -126,20 +210,42 @@ def app(sample_config, test_database):
     yield app
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client(app):
     """Create test client."""
     return app.test_client()
 
 
-@pytest.fixture
+@pytest.fixture(autouse=True)
+def _isolate_app_state(request):
+    """
+    Undo each app test's changes to the shared app.
+    
+    Database writes run in a transaction that is rolled back afterwards (service
+    commits only release a savepoint), and uploads go to a fresh uploadRoot.
+    """
+    if 'app' not in request.fixturenames:
+        yield
+        return
+    
+    app = request.getfixturevalue('app')
+    config = app.config['PHOTOMEDIT_CONFIG']
+    original_upload_root = config.upload_root
+    config.upload_root = tempfile.mkdtemp()
+    
+    with _rolled_back_sessions(get_engine()):
+        yield
+    
+    shutil.rmtree(config.upload_root)
+    config.upload_root = original_upload_root
+
+
+@pytest.fixture(scope="session")
 def auth_token(client):
-    """Get authentication token for admin user."""
-    # Note: This will fail if password doesn't match the hash in config
-    # For real tests, you'd need to generate proper bcrypt hashes
+    """Get authentication token for admin user (logged in once per session)."""
     response = client.post('/api/auth/login', json={
         'username': 'admin',
-        'password': 'admin'  # This may not match the hash
+        'password': 'admin'
     })
     if response.status_code == 200:
         data = response.get_json()
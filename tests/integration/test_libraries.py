@@ -18,10 +18,10 @@ def test_list_libraries(client, auth_token):
         assert isinstance(data, list)
 
 
-def test_list_folders(client, auth_token, temp_dir):
+def test_list_folders(client, auth_token, app_dir):
     """Test listing folders."""
     # Create test folder structure
-    test_folder = os.path.join(temp_dir, 'photos', 'test_folder')
+    test_folder = os.path.join(app_dir, 'photos', 'test_folder')
     os.makedirs(test_folder, exist_ok=True)
     
     headers = {}
@@ -1,27 +1,15 @@
 """Integration tests for upload functionality."""
 import pytest
+import io
 import os
-import tempfile
-from pathlib import Path
-
-
-@pytest.fixture
-def auth_token(client):
-    """Get authentication token for admin user."""
-    response = client.post('/api/auth/login', json={
-        'username': 'admin',
-        'password': 'admin'
-    })
-    if response.status_code == 200:
-        return response.get_json().get('token')
-    return None
+import shutil
 
 
 def test_upload_without_auth(client):
     """Test upload without authentication."""
     response = client.post('/api/upload', data={
         'uploadName': 'test',
-        'files': (tempfile.NamedTemporaryFile(delete=False), 'test.jpg')
+        'files': (io.BytesIO(b''), 'test.jpg')
     })
     assert response.status_code == 401
 
@@ -31,30 +19,20 @@ def test_upload_with_auth(client, auth_token, sample_config):
     if not auth_token:
         pytest.skip("Admin login failed - check config")
     
-    # Create a test image file
-    test_file = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
-    test_file.write(b'fake jpeg content')
-    test_file.close()
+    response = client.post(
+        '/api/upload',
+        data={
+            'uploadName': 'test-batch',
+            'libraryId': 'testlib',
+            'files': (io.BytesIO(b'fake jpeg content'), 'test.jpg')
+        },
+        headers={'Authorization': f'Bearer {auth_token}'},
+        content_type='multipart/form-data'
+    )
     
-    try:
-        with open(test_file.name, 'rb') as f:
-            response = client.post(
-                '/api/upload',
-                data={
-                    'uploadName': 'test-batch',
-                    'libraryId': 'library1',
-                    'files': (f, 'test.jpg')
-                },
-                headers={'Authorization': f'Bearer {auth_token}'},
-                content_type='multipart/form-data'
-            )
-        
-        # Should succeed or fail with validation error (not auth error)
-        assert response.status_code in [200, 400, 500]  # 500 might be due to folder creation issues
-        assert response.status_code != 401  # Should not be unauthorized
-    finally:
-        if os.path.exists(test_file.name):
-            os.unlink(test_file.name)
+    # Should succeed or fail with validation error (not auth error)
+    assert response.status_code in [200, 400, 500]  # 500 might be due to folder creation issues
+    assert response.status_code != 401  # Should not be unauthorized
 
 
 def test_upload_invalid_file_type(client, auth_token):
@@ -62,26 +40,77 @@ def test_upload_invalid_file_type(client, auth_token):
     if not auth_token:
         pytest.skip("Admin login failed - check config")
     
-    test_file = tempfile.NamedTemporaryFile(suffix='.txt', delete=False)
-    test_file.write(b'not an image')
-    test_file.close()
+    response = client.post(
+        '/api/upload',
+        data={
+            'uploadName': 'test-batch',
+            'libraryId': 'testlib',
+            'files': (io.BytesIO(b'not an image'), 'test.txt')
+        },
+        headers={'Authorization': f'Bearer {auth_token}'},
+        content_type='multipart/form-data'
+    )
+    
+    # The batch succeeds but the file is rejected with a validation error
+    assert response.status_code == 200
+    files = response.get_json()['files']
+    assert len(files) == 1
+    assert files[0]['status'] == 'error'
+    assert files[0]['errorCode'] == 'UNSUPPORTED_TYPE'
+
+
+
+def test_upload_recreates_removed_folder(client, auth_token, app_dir):
+    """Test a folder removed between two uploads to it is created again."""
+    if not auth_token:
+        pytest.skip("Admin login failed - check config")
+    
+    from PIL import Image
+    
+    def upload(name):
+        image = io.BytesIO()
+        Image.new('RGB', (8, 8)).save(image, 'JPEG')
+        image.seek(0)
+        return client.post(
+            '/api/upload',
+            data={'uploadName': 'Recreated Batch', 'libraryId': 'testlib', 'files': (image, name)},
+            headers={'Authorization': f'Bearer {auth_token}'},
+            content_type='multipart/form-data'
+        )
+    
+    folder = os.path.join(app_dir, 'photos', 'recreated-batch')
+    try:
+        assert upload('one.jpg').status_code == 200
+        shutil.rmtree(folder)
+        assert upload('two.jpg').status_code == 200
+        assert os.listdir(folder) == ['two.jpg']
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def test_upload_same_name_into_library_folder(client, auth_token, app_dir):
+    """Test a second upload of a name gets a suffix and no temp or empty file is left behind."""
+    if not auth_token:
+        pytest.skip("Admin login failed - check config")
+    
+    from PIL import Image
     
+    folder = os.path.join(app_dir, 'photos', 'same-name')
+    os.makedirs(folder)
     try:
-        with open(test_file.name, 'rb') as f:
+        for _ in range(2):
+            image = io.BytesIO()
+            Image.new('RGB', (8, 8)).save(image, 'JPEG')
+            image.seek(0)
             response = client.post(
                 '/api/upload',
-                data={
-                    'uploadName': 'test-batch',
-                    'libraryId': 'library1',
-                    'files': (f, 'test.txt')
-                },
+                data={'libraryId': 'testlib', 'folder': 'same-name', 'files': (image, 'photo.jpg')},
                 headers={'Authorization': f'Bearer {auth_token}'},
                 content_type='multipart/form-data'
             )
+            assert response.status_code == 200
         
-        # Should fail with validation error
-        assert response.status_code in [400, 422]
+        assert sorted(os.listdir(folder)) == ['photo-1.jpg', 'photo.jpg']
+        assert all(os.path.getsize(os.path.join(folder, name)) > 0 for name in os.listdir(folder))
     finally:
-        if os.path.exists(test_file.name):
-            os.unlink(test_file.name)
-
+        shutil.rmtree(folder)
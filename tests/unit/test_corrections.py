@@ -0,0 +1,94 @@
+"""Unit tests for the corrections.csv journal."""
+import pytest
+import csv
+import os
+from backend.utils import corrections
+from backend.utils.corrections import (
+    add_correction, clear_correction, compact_corrections, get_correction,
+    get_corrections_file_path, list_corrections_in_folder
+)
+
+
+@pytest.fixture
+def folder(tmp_path):
+    """Empty media folder."""
+    return str(tmp_path)
+
+
+def _rows(folder):
+    with open(get_corrections_file_path(folder), newline='', encoding='utf-8') as f:
+        return [(row['filename'], row['correction_notes'], bool(row['cleared_at'])) for row in csv.DictReader(f)]
+
+
+def test_add_clear_readd(folder):
+    """Test a flag, its clear and a new flag on the same file each take effect."""
+    assert add_correction(folder, 'a.jpg', 'alice', 'too dark')
+    assert get_correction(folder, 'a.jpg')['correctionNotes'] == 'too dark'
+    
+    assert clear_correction(folder, 'a.jpg')
+    assert get_correction(folder, 'a.jpg') is None
+    assert list_corrections_in_folder(folder) == []
+    
+    assert add_correction(folder, 'a.jpg', 'bob', 'wrong date')
+    correction = get_correction(folder, 'a.jpg')
+    assert correction['username'] == 'bob'
+    assert correction['correctionNotes'] == 'wrong date'
+    assert [c['filename'] for c in list_corrections_in_folder(folder)] == ['a.jpg']
+    
+    # Every step is one appended row
+    assert _rows(folder) == [
+        ('a.jpg', 'too dark', False),
+        ('a.jpg', 'too dark', True),
+        ('a.jpg', 'wrong date', False),
+    ]
+
+
+def test_clear_without_correction(folder):
+    """Test clearing a file with no active correction appends nothing."""
+    assert clear_correction(folder, 'a.jpg')
+    assert not os.path.exists(get_corrections_file_path(folder))
+    
+    add_correction(folder, 'a.jpg', 'alice', 'too dark')
+    clear_correction(folder, 'a.jpg')
+    clear_correction(folder, 'a.jpg')
+    assert len(_rows(folder)) == 2
+
+
+def test_compact_keeps_state_and_audit_trail(folder):
+    """Test compaction drops superseded flags only."""
+    add_correction(folder, 'a.jpg', 'alice', 'too dark')
+    clear_correction(folder, 'a.jpg')
+    add_correction(folder, 'a.jpg', 'bob', 'wrong date')
+    add_correction(folder, 'b.jpg', 'alice', 'blurry')
+    add_correction(folder, 'b.jpg', 'alice', 'very blurry')
+    before = list_corrections_in_folder(folder)
+    
+    assert compact_corrections(folder)
+    assert _rows(folder) == [
+        ('a.jpg', 'too dark', True),
+        ('a.jpg', 'wrong date', False),
+        ('b.jpg', 'very blurry', False),
+    ]
+    assert list_corrections_in_folder(folder) == before
+    
+    # Already compact: nothing to drop
+    assert compact_corrections(folder)
+    assert len(_rows(folder)) == 3
+    
+    # And the journal keeps working afterwards
+    clear_correction(folder, 'a.jpg')
+    add_correction(folder, 'a.jpg', 'carol', 'crop')
+    assert get_correction(folder, 'a.jpg')['username'] == 'carol'
+
+
+def test_append_compacts_large_journal(folder, monkeypatch):
+    """Test appends compact the journal once it grows past the threshold."""
+    monkeypatch.setattr(corrections, '_COMPACT_MIN_BYTES', 0)
+    for i in range(10):
+        add_correction(folder, 'a.jpg', 'alice', f'note {i}')
+    
+    # Compacted whenever the file doubled, so only the last few flags remain
+    rows = _rows(folder)
+    assert len(rows) < 5
+    assert rows[-1] == ('a.jpg', 'note 9', False)
+    assert get_correction(folder, 'a.jpg')['correctionNotes'] == 'note 9'
@@ -1,58 +1,20 @@
 """Unit tests for database models and services."""
 import pytest
-import tempfile
-import os
 from backend.database.models import User, LogEntry, Base, get_engine, get_session_local
 from backend.database.user_service import UserService
 from backend.database.log_service import LogService
 import bcrypt
 
 
-@pytest.fixture
-def test_db():
-    """Create a test database."""
-    # Use SQLite for testing
-    db_path = tempfile.mktemp(suffix='.db')
-    database_url = f'sqlite:///{db_path}'
-    
-    # Override database URL
-    import backend.database.models as db_models
-    original_get_url = db_models.get_database_url
-    
-    def test_get_url():
-        return database_url
-    
-    db_models.get_database_url = test_get_url
-    
-    # Reset engine and session to force recreation
-    db_models._engine = None
-    db_models._SessionLocal = None
-    
-    # Create tables using a fresh engine
-    from sqlalchemy import create_engine
-    test_engine = create_engine(database_url, echo=False)
-    Base.metadata.create_all(bind=test_engine)
-    
-    # Now set the engine in the module
-    db_models._engine = test_engine
-    db_models._SessionLocal = None  # Will be recreated on next get_session_local call
-    
-    yield
-    
-    # Cleanup
-    db_models.get_database_url = original_get_url
-    if db_models._engine:
-        db_models._engine.dispose()
-    db_models._engine = None
-    db_models._SessionLocal = None
-    if os.path.exists(db_path):
-        os.unlink(db_path)
+@pytest.fixture(scope="session")
+def bcrypt_hash():
+    """A password hash for test users; minimum cost, since no test checks it."""
+    return bcrypt.hashpw(b'testpass', bcrypt.gensalt(rounds=4)).decode('utf-8')
 
 
-def test_create_user(test_db):
+def test_create_user(test_db, bcrypt_hash):
     """Test creating a user."""
-    password_hash = bcrypt.hashpw(b'testpass', bcrypt.gensalt()).decode('utf-8')
-    user = UserService.create_user('testuser', 'test@test.com', password_hash, 'user')
+    user = UserService.create_user('testuser', 'test@test.com', bcrypt_hash, 'user')
     
     assert user is not None
     assert user.username == 'testuser'
@@ -60,10 +22,9 @@ def test_create_user(test_db):
     assert user.role == 'user'
 
 
-def test_get_user_by_username(test_db):
+def test_get_user_by_username(test_db, bcrypt_hash):
     """Test getting user by username."""
-    password_hash = bcrypt.hashpw(b'testpass', bcrypt.gensalt()).decode('utf-8')
-    UserService.create_user('testuser', 'test@test.com', password_hash, 'user')
+    UserService.create_user('testuser', 'test@test.com', bcrypt_hash, 'user')
     
     user = UserService.get_user(username='testuser')
     assert user is not None
@@ -71,10 +32,9 @@ def test_get_user_by_username(test_db):
     assert user.email == 'test@test.com'
 
 
-def test_get_user_by_email(test_db):
+def test_get_user_by_email(test_db, bcrypt_hash):
     """Test getting user by email."""
-    password_hash = bcrypt.hashpw(b'testpass', bcrypt.gensalt()).decode('utf-8')
-    UserService.create_user('testuser', 'test@test.com', password_hash, 'user')
+    UserService.create_user('testuser', 'test@test.com', bcrypt_hash, 'user')
     
     user = UserService.get_user(email='test@test.com')
     assert user is not None
@@ -82,20 +42,18 @@ def test_get_user_by_email(test_db):
     assert user.email == 'test@test.com'
 
 
-def test_update_user_email(test_db):
+def test_update_user_email(test_db, bcrypt_hash):
     """Test updating user email."""
-    password_hash = bcrypt.hashpw(b'testpass', bcrypt.gensalt()).decode('utf-8')
-    user = UserService.create_user('testuser', 'test@test.com', password_hash, 'user')
+    user = UserService.create_user('testuser', 'test@test.com', bcrypt_hash, 'user')
     
     updated = UserService.update_user(user, email='newemail@test.com')
     assert updated is not None
     assert updated.email == 'newemail@test.com'
 
 
-def test_update_user_mfa_secret(test_db):
+def test_update_user_mfa_secret(test_db, bcrypt_hash):
     """Test updating user MFA secret."""
-    password_hash = bcrypt.hashpw(b'testpass', bcrypt.gensalt()).decode('utf-8')
-    user = UserService.create_user('testuser', 'test@test.com', password_hash, 'user')
+    user = UserService.create_user('testuser', 'test@test.com', bcrypt_hash, 'user')
     
     updated = UserService.update_user(user, mfa_secret='test_secret')
     assert updated is not None
@@ -107,11 +65,10 @@ def test_update_user_mfa_secret(test_db):
     assert updated.mfa_secret is None
 
 
-def test_list_users(test_db):
+def test_list_users(test_db, bcrypt_hash):
     """Test listing users."""
-    password_hash = bcrypt.hashpw(b'testpass', bcrypt.gensalt()).decode('utf-8')
-    UserService.create_user('user1', 'user1@test.com', password_hash, 'user')
-    UserService.create_user('user2', 'user2@test.com', password_hash, 'admin')
+    UserService.create_user('user1', 'user1@test.com', bcrypt_hash, 'user')
+    UserService.create_user('user2', 'user2@test.com', bcrypt_hash, 'admin')
     
     users = UserService.list_users()
     assert len(users) == 2
@@ -3,38 +3,39 @@ import pytest
 from backend.auth.jwt import JWTManager
 
 
-def test_create_token():
+@pytest.fixture(scope="module")
+def jwt_manager():
+    """JWT manager shared by the module's tests."""
+    return JWTManager("test-secret")
+
+
+@pytest.fixture(scope="module")
+def token_data(jwt_manager):
+    """A token for "testuser", created once for the module."""
+    return jwt_manager.create_token("testuser")
+
+
+def test_create_token(token_data):
     """Test JWT token creation."""
-    manager = JWTManager("test-secret")
-    token_data = manager.create_token("testuser")
-    
     assert 'token' in token_data
     assert 'expiresAt' in token_data
     assert token_data['token'] is not None
 
 
-def test_verify_token():
+def test_verify_token(jwt_manager, token_data):
     """Test JWT token verification."""
-    manager = JWTManager("test-secret")
-    token_data = manager.create_token("testuser")
-    
-    payload = manager.verify_token(token_data['token'])
+    payload = jwt_manager.verify_token(token_data['token'])
     assert payload is not None
     assert payload.get('username') == 'testuser'
 
 
-def test_verify_invalid_token():
+def test_verify_invalid_token(jwt_manager):
     """Test verification of invalid token."""
-    manager = JWTManager("test-secret")
-    payload = manager.verify_token("invalid-token")
+    payload = jwt_manager.verify_token("invalid-token")
     assert payload is None
 
 
-def test_get_username_from_token():
+def test_get_username_from_token(jwt_manager, token_data):
     """Test extracting username from token."""
-    manager = JWTManager("test-secret")
-    token_data = manager.create_token("testuser")
-    
-    username = manager.get_username_from_token(token_data['token'])
+    username = jwt_manager.get_username_from_token(token_data['token'])
     assert username == "testuser"
-
@@ -0,0 +1,42 @@
+"""Unit tests for the navigation media index."""
+import pytest
+import os
+from backend.media.index import MediaIndex
+
+
+@pytest.fixture
+def library(media_library):
+    """media_library with a MediaIndex over it that reads its statuses."""
+    root, statuses = media_library
+    index = MediaIndex(
+        os.path.join(root, 'index.sqlite3'),
+        lambda paths: [statuses.get(p, 'unreviewed') for p in paths]
+    )
+    return root, index, statuses
+
+
+def test_list_folder_filters(library):
+    """Test listing a folder with each review status filter."""
+    root, index, _ = library
+    assert [m['filename'] for m in index.list_folder(root, 'f', 'all')] == ['1.jpg', '2.jpg', '3.jpg']
+    assert [m['filename'] for m in index.list_folder(root, 'f', 'reviewed')] == ['2.jpg']
+    assert [m['filename'] for m in index.list_folder(root, 'f', 'unreviewed')] == ['1.jpg', '3.jpg']
+
+
+def test_neighbor(library):
+    """Test next/previous lookups skip items outside the filter."""
+    root, index, _ = library
+    assert index.neighbor(root, 'f', 'f/1.jpg', 'next', 'unreviewed') == 'f/3.jpg'
+    assert index.neighbor(root, 'f', 'f/3.jpg', 'previous', 'all') == 'f/2.jpg'
+    assert index.neighbor(root, 'f', 'f/1.jpg', 'previous', 'all') is None
+    # Current item not matching the filter
+    assert index.neighbor(root, 'f', 'f/2.jpg', 'next', 'unreviewed') is None
+
+
+def test_invalidate_rescans(library):
+    """Test that invalidation picks up review status changes."""
+    root, index, statuses = library
+    assert index.neighbor(root, 'f', 'f/1.jpg', 'next', 'unreviewed') == 'f/3.jpg'
+    statuses[os.path.join(root, 'f', '2.jpg')] = 'unreviewed'
+    index.invalidate(root, 'f')
+    assert index.neighbor(root, 'f', 'f/1.jpg', 'next', 'unreviewed') == 'f/2.jpg'
@@ -0,0 +1,202 @@
+"""Unit tests for the exiftool metadata writer (exiftool itself is faked)."""
+import pytest
+import os
+import subprocess
+import threading
+from backend.media import metadata_writer
+from backend.media.metadata_writer import MetadataWriter, _ExiftoolDaemon, _REVIEW_CONDITION
+from backend.utils.sidecar import get_sidecar_path
+
+
+class FakeExiftool:
+    """
+    Stands in for an `exiftool -stay_open True -@ -` process, over real pipes.
+    
+    Each command's arguments are passed to respond(), which returns the stderr
+    text for that command, or None to exit without answering.
+    """
+    
+    def __init__(self, respond):
+        in_r, in_w = os.pipe()
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        self.stdin = os.fdopen(in_w, 'wb', buffering=0)
+        self.stdout = os.fdopen(out_r, 'rb', buffering=0)
+        self.stderr = os.fdopen(err_r, 'rb', buffering=0)
+        self.lines = []
+        self.commands = []
+        self.returncode = None
+        self.killed = threading.Event()
+        self._respond = respond
+        self._thread = threading.Thread(target=self._serve, args=(in_r, out_w, err_w), daemon=True)
+        self._thread.start()
+    
+    def _serve(self, in_r, out_w, err_w):
+        with os.fdopen(in_r, 'rb') as stdin, os.fdopen(out_w, 'wb', buffering=0) as out, \
+                os.fdopen(err_w, 'wb', buffering=0) as err:
+            args = []
+            for line in stdin:
+                line = line.rstrip(b'\n')
+                self.lines.append(line)
+                if not line.startswith(b'-execute'):
+                    args.append(line)
+                    continue
+                # Arguments end with "-echo4 {readyN}" ahead of -executeN
+                command, echo = args[:-2], args[-2:]
+                args = []
+                self.commands.append(command)
+                reply = self._respond(command)
+                if reply is None:
+                    return
+                sequence = line[len(b'-execute'):]
+                out.write(b'    1 image files updated\n{ready' + sequence + b'}\n')
+                err.write(reply + echo[1] + b'\n')
+    
+    def poll(self):
+        return self.returncode
+    
+    def kill(self):
+        self.returncode = -9
+        self.killed.set()
+    
+    def wait(self, timeout=None):
+        return self.returncode
+
+
+class _Started(list):
+    """FakeExiftool processes in start order; responders are used up the same way."""
+    
+    def __init__(self):
+        super().__init__()
+        self.responders = []
+
+
+@pytest.fixture
+def exiftool(monkeypatch):
+    """Fresh daemon whose exiftool processes are FakeExiftool; returns the started fakes."""
+    processes = _Started()
+    
+    def popen(args, **kwargs):
+        assert args == ['exiftool', '-stay_open', 'True', '-@', '-']
+        respond = processes.responders.pop(0) if processes.responders else (lambda command: b'')
+        processes.append(FakeExiftool(respond))
+        return processes[-1]
+    
+    monkeypatch.setattr(subprocess, 'Popen', popen)
+    monkeypatch.setattr(metadata_writer, '_daemon', _ExiftoolDaemon())
+    return processes
+
+
+def test_daemon_frames_each_command(exiftool):
+    """Test each command gets its own -echo4/-executeN marker and stderr slice."""
+    exiftool.responders.append(
+        lambda command: b'Error: bad tag - y.jpg\n' if command[-1] == b'y.jpg' else b'Warning: minor\n'
+    )
+    results = metadata_writer._daemon.execute_many([['-a', 'x.jpg'], ['-b', 'y.jpg'], ['-c', 'z.jpg']])
+    
+    assert results == [
+        (True, b'Warning: minor'),
+        (False, b'Error: bad tag - y.jpg'),
+        (True, b'Warning: minor'),
+    ]
+    process = exiftool[0]
+    assert process.commands == [[b'-a', b'x.jpg'], [b'-b', b'y.jpg'], [b'-c', b'z.jpg']]
+    assert process.lines[2:5] == [b'-echo4', b'{ready1}', b'-execute1']
+    assert process.lines[-3:] == [b'-echo4', b'{ready3}', b'-execute3']
+
+
+def test_daemon_reuses_process(exiftool):
+    """Test one exiftool process serves consecutive calls."""
+    daemon = metadata_writer._daemon
+    daemon.execute_many([['-a', 'x.jpg']])
+    assert daemon.execute_many([['-b', 'x.jpg']]) == [(True, b'')]
+    assert len(exiftool) == 1
+    assert exiftool[0].commands == [[b'-a', b'x.jpg'], [b'-b', b'x.jpg']]
+
+
+def test_daemon_escapes_multiline_args(exiftool):
+    """Test values with newlines or edge whitespace go through as #[CSTR] lines."""
+    metadata_writer._daemon.execute_many([['-XMP-dc:description=line 1\nline 2', ' padded', 'x.jpg']])
+    assert exiftool[0].commands == [
+        [b'#[CSTR]-XMP-dc:description=line 1\\nline 2', b'#[CSTR] padded', b'x.jpg']
+    ]
+
+
+def test_daemon_timeout_restarts(exiftool):
+    """Test a command that never finishes times out, kills exiftool and restarts it next call."""
+    exiftool.responders.append(lambda command: exiftool[0].killed.wait(5) and None)
+    daemon = metadata_writer._daemon
+    with pytest.raises(subprocess.TimeoutExpired):
+        daemon.execute_many([['-a', 'x.jpg']], timeout=0.2)
+    assert exiftool[0].killed.is_set()
+    
+    assert daemon.execute_many([['-a', 'x.jpg']]) == [(True, b'')]
+    assert len(exiftool) == 2
+
+
+def test_daemon_exit_restarts(exiftool):
+    """Test exiftool exiting mid-command raises, and the next call starts a new process."""
+    exiftool.responders.append(lambda command: None)
+    daemon = metadata_writer._daemon
+    with pytest.raises(RuntimeError, match='exited unexpectedly'):
+        daemon.execute_many([['-a', 'x.jpg']])
+    
+    assert daemon.execute_many([['-a', 'x.jpg']]) == [(True, b'')]
+    assert len(exiftool) == 2
+
+
+def test_review_status_write_is_gated():
+    """Test the review status tag is written under -if, with a fallback command that omits it."""
+    tags = {'XMP-dc:title': 'Beach', 'XMP:UserComment': 'PhotoMedit:reviewed'}
+    gated, fallback = MetadataWriter._build_commands('/photos/x.jpg', tags)
+    
+    assert gated[:2] == ['-if', _REVIEW_CONDITION]
+    assert '-XMP:UserComment=PhotoMedit:reviewed' in gated
+    assert fallback[:2] == ['-if', f'not ({_REVIEW_CONDITION})']
+    assert not any(arg.startswith('-XMP:UserComment=') for arg in fallback)
+    assert '-XMP-dc:title=Beach' in gated and '-XMP-dc:title=Beach' in fallback
+    
+    # No review status, no condition
+    assert MetadataWriter._build_commands('/photos/x.jpg', {'XMP-dc:title': 'Beach'}) == [
+        MetadataWriter._build_args('/photos/x.jpg', {'XMP-dc:title': 'Beach'})
+    ]
+
+
+def test_review_status_write_sends_both_commands(exiftool, tmp_path):
+    """Test a review status write reaches exiftool as the -if pair, in one call."""
+    photo = tmp_path / 'x.jpg'
+    photo.write_bytes(b'')
+    assert MetadataWriter.write_metadata(str(photo), {'reviewStatus': 'reviewed'}, True)
+    
+    commands = exiftool[0].commands
+    assert [command[:1] for command in commands] == [[b'-if'], [b'-if']]
+    assert commands[0][1] == _REVIEW_CONDITION.encode()
+    assert commands[1][1] == f'not ({_REVIEW_CONDITION})'.encode()
+
+
+def test_sidecar_up_to_date(tmp_path):
+    """Test a sidecar write is skipped only for the same XMP tags on an unchanged sidecar."""
+    video = str(tmp_path / 'clip.mp4')
+    sidecar = get_sidecar_path(video)
+    tags = {'XMP-dc:title': 'Beach', 'EXIF:CreateDate': '2024:05:01 00:00:00'}
+    
+    # Nothing written yet
+    assert not metadata_writer._sidecar_up_to_date(video, tags)
+    
+    with open(sidecar, 'w') as f:
+        f.write('<x:xmpmeta/>')
+    metadata_writer._remember_sidecar_write(video, tags)
+    assert metadata_writer._sidecar_up_to_date(video, tags)
+    # Only XMP tags end up in the sidecar, so others don't count
+    assert metadata_writer._sidecar_up_to_date(video, {**tags, 'EXIF:CreateDate': '2020:01:01 00:00:00'})
+    assert not metadata_writer._sidecar_up_to_date(video, {**tags, 'XMP-dc:title': 'Lake'})
+    assert MetadataWriter._build_jobs(video, {'subject': 'Beach'}, False) == []
+    
+    # Sidecar changed by something else
+    with open(sidecar, 'w') as f:
+        f.write('<x:xmpmeta>edited</x:xmpmeta>')
+    assert not metadata_writer._sidecar_up_to_date(video, tags)
+    assert MetadataWriter._build_jobs(video, {'subject': 'Beach'}, False) != []
+    
+    os.remove(sidecar)
+    assert not metadata_writer._sidecar_up_to_date(video, tags)
@@ -0,0 +1,25 @@
+"""Unit tests for navigation without the media index."""
+import pytest
+from backend.media import navigation
+from backend.media.metadata_reader import MetadataReader
+from backend.media.navigation import MediaNavigator
+
+
+@pytest.fixture
+def library(media_library, monkeypatch):
+    """media_library's root, with no media index and its statuses as what files carry."""
+    root, statuses = media_library
+    monkeypatch.setattr(navigation, 'get_media_index', lambda: None)
+    monkeypatch.setattr(MetadataReader, 'read_review_status', staticmethod(lambda p: statuses.get(p, 'unreviewed')))
+    return root
+
+
+@pytest.mark.parametrize('review_status_filter, expected', [
+    ('all', [('1.jpg', 'unreviewed'), ('2.jpg', 'reviewed'), ('3.jpg', 'unreviewed')]),
+    ('reviewed', [('2.jpg', 'reviewed')]),
+    ('unreviewed', [('1.jpg', 'unreviewed'), ('3.jpg', 'unreviewed')]),
+])
+def test_folder_scan_listing(library, review_status_filter, expected):
+    """Test the folder-scan fallback gives each entry its review status, whatever the filter."""
+    media_list = MediaNavigator.get_media_list(library, 'f', review_status_filter)
+    assert [(m['filename'], m['reviewStatus']) for m in media_list] == expected
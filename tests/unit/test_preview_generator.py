@@ -0,0 +1,21 @@
+"""Unit tests for the preview generator's cache layout."""
+import os
+from backend.media.preview_generator import PreviewGenerator, remove_legacy_cache_dirs
+
+
+def test_remove_legacy_cache_dirs(tmp_path):
+    """Test the old flat thumb/ and preview/ directories go and sharded entries stay."""
+    cache_root = str(tmp_path)
+    for size in ['thumb', 'preview']:
+        os.makedirs(os.path.join(cache_root, size))
+        open(os.path.join(cache_root, size, f'0123abcd_0_{size}.jpg'), 'w').close()
+    current = PreviewGenerator(cache_root)._get_cache_path('/photos/a.jpg', 'thumb', 0)
+    os.makedirs(os.path.dirname(current))
+    open(current, 'w').close()
+    
+    remove_legacy_cache_dirs(cache_root).join()
+    assert sorted(os.listdir(cache_root)) == [os.path.relpath(current, cache_root).split(os.sep)[0]]
+    assert os.path.exists(current)
+    
+    # Nothing left to remove
+    assert remove_legacy_cache_dirs(cache_root) is None
@@ -1,36 +1,38 @@
 """Unit tests for path sanitization."""
 import pytest
-import tempfile
 import os
 from backend.security.sanitizer import PathSanitizer
 
 
-def test_sanitize_valid_path():
+@pytest.fixture(scope="module")
+def sanitize_root(tmp_path_factory):
+    """Library root for the path tests; they only resolve paths, never write."""
+    return str(tmp_path_factory.mktemp("sanitize"))
+
+
+def test_sanitize_valid_path(sanitize_root):
     """Test sanitization of valid paths."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        is_valid, resolved, error = PathSanitizer.sanitize_path(tmpdir, "subfolder/file.jpg")
-        assert is_valid is True
-        assert resolved is not None
-        assert error is None
-        assert tmpdir in resolved
+    is_valid, resolved, error = PathSanitizer.sanitize_path(sanitize_root, "subfolder/file.jpg")
+    assert is_valid is True
+    assert resolved is not None
+    assert error is None
+    assert sanitize_root in resolved
 
 
-def test_sanitize_absolute_path():
+def test_sanitize_absolute_path(sanitize_root):
     """Test that absolute paths are rejected."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        is_valid, resolved, error = PathSanitizer.sanitize_path(tmpdir, "/absolute/path")
-        assert is_valid is False
-        assert resolved is None
-        assert error is not None
+    is_valid, resolved, error = PathSanitizer.sanitize_path(sanitize_root, "/absolute/path")
+    assert is_valid is False
+    assert resolved is None
+    assert error is not None
 
 
-def test_sanitize_path_traversal():
+def test_sanitize_path_traversal(sanitize_root):
     """Test that path traversal is rejected."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        is_valid, resolved, error = PathSanitizer.sanitize_path(tmpdir, "../../etc/passwd")
-        assert is_valid is False
-        assert resolved is None
-        assert error is not None
+    is_valid, resolved, error = PathSanitizer.sanitize_path(sanitize_root, "../../etc/passwd")
+    assert is_valid is False
+    assert resolved is None
+    assert error is not None
 
 
 def test_sanitize_filename():
@@ -0,0 +1,26 @@
+"""Unit tests for the thumbnail worker's generation step."""
+import pytest
+import os
+from PIL import Image
+from backend.media.preview_generator import PreviewGenerator
+from backend.media.thumbnail_worker import _generate_thumbnail
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    """(media folder, thumbnail cache root)."""
+    (tmp_path / 'media').mkdir()
+    return str(tmp_path / 'media'), str(tmp_path / 'cache')
+
+
+@pytest.mark.parametrize('name, want_preview', [('photo.jpg', False), ('photo.tif', True)])
+def test_generate_thumbnail_previews(dirs, name, want_preview):
+    """Test JPEGs get only a thumbnail, since the preview route serves them as they are."""
+    media, cache_root = dirs
+    path = os.path.join(media, name)
+    Image.new('RGB', (640, 480), 'red').save(path)
+    
+    thumb_path = _generate_thumbnail(path, True, cache_root)
+    assert thumb_path and os.path.exists(thumb_path)
+    preview_path = PreviewGenerator(cache_root)._get_cache_path(path, 'preview')
+    assert os.path.exists(preview_path) == want_preview
@@ -0,0 +1,41 @@
+"""Unit tests for event date parsing."""
+import pytest
+from datetime import datetime
+from backend.utils.timestamp import parse_event_date
+
+
+@pytest.mark.parametrize('date_str,expected', [
+    ('2024-05-01T13:45:10', datetime(2024, 5, 1, 13, 45, 10)),
+    ('2024-05-01 13:45:10', datetime(2024, 5, 1, 13, 45, 10)),
+    ('2024:05:01 13:45:10', datetime(2024, 5, 1, 13, 45, 10)),
+    ('2024-05-01T13:45:10.123Z', datetime(2024, 5, 1, 13, 45, 10)),
+    ('2024-05-01T13:45', datetime(2024, 5, 1, 13, 45)),
+    ('2024-05-01', datetime(2024, 5, 1)),
+    ('2024:05:01', datetime(2024, 5, 1)),
+    ('2024-05', datetime(2024, 5, 1)),
+    ('2024', datetime(2024, 1, 1)),
+    ('2024-5-1', datetime(2024, 5, 1)),
+    ('2024-5', datetime(2024, 5, 1)),
+])
+def test_parse_event_date_valid(date_str, expected):
+    """Test parsing of supported date shapes."""
+    assert parse_event_date(date_str) == expected
+
+
+@pytest.mark.parametrize('date_str', [
+    None,
+    '',
+    '2024-02-30',
+    '2024-13-01',
+    '2024-00',
+    '2024-05-01T25:00:00',
+    '2024-05-01T12:61',
+    '2024-05-0x',
+    '2024-0²-01',
+    '2024-5-32',
+    '20240',
+    'not a date',
+])
+def test_parse_event_date_invalid(date_str):
+    """Test that invalid dates are rejected rather than read as a shorter date."""
+    assert parse_event_date(date_str) is None